@@ -32,3 +32,13 @@ def get_current_user(authorization: str | None = Header(default=None, alias="Aut
     if not email:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
     return {"email": email, "role_id": role_id}
+
+
+def get_optional_user(authorization: str | None = Header(default=None, alias="Authorization")):
+    """Como get_current_user, pero None si no hay token válido (endpoints públicos que registran autoría)."""
+    if not authorization:
+        return None
+    try:
+        return get_current_user(authorization)
+    except HTTPException:
+        return None
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 import os
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from dotenv import load_dotenv, find_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-import secrets
+from app.core.pool_metrics import TimedQueuePool, TimedAsyncAdaptedQueuePool
 
 try:
     # Carga explícita de backend/.env independientemente del cwd
@@ -43,6 +45,29 @@ def _detect_schema_from_url(url: str) -> str:
 
 DB_SCHEMA = _detect_schema_from_url(DATABASE_URL) if not IS_SQLITE else "main"
 
+# Pool de conexiones (ajustable por env). DB_POOL_RECYCLE=-1 lo desactiva.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Timeout por sentencia en Postgres (ms). 0 = sin límite.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# SQLite en memoria usa SingletonThreadPool/StaticPool: no admite estos parámetros
+_POOLED = not (IS_SQLITE and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:"))
+
+
+def _pool_kwargs(poolclass) -> dict:
+    if not _POOLED:
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
 # ------------------------------------------------------------------
 # Engine / Session / Base
 # ------------------------------------------------------------------
@@ -50,177 +75,68 @@ engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **_pool_kwargs(TimedQueuePool),
 )
 
+if DB_STATEMENT_TIMEOUT_MS and not IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_statement_timeout(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute(f"SET statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+        cur.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # ------------------------------------------------------------------
-# Helpers
+# Engine / Session async (asyncpg para Postgres, aiosqlite para SQLite)
+# El engine sync se mantiene para scripts (init_db.py) y rutas no migradas.
 # ------------------------------------------------------------------
-def ensure_schema_and_search_path() -> None:
-    """
-    Para Postgres, crea el esquema si no existe y fija el search_path.
-    En SQLite no aplica.
+def _async_url_and_args(url: str) -> tuple[str, dict]:
+    """Traduce la URL sync al driver async equivalente.
+    asyncpg no entiende `options=-csearch_path=...` ni `sslmode`; se pasan como connect_args.
     """
+    u = make_url(url)
     if IS_SQLITE:
-        return
-    with engine.connect() as conn:
-        # crear esquema si no existe
-        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{DB_SCHEMA}"'))
-        # fijar search_path (defensivo, por si el driver ignora options)
-        conn.execute(text(f"SET search_path TO {DB_SCHEMA}"))
-        conn.commit()
-
-
-def ensure_user_profile_columns() -> None:
-    """Asegura columnas opcionales en tabla usuarios: birthdate y gender.
-    Ejecuta ALTER TABLE sólo si faltan. Soporta SQLite y Postgres.
-    """
-    try:
-        with engine.connect() as conn:
-            if IS_SQLITE:
-                # listar columnas via PRAGMA
-                cols = conn.execute(text("PRAGMA table_info('usuarios')")).fetchall()
-                names = {row[1] for row in cols}  # name en segunda columna
-                if "birthdate" not in names:
-                    conn.execute(text("ALTER TABLE usuarios ADD COLUMN birthdate DATE"))
-                if "gender" not in names:
-                    conn.execute(text("ALTER TABLE usuarios ADD COLUMN gender VARCHAR(32)"))
-            else:
-                # Postgres: information_schema
-                result = conn.execute(text(
-                    "SELECT column_name FROM information_schema.columns "
-                    "WHERE table_schema = :schema AND table_name = 'usuarios'"
-                ), {"schema": DB_SCHEMA}).fetchall()
-                names = {r[0] for r in result}
-                if "birthdate" not in names:
-                    conn.execute(text(f"ALTER TABLE \"{DB_SCHEMA}\".usuarios ADD COLUMN IF NOT EXISTS birthdate DATE"))
-                if "gender" not in names:
-                    conn.execute(text(f"ALTER TABLE \"{DB_SCHEMA}\".usuarios ADD COLUMN IF NOT EXISTS gender VARCHAR(32)"))
-            conn.commit()
-    except Exception as e:
-        # No romper el arranque por esto; sólo log
-        print(f"⚠️ No fue posible asegurar columnas opcionales: {e}")
-
-
-def ensure_content_columns() -> None:
-    """Asegura columnas opcionales para content_types y entries.
-    - content_types: owner_email, created_by, updated_by
-    - entries: created_by, updated_by
-    """
-    try:
-        with engine.connect() as conn:
-            if IS_SQLITE:
-                # content_types
-                ct_cols = conn.execute(text("PRAGMA table_info('content_types')")).fetchall()
-                ct_names = {row[1] for row in ct_cols}
-                if "owner_email" not in ct_names:
-                    conn.execute(text("ALTER TABLE content_types ADD COLUMN owner_email VARCHAR"))
-                if "created_by" not in ct_names:
-                    conn.execute(text("ALTER TABLE content_types ADD COLUMN created_by VARCHAR"))
-                if "updated_by" not in ct_names:
-                    conn.execute(text("ALTER TABLE content_types ADD COLUMN updated_by VARCHAR"))
-
-                # entries
-                e_cols = conn.execute(text("PRAGMA table_info('entries')")).fetchall()
-                e_names = {row[1] for row in e_cols}
-                if "created_by" not in e_names:
-                    conn.execute(text("ALTER TABLE entries ADD COLUMN created_by VARCHAR"))
-                if "updated_by" not in e_names:
-                    conn.execute(text("ALTER TABLE entries ADD COLUMN updated_by VARCHAR"))
-            else:
-                # Postgres
-                def ensure_pg_columns(table: str, columns: list[str]):
-                    result = conn.execute(text(
-                        "SELECT column_name FROM information_schema.columns "
-                        "WHERE table_schema = :schema AND table_name = :table"
-                    ), {"schema": DB_SCHEMA, "table": table}).fetchall()
-                    names = {r[0] for r in result}
-                    for col in columns:
-                        if col not in names:
-                            conn.execute(text(
-                                f"ALTER TABLE \"{DB_SCHEMA}\".{table} ADD COLUMN IF NOT EXISTS {col} VARCHAR"
-                            ))
-
-                ensure_pg_columns("content_types", ["owner_email", "created_by", "updated_by"])
-                ensure_pg_columns("entries", ["created_by", "updated_by"])
-            conn.commit()
-    except Exception as e:
-        print(f"⚠️ No fue posible asegurar columnas de contenido: {e}")
-
-
-def ensure_api_key_columns() -> None:
-    """Asegura columnas opcionales para api_keys:
-    - space_id
-    - delivery_token
-    - preview_token
-    También inicializa valores faltantes para filas existentes.
-    """
-    try:
-        with engine.connect() as conn:
-            if IS_SQLITE:
-                cols = conn.execute(text("PRAGMA table_info('api_keys')")).fetchall()
-                names = {row[1] for row in cols}
-                if "space_id" not in names:
-                    conn.execute(text("ALTER TABLE api_keys ADD COLUMN space_id VARCHAR(64)"))
-                if "delivery_token" not in names:
-                    conn.execute(text("ALTER TABLE api_keys ADD COLUMN delivery_token VARCHAR(128)"))
-                if "preview_token" not in names:
-                    conn.execute(text("ALTER TABLE api_keys ADD COLUMN preview_token VARCHAR(128)"))
-                if "created_by" not in names:
-                    conn.execute(text("ALTER TABLE api_keys ADD COLUMN created_by VARCHAR(255)"))
-                # Inicializar valores faltantes
-                conn.execute(text("UPDATE api_keys SET space_id = substr(replace(replace(hex(randomblob(16)),'-',''),'_',''),1,16) WHERE space_id IS NULL"))
-                # Generar tokens urlsafe usando randomblob como fallback en SQL
-                conn.execute(text("UPDATE api_keys SET delivery_token = hex(randomblob(32)) WHERE delivery_token IS NULL"))
-                conn.execute(text("UPDATE api_keys SET preview_token = hex(randomblob(32)) WHERE preview_token IS NULL"))
-            else:
-                result = conn.execute(text(
-                    "SELECT column_name FROM information_schema.columns "
-                    "WHERE table_schema = :schema AND table_name = 'api_keys'"
-                ), {"schema": DB_SCHEMA}).fetchall()
-                names = {r[0] for r in result}
-                if "space_id" not in names:
-                    conn.execute(text(f"ALTER TABLE \"{DB_SCHEMA}\".api_keys ADD COLUMN IF NOT EXISTS space_id VARCHAR(64)"))
-                if "delivery_token" not in names:
-                    conn.execute(text(f"ALTER TABLE \"{DB_SCHEMA}\".api_keys ADD COLUMN IF NOT EXISTS delivery_token VARCHAR(128)"))
-                if "preview_token" not in names:
-                    conn.execute(text(f"ALTER TABLE \"{DB_SCHEMA}\".api_keys ADD COLUMN IF NOT EXISTS preview_token VARCHAR(128)"))
-                if "created_by" not in names:
-                    conn.execute(text(f"ALTER TABLE \"{DB_SCHEMA}\".api_keys ADD COLUMN IF NOT EXISTS created_by VARCHAR(255)"))
-            conn.commit()
-        # Backfill seguro usando Python (evita dependencias de extensiones en Postgres)
-        from sqlalchemy import text as _t
-        db = SessionLocal()
-        try:
-            rows = db.execute(_t(
-                f"SELECT id, space_id, delivery_token, preview_token, created_by FROM {'api_keys' if IS_SQLITE else '"'+DB_SCHEMA+'".api_keys'}"
-            )).fetchall()
-            for r in rows:
-                id_, sp, dt, pt, _cb = r
-                updates = {}
-                if sp is None:
-                    # generar ID corto y urlsafe
-                    updates["space_id"] = secrets.token_urlsafe(12).replace("-", "").replace("_", "")[:16]
-                if dt is None:
-                    updates["delivery_token"] = secrets.token_urlsafe(32)
-                if pt is None:
-                    updates["preview_token"] = secrets.token_urlsafe(32)
-                if updates:
-                    set_clause = ", ".join([f"{k} = :{k}" for k in updates.keys()])
-                    table = 'api_keys' if IS_SQLITE else f'"{DB_SCHEMA}".api_keys'
-                    db.execute(_t(f"UPDATE {table} SET {set_clause} WHERE id = :id"), {**updates, "id": id_})
-            db.commit()
-        finally:
-            db.close()
-    except Exception as e:
-        print(f"⚠️ No fue posible asegurar columnas de api_keys: {e}")
+        return str(u.set(drivername="sqlite+aiosqlite")), {}
+    query = dict(u.query)
+    server_settings = {"search_path": DB_SCHEMA}
+    if DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+    connect_args: dict = {"server_settings": server_settings}
+    query.pop("options", None)
+    sslmode = query.pop("sslmode", None)
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = sslmode
+    u = u.set(drivername="postgresql+asyncpg", query=query)
+    return u.render_as_string(hide_password=False), connect_args
+
+
+ASYNC_DATABASE_URL, _ASYNC_CONNECT_ARGS = _async_url_and_args(DATABASE_URL)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", ASYNC_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    connect_args=_ASYNC_CONNECT_ARGS,
+    **_pool_kwargs(TimedAsyncAdaptedQueuePool),
+)
 
+# expire_on_commit=False: los objetos devueltos por las rutas se serializan tras el commit
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
 def get_db() -> Generator:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
@@ -0,0 +1,83 @@
+# backend/app/core/http_cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+def _cache_control(prefix: str, max_age: int, s_maxage: int, swr: int, visibility: str = "public") -> str:
+    """Política Cache-Control configurable por env: <PREFIX>_CACHE_CONTROL la reemplaza completa,
+    o bien <PREFIX>_CACHE_MAX_AGE / _S_MAXAGE / _SWR ajustan cada directiva."""
+    override = os.getenv(f"{prefix}_CACHE_CONTROL")
+    if override:
+        return override
+    max_age = int(os.getenv(f"{prefix}_CACHE_MAX_AGE", str(max_age)))
+    s_maxage = int(os.getenv(f"{prefix}_CACHE_S_MAXAGE", str(s_maxage)))
+    swr = int(os.getenv(f"{prefix}_CACHE_SWR", str(swr)))
+    parts = [visibility, f"max-age={max_age}"]
+    if s_maxage:
+        parts.append(f"s-maxage={s_maxage}")
+    if swr:
+        parts.append(f"stale-while-revalidate={swr}")
+    return ", ".join(parts)
+
+
+# ---- Config ----
+DELIVERY_CACHE_CONTROL = _cache_control("DELIVERY", max_age=0, s_maxage=60, swr=300)
+PREVIEW_CACHE_CONTROL = os.getenv("PREVIEW_CACHE_CONTROL", "private, no-cache")
+THEME_CACHE_CONTROL = _cache_control("THEME", max_age=60, s_maxage=300, swr=600)
+IMAGE_CACHE_CONTROL = _cache_control("IMAGE", max_age=3600, s_maxage=86400, swr=0)
+# Media subida con nombre heredado: larga, pero revalidable por ETag
+MEDIA_CACHE_CONTROL = _cache_control("MEDIA", max_age=86400, s_maxage=604800, swr=86400)
+# URLs cuyo contenido nunca cambia (hash en el nombre)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def make_etag(*parts: object) -> str:
+    """ETag fuerte a partir de la versión de contenido y los parámetros de la petición."""
+    raw = "|".join(str(p) for p in parts).encode("utf-8")
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime], cache_control: str, vary: Optional[str] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evalúa If-None-Match (prioritario) o If-Modified-Since según RFC 7232."""
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        if inm.strip() == "*":
+            return True
+        tags = [t.strip() for t in inm.split(",")]
+        # comparación débil: If-None-Match ignora el prefijo W/
+        return any((t[2:] if t.startswith("W/") else t) == etag for t in tags)
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        lm = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        return lm.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
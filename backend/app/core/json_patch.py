@@ -0,0 +1,126 @@
+# backend/app/core/json_patch.py
+"""
+JSON Patch (RFC 6902) mínimo: diff entre dos documentos JSON y aplicación de un patch.
+
+`diff` sólo genera add / remove / replace (las listas se comparan por posición:
+prefijo común recursivo y altas/bajas al final), que es lo que `apply` necesita
+para reconstruir; `apply` acepta además test/move/copy de patches externos.
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any, List
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _same(a: Any, b: Any) -> bool:
+    # 1 == True en Python pero no en JSON
+    return type(a) is type(b) and a == b
+
+
+def diff(before: Any, after: Any, path: str = "") -> List[dict]:
+    """Operaciones que transforman `before` en `after`."""
+    if isinstance(before, dict) and isinstance(after, dict):
+        ops: List[dict] = []
+        for key in before:
+            if key not in after:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(str(key))}"})
+        for key, value in after.items():
+            child = f"{path}/{_escape(str(key))}"
+            if key not in before:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff(before[key], value, child))
+        return ops
+    if isinstance(before, list) and isinstance(after, list):
+        ops = []
+        common = min(len(before), len(after))
+        for i in range(common):
+            ops.extend(diff(before[i], after[i], f"{path}/{i}"))
+        # Bajas desde el final para que los índices sigan siendo válidos
+        for i in range(len(before) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(after)):
+            ops.append({"op": "add", "path": f"{path}/-", "value": after[i]})
+        return ops
+    if _same(before, after):
+        return []
+    return [{"op": "replace", "path": path, "value": after}]
+
+
+def _parent(doc: Any, path: str):
+    if not path.startswith("/"):
+        raise ValueError(f"Ruta JSON Pointer inválida: {path!r}")
+    tokens = [_unescape(t) for t in path[1:].split("/")]
+    target = doc
+    for token in tokens[:-1]:
+        target = target[int(token)] if isinstance(target, list) else target[token]
+    return target, tokens[-1]
+
+
+def _get(doc: Any, path: str) -> Any:
+    if path == "":
+        return doc
+    parent, key = _parent(doc, path)
+    return parent[int(key)] if isinstance(parent, list) else parent[key]
+
+
+def _add(doc: Any, path: str, value: Any) -> Any:
+    if path == "":
+        return value
+    parent, key = _parent(doc, path)
+    if isinstance(parent, list):
+        if key == "-":
+            parent.append(value)
+        else:
+            parent.insert(int(key), value)
+    else:
+        parent[key] = value
+    return doc
+
+
+def _remove(doc: Any, path: str) -> Any:
+    parent, key = _parent(doc, path)
+    if isinstance(parent, list):
+        parent.pop(int(key))
+    else:
+        del parent[key]
+    return doc
+
+
+def apply(doc: Any, ops: List[dict]) -> Any:
+    """Devuelve una copia de `doc` con el patch aplicado. ValueError si no se puede aplicar."""
+    doc = copy.deepcopy(doc)
+    try:
+        for op in ops:
+            kind, path = op["op"], op["path"]
+            if kind == "add":
+                doc = _add(doc, path, copy.deepcopy(op["value"]))
+            elif kind == "remove":
+                doc = _remove(doc, path)
+            elif kind == "replace":
+                if path == "":
+                    doc = copy.deepcopy(op["value"])
+                else:
+                    _get(doc, path)  # debe existir
+                    doc = _add(_remove(doc, path), path, copy.deepcopy(op["value"]))
+            elif kind == "move":
+                value = _get(doc, op["from"])
+                doc = _add(_remove(doc, op["from"]), path, value)
+            elif kind == "copy":
+                doc = _add(doc, path, copy.deepcopy(_get(doc, op["from"])))
+            elif kind == "test":
+                if not _same(_get(doc, path), op["value"]):
+                    raise ValueError(f"test falló en {path}")
+            else:
+                raise ValueError(f"Operación desconocida: {kind}")
+    except (KeyError, IndexError, TypeError) as exc:
+        raise ValueError(f"Patch no aplicable: {exc!r}")
+    return doc
@@ -0,0 +1,169 @@
+# backend/app/core/migration_schemas.py
+"""
+Tablas congeladas que crean las migraciones.
+
+Cada migración crea las tablas con la forma que tenían al escribirla, no con la de
+los modelos actuales: una BD nueva y una existente pasan por el mismo historial.
+Los cambios posteriores van en su propia migración (ALTER / índices). No editar.
+"""
+from __future__ import annotations
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    UniqueConstraint, func,
+)
+from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
+
+from app.core.db import DB_SCHEMA, IS_SQLITE
+
+_SCHEMA = None if IS_SQLITE else DB_SCHEMA
+
+
+def _fk(table: str, column: str) -> str:
+    return f"{table}.{column}" if IS_SQLITE else f"{DB_SCHEMA}.{table}.{column}"
+
+
+def baseline_v001() -> MetaData:
+    """Esquema base (migración 001): tablas previas al historial de migraciones."""
+    md = MetaData(schema=_SCHEMA)
+    Table(
+        "api_keys", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String(100), nullable=False),
+        Column("description", String(255), nullable=True),
+        Column("created_by", String(255), nullable=True, index=True),
+        Column("token", String(128), nullable=False, index=True, unique=True),
+        Column("space_id", String(64), nullable=True, index=True, unique=True),
+        Column("delivery_token", String(128), nullable=True, index=True, unique=True),
+        Column("preview_token", String(128), nullable=True, index=True, unique=True),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "themes", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String(100)),
+        Column("primary_color", String(20)),
+        Column("secondary_color", String(20)),
+        Column("accent_color", String(20)),
+        Column("background_color", String(20)),
+        Column("text_color", String(20)),
+        Column("mode", String(10)),
+    )
+    Table(
+        "usuarios", md,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("email", String, unique=True, index=True, nullable=False),
+        Column("full_name", String, nullable=False),
+        Column("password", String, nullable=False),
+        Column("phone", String, nullable=True),
+        Column("birthdate", Date, nullable=True),
+        Column("gender", String, nullable=True),
+        Column("status", Boolean, nullable=True),
+        Column("role_id", Integer, nullable=True),
+        Column("plan_id", Integer, nullable=True),
+        Column("profile_image", String, nullable=True),
+        Column("created_by", String, nullable=True),
+        Column("updated_by", String, nullable=True),
+        Column("registration_date", DateTime, server_default=func.now(), nullable=True),
+        Column("created_at", DateTime, server_default=func.now(), nullable=True),
+        Column("updated_at", DateTime, nullable=True),
+    )
+    Table(
+        "content_types", md,
+        Column("id", String, primary_key=True),
+        Column("name", String, nullable=False),
+        Column("api_id", String, unique=True, nullable=False),
+        Column("schema", SQLiteJSON, nullable=False),
+        Column("owner_email", String, nullable=False, index=True),
+        Column("created_by", String, nullable=True),
+        Column("updated_by", String, nullable=True),
+        Column("created_at", DateTime),
+        Column("updated_at", DateTime),
+    )
+    Table(
+        "entries", md,
+        Column("id", String, primary_key=True),
+        Column("content_type_id", String, ForeignKey(_fk("content_types", "id")), nullable=False, index=True),
+        Column("title", String, nullable=True),
+        Column("status", String),
+        Column("fields", SQLiteJSON, nullable=False),
+        Column("created_by", String, nullable=False),
+        Column("updated_by", String, nullable=True),
+        Column("created_at", DateTime),
+        Column("updated_at", DateTime),
+        Index("ix_entries_status_ct_created_id", "status", "content_type_id", "created_at", "id"),
+    )
+    Table(
+        "published_entries", md,
+        Column("entry_id", String, primary_key=True),
+        Column("content_type_id", String, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("published_at", DateTime),
+        Column("payload", Text, nullable=False),
+        Index("ix_published_entries_ct_created_id", "content_type_id", "created_at", "entry_id"),
+        Index("ix_published_entries_created_id", "created_at", "entry_id"),
+    )
+    Table(
+        "content_versions", md,
+        Column("scope", String(32), primary_key=True),
+        Column("version", Integer, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+    )
+    return md
+
+
+def assets_v010() -> Table:
+    return Table(
+        "assets", MetaData(schema=_SCHEMA),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("store", String(32), nullable=False),
+        Column("sha256", String(64), nullable=False),
+        Column("filename", String(128), nullable=False),
+        Column("size", BigInteger, nullable=False),
+        Column("mime", String(100), nullable=True),
+        Column("ref_count", Integer, nullable=False),
+        Column("created_at", DateTime),
+        Column("updated_at", DateTime),
+        UniqueConstraint("store", "sha256", name="uq_assets_store_sha256"),
+    )
+
+
+def asset_variants_v011() -> Table:
+    md = MetaData(schema=_SCHEMA)
+    Table("assets", md, Column("id", Integer, primary_key=True))  # destino del FK
+    return Table(
+        "asset_variants", md,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("asset_id", Integer, ForeignKey(_fk("assets", "id"), ondelete="CASCADE"), nullable=False, index=True),
+        Column("width", Integer, nullable=False),
+        Column("height", Integer, nullable=False),
+        Column("format", String(16), nullable=False),
+        Column("size", BigInteger, nullable=False),
+        Column("created_at", DateTime),
+        UniqueConstraint("asset_id", "width", "format", name="uq_asset_variants_asset_width_format"),
+    )
+
+
+def asset_catalogue_indexes_v012() -> list[Index]:
+    assets = Table(
+        "assets", MetaData(schema=_SCHEMA),
+        Column("store", String(32)), Column("mime", String(100)), Column("created_at", DateTime), Column("id", Integer),
+    )
+    return [
+        Index("ix_assets_store_created_id", assets.c.store, assets.c.created_at, assets.c.id),
+        Index("ix_assets_store_mime_created_id", assets.c.store, assets.c.mime, assets.c.created_at, assets.c.id),
+    ]
+
+
+def entry_revisions_v013() -> Table:
+    return Table(
+        "entry_revisions", MetaData(schema=_SCHEMA),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("entry_id", String, nullable=False),
+        Column("version", Integer, nullable=False),
+        Column("kind", String(16), nullable=False),
+        Column("data", Text, nullable=False),
+        Column("created_by", String, nullable=True),
+        Column("created_at", DateTime),
+        UniqueConstraint("entry_id", "version", name="uq_entry_revisions_entry_version"),
+    )
@@ -0,0 +1,285 @@
+# backend/app/core/migrations.py
+"""
+Migraciones versionadas del esquema.
+
+Cada migración es (versión, nombre, fn(conn)) y se aplica una sola vez; las
+aplicadas quedan registradas en `schema_migrations`. Se ejecutan con
+`python migrate.py` (un único proceso, bajo lock); el arranque de la API sólo
+compara la versión registrada con la última conocida.
+"""
+from __future__ import annotations
+
+import os
+import secrets
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core import migration_schemas
+from app.core.db import engine, IS_SQLITE, DB_SCHEMA
+
+# Migrar al arrancar si la BD está atrasada (útil en desarrollo con SQLite)
+DB_AUTO_MIGRATE: bool = os.getenv("DB_AUTO_MIGRATE", "1" if IS_SQLITE else "0") == "1"
+
+# Id arbitrario (constante) del advisory lock de Postgres
+_PG_LOCK_ID = 73_105_008
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _table(name: str) -> str:
+    return name if IS_SQLITE else f'"{DB_SCHEMA}".{name}'
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    if IS_SQLITE:
+        return {row[1] for row in conn.execute(text(f"PRAGMA table_info('{table}')")).fetchall()}
+    rows = conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = :schema AND table_name = :table"
+    ), {"schema": DB_SCHEMA, "table": table}).fetchall()
+    return {r[0] for r in rows}
+
+
+def _add_columns(conn: Connection, table: str, columns: dict[str, str]) -> None:
+    """Agrega las columnas que falten (tablas creadas antes de existir la columna)."""
+    existing = _columns(conn, table)
+    for name, ddl_type in columns.items():
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE {_table(table)} ADD COLUMN {name} {ddl_type}"))
+
+
+# ------------------------------------------------------------------
+# Migraciones
+# ------------------------------------------------------------------
+def _m001_baseline(conn: Connection) -> None:
+    # Esquema congelado (no los modelos actuales): las tablas posteriores las crea su migración
+    if not IS_SQLITE:
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{DB_SCHEMA}"'))
+    migration_schemas.baseline_v001().create_all(bind=conn)
+
+
+def _m002_user_profile(conn: Connection) -> None:
+    _add_columns(conn, "usuarios", {"birthdate": "DATE", "gender": "VARCHAR(32)"})
+
+
+def _m003_content_audit(conn: Connection) -> None:
+    _add_columns(conn, "content_types", {"owner_email": "VARCHAR", "created_by": "VARCHAR", "updated_by": "VARCHAR"})
+    _add_columns(conn, "entries", {"created_by": "VARCHAR", "updated_by": "VARCHAR"})
+
+
+def _m004_api_key_tokens(conn: Connection) -> None:
+    _add_columns(conn, "api_keys", {
+        "space_id": "VARCHAR(64)",
+        "delivery_token": "VARCHAR(128)",
+        "preview_token": "VARCHAR(128)",
+        "created_by": "VARCHAR(255)",
+    })
+    # Backfill sólo de las filas incompletas (tokens generados en Python, sin extensiones de PG)
+    rows = conn.execute(text(
+        f"SELECT id, space_id, delivery_token, preview_token FROM {_table('api_keys')} "
+        "WHERE space_id IS NULL OR delivery_token IS NULL OR preview_token IS NULL"
+    )).fetchall()
+    for id_, sp, dt, pt in rows:
+        updates = {}
+        if sp is None:
+            updates["space_id"] = secrets.token_urlsafe(12).replace("-", "").replace("_", "")[:16]
+        if dt is None:
+            updates["delivery_token"] = secrets.token_urlsafe(32)
+        if pt is None:
+            updates["preview_token"] = secrets.token_urlsafe(32)
+        set_clause = ", ".join(f"{k} = :{k}" for k in updates)
+        conn.execute(text(f"UPDATE {_table('api_keys')} SET {set_clause} WHERE id = :id"), {**updates, "id": id_})
+
+
+def _m005_entry_keyset_index(conn: Connection) -> None:
+    # create_all sólo crea índices en tablas nuevas
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_entries_status_ct_created_id "
+        f"ON {_table('entries')} (status, content_type_id, created_at, id)"
+    ))
+
+
+def _m006_published_snapshots(conn: Connection) -> None:
+    from app.services.snapshot_service import fill_snapshots
+    db = Session(bind=conn)
+    try:
+        fill_snapshots(db)
+        db.flush()
+    finally:
+        db.close()
+
+
+def _m007_content_versions(conn: Connection) -> None:
+    from app.services.version_service import DELIVERY, PREVIEW, THEME
+    existing = {r[0] for r in conn.execute(text(f"SELECT scope FROM {_table('content_versions')}")).fetchall()}
+    for scope in (DELIVERY, PREVIEW, THEME):
+        if scope not in existing:
+            conn.execute(
+                text(f"INSERT INTO {_table('content_versions')} (scope, version, updated_at) VALUES (:s, 0, :now)"),
+                {"s": scope, "now": datetime.utcnow()},
+            )
+
+
+def _m008_entry_fields_jsonb(conn: Connection) -> None:
+    from app.services.field_query import create_all_field_indexes
+    if not IS_SQLITE:
+        data_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = :schema AND table_name = 'entries' AND column_name = 'fields'"
+        ), {"schema": DB_SCHEMA}).scalar()
+        if data_type != "jsonb":
+            conn.execute(text(f"ALTER TABLE {_table('entries')} ALTER COLUMN fields TYPE JSONB USING fields::jsonb"))
+        # GIN para `fields ? 'id'` / containment
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_entries_fields_gin ON {_table('entries')} USING gin (fields)"))
+    create_all_field_indexes(conn)
+
+
+def _m009_entry_search(conn: Connection) -> None:
+    from app.services.search_service import create_search_index, rebuild_search_index
+    create_search_index(conn)
+    rebuild_search_index(conn)
+
+
+def _m010_assets(conn: Connection) -> None:
+    migration_schemas.assets_v010().create(bind=conn, checkfirst=True)
+
+
+def _m011_asset_variants(conn: Connection) -> None:
+    _add_columns(conn, "assets", {"placeholder": "TEXT"})
+    migration_schemas.asset_variants_v011().create(bind=conn, checkfirst=True)
+
+
+def _m012_asset_catalogue(conn: Connection) -> None:
+    _add_columns(conn, "assets", {"width": "INTEGER", "height": "INTEGER", "uploaded_by": "VARCHAR"})
+    for index in migration_schemas.asset_catalogue_indexes_v012():
+        index.create(bind=conn, checkfirst=True)
+
+
+def _m013_entry_revisions(conn: Connection) -> None:
+    # Las entries existentes reciben su versión 1 (checkpoint) en el primer cambio
+    migration_schemas.entry_revisions_v013().create(bind=conn, checkfirst=True)
+
+
+def _m014_prune_orphan_revisions(conn: Connection) -> None:
+    # Historial que dejó el borrado de content types antes de borrarse junto con sus entries
+    conn.execute(text(
+        f"DELETE FROM {_table('entry_revisions')} "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {_table('entries')} e WHERE e.id = {_table('entry_revisions')}.entry_id)"
+    ))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline", _m001_baseline),
+    Migration(2, "user_profile_columns", _m002_user_profile),
+    Migration(3, "content_audit_columns", _m003_content_audit),
+    Migration(4, "api_key_tokens", _m004_api_key_tokens),
+    Migration(5, "entry_keyset_index", _m005_entry_keyset_index),
+    Migration(6, "published_snapshots", _m006_published_snapshots),
+    Migration(7, "content_versions", _m007_content_versions),
+    Migration(8, "entry_fields_jsonb", _m008_entry_fields_jsonb),
+    Migration(9, "entry_search", _m009_entry_search),
+    Migration(10, "assets", _m010_assets),
+    Migration(11, "asset_variants", _m011_asset_variants),
+    Migration(12, "asset_catalogue", _m012_asset_catalogue),
+    Migration(13, "entry_revisions", _m013_entry_revisions),
+    Migration(14, "prune_orphan_revisions", _m014_prune_orphan_revisions),
+]
+
+LATEST_VERSION: int = max(m.version for m in MIGRATIONS)
+
+
+# ------------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------------
+def _ensure_version_table(conn: Connection) -> None:
+    if not IS_SQLITE:
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{DB_SCHEMA}"'))
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {_table('schema_migrations')} ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(128) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def _applied_versions(conn: Connection) -> set[int]:
+    return {r[0] for r in conn.execute(text(f"SELECT version FROM {_table('schema_migrations')}")).fetchall()}
+
+
+@contextmanager
+def _migration_lock() -> Iterator[Connection]:
+    """Conexión dedicada con lock exclusivo: un solo proceso migra a la vez."""
+    if IS_SQLITE:
+        # SQLite no tiene advisory locks: BEGIN IMMEDIATE toma el lock de escritura
+        # y todas las migraciones van en esa única transacción
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            conn.exec_driver_sql("COMMIT")
+        return
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _PG_LOCK_ID})
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _PG_LOCK_ID})
+            conn.commit()
+
+
+def run_migrations() -> List[Migration]:
+    """Aplica las migraciones pendientes y devuelve las aplicadas."""
+    done: List[Migration] = []
+    with _migration_lock() as conn:
+        _ensure_version_table(conn)
+        # Releer bajo lock: otro proceso pudo haber migrado mientras esperábamos
+        applied = _applied_versions(conn)
+        for m in MIGRATIONS:
+            if m.version in applied:
+                continue
+            m.apply(conn)
+            conn.execute(
+                text(f"INSERT INTO {_table('schema_migrations')} (version, name, applied_at) VALUES (:v, :n, :at)"),
+                {"v": m.version, "n": m.name, "at": datetime.utcnow()},
+            )
+            if not IS_SQLITE:
+                # En Postgres el DDL es transaccional: una transacción por migración
+                conn.commit()
+            done.append(m)
+            print(f"🔧 Migración {m.version:03d} aplicada: {m.name}")
+    return done
+
+
+def current_version() -> int:
+    """Versión registrada del esquema (0 si nunca se migró). Una sola consulta."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT max(version) FROM {_table('schema_migrations')}")).scalar() or 0
+    except Exception:
+        return 0
+
+
+def check_schema_version() -> int:
+    """Chequeo de arranque: no inspecciona columnas, sólo compara versiones."""
+    version = current_version()
+    if version >= LATEST_VERSION:
+        return version
+    if DB_AUTO_MIGRATE:
+        run_migrations()
+        return LATEST_VERSION
+    raise RuntimeError(
+        f"Esquema de base de datos desactualizado (versión {version}, se requiere {LATEST_VERSION}). "
+        "Ejecuta `python migrate.py` antes de iniciar la API."
+    )
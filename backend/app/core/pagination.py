@@ -0,0 +1,53 @@
+# backend/app/core/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException
+
+# ---- Config ----
+DEFAULT_PAGE_SIZE: int = int(os.getenv("DELIVERY_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE: int = int(os.getenv("DELIVERY_MAX_PAGE_SIZE", "1000"))
+
+
+def clamp_limit(limit: int | None) -> int:
+    """Aplica el tamaño de página por defecto y el máximo permitido."""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(min(limit, MAX_PAGE_SIZE), 1)
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Cursor opaco (keyset) a partir de la última fila devuelta: (created_at, id)."""
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Cursor opaco por posición, para órdenes por campo (sin keyset estable)."""
+    raw = json.dumps({"offset": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["offset"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
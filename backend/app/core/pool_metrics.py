@@ -0,0 +1,117 @@
+# backend/app/core/pool_metrics.py
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Límites superiores (ms) de los buckets del histograma de espera de checkout
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """Contadores de checkout del pool, agregados por proceso (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)  # último bucket: +Inf
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            histogram = {f"le_{b}ms": n for b, n in zip(WAIT_BUCKETS_MS, self._buckets)}
+            histogram["le_inf"] = self._buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / observed, 3) if observed else None,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "wait_histogram": histogram,
+            }
+
+
+# Telemetría por request: la fija el middleware y la acumulan los pools
+_request_stats: ContextVar[Optional[dict]] = ContextVar("db_request_stats", default=None)
+
+
+def start_request_stats() -> dict:
+    stats = {"checkouts": 0, "wait_ms": 0.0}
+    _request_stats.set(stats)
+    return stats
+
+
+def _record(metrics: PoolMetrics, started: float, timed_out: bool = False) -> None:
+    wait_ms = (time.perf_counter() - started) * 1000
+    metrics.observe(wait_ms, timed_out)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["checkouts"] += 1
+        stats["wait_ms"] += wait_ms
+
+
+class _TimedPoolMixin:
+    """Mide el tiempo de checkout (espera en cola + conexión nueva + pre-ping)."""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            _record(self.metrics, started, timed_out=True)
+            raise
+        _record(self.metrics, started)
+        return conn
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+def pool_stats(pool: Pool) -> dict:
+    """Estado en vivo del pool + métricas acumuladas (si el pool es instrumentado)."""
+    data: dict = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            data[name] = fn()
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        data["timeout"] = timeout()
+    metrics = getattr(pool, "metrics", None)
+    if isinstance(metrics, PoolMetrics):
+        data.update(metrics.snapshot())
+    return data
@@ -0,0 +1,116 @@
+# backend/app/core/process_pool.py
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+
+
+class BoundedProcessPool:
+    """
+    ProcessPoolExecutor (spawn) con cola acotada y métricas.
+
+    - Como mucho `workers` tareas en el executor; el resto espera su turno.
+    - Si ya hay `max_queue` esperando, o la espera supera `queue_timeout`,
+      se responde 503 en lugar de apilar trabajo que el cliente ya no esperará.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.workers = max(int(workers), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self.queue_timeout = float(queue_timeout)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Un semáforo por event loop (TestClient / varios loops en el mismo proceso)
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.run_ms_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: no hereda hilos/conexiones del proceso del servidor
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sem = self._slots.get(loop)
+            if sem is None:
+                sem = self._slots[loop] = asyncio.Semaphore(self.workers)
+            return sem
+
+    def _saturated(self) -> HTTPException:
+        with self._lock:
+            self.rejected += 1
+        return HTTPException(status_code=503, detail="Servicio ocupado, reintenta en unos segundos", headers={"Retry-After": "1"})
+
+    async def run(self, fn, *args):
+        sem = self._semaphore()
+        with self._lock:
+            if self.waiting >= self.max_queue and sem.locked():
+                full = True
+            else:
+                full = False
+                self.waiting += 1
+                self.peak_waiting = max(self.peak_waiting, self.waiting)
+        if full:
+            raise self._saturated()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._saturated()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.active += 1
+            self.wait_ms_total += waited_ms
+            self.wait_ms_max = max(self.wait_ms_max, waited_ms)
+        run_started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            sem.release()
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.run_ms_total += (time.perf_counter() - run_started) * 1000
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "peak_queue_depth": self.peak_waiting,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_ms_total / self.completed, 2) if self.completed else None,
+                "max_wait_ms": round(self.wait_ms_max, 2),
+                "avg_run_ms": round(self.run_ms_total / self.completed, 2) if self.completed else None,
+            }
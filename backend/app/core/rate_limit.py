@@ -0,0 +1,96 @@
+# backend/app/core/rate_limit.py
+"""
+Límites de intentos de login (en memoria, por proceso).
+
+- Por IP: todos los intentos cuentan (credential stuffing rota cuentas, no IPs).
+- Por cuenta: sólo los fallidos; un login correcto la libera.
+
+Se evalúan ANTES de verificar la contraseña, así una ráfaga no llega al pool de hashing.
+Con varios workers cada uno lleva su cuenta: el límite efectivo es N veces el configurado.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from app.core.cache import TTLCache
+
+# ---- Config ----
+LOGIN_WINDOW_SECONDS: int = int(os.getenv("LOGIN_WINDOW_SECONDS", "300"))
+LOGIN_MAX_ATTEMPTS_PER_IP: int = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "30"))
+LOGIN_MAX_FAILURES_PER_ACCOUNT: int = int(os.getenv("LOGIN_MAX_FAILURES_PER_ACCOUNT", "5"))
+LOGIN_THROTTLE_MAX_KEYS: int = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+# Sólo detrás de un proxy confiable: usar el primer X-Forwarded-For como IP del cliente
+TRUST_FORWARDED_FOR: bool = os.getenv("TRUST_FORWARDED_FOR", "0") == "1"
+
+
+class FixedWindowLimiter:
+    """Contador por clave en ventanas fijas; la ventana empieza con el primer hit."""
+
+    def __init__(self, name: str, limit: int, window: int, max_keys: int):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        # LRU acotado: una ráfaga de claves distintas no crece la memoria sin límite
+        self._counts = TTLCache(maxsize=max_keys, ttl=window)
+        self._lock = threading.Lock()
+        self.blocked = 0
+
+    def retry_after(self, key: str) -> Optional[int]:
+        """Segundos hasta que `key` vuelva a estar permitido, o None si no está bloqueado."""
+        item = self._counts.get(key)
+        if item is None:
+            return None
+        reset_at, count = item
+        if count < self.limit:
+            return None
+        with self._lock:
+            self.blocked += 1
+        return max(int(reset_at - time.monotonic()) + 1, 1)
+
+    def hit(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._counts.get(key)
+            if item is None:
+                reset_at, count = now + self.window, 0
+            else:
+                reset_at, count = item
+            self._counts.set(key, (reset_at, count + 1), ttl=max(reset_at - now, 0.001))
+
+    def reset(self, key: str) -> None:
+        self._counts.pop(key)
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "window": self.window, "blocked": self.blocked, "keys": self._counts.stats()["size"]}
+
+
+login_ip_limiter = FixedWindowLimiter("login_ip", LOGIN_MAX_ATTEMPTS_PER_IP, LOGIN_WINDOW_SECONDS, LOGIN_THROTTLE_MAX_KEYS)
+login_account_limiter = FixedWindowLimiter("login_account", LOGIN_MAX_FAILURES_PER_ACCOUNT, LOGIN_WINDOW_SECONDS, LOGIN_THROTTLE_MAX_KEYS)
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def check_login_allowed(ip: str, account: str) -> None:
+    """429 con Retry-After si la IP o la cuenta superaron su límite."""
+    waits = [w for w in (login_ip_limiter.retry_after(ip), login_account_limiter.retry_after(account)) if w]
+    if waits:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados intentos de inicio de sesión. Intenta más tarde.",
+            headers={"Retry-After": str(max(waits))},
+        )
+
+
+def login_throttle_stats() -> dict:
+    return {"ip": login_ip_limiter.stats(), "account": login_account_limiter.stats()}
@@ -3,25 +3,51 @@ from __future__ import annotations
 
 import os
 import datetime as dt
-from typing import Dict
+import time
+from typing import Dict, Optional, Tuple
 
 from jose import jwt
 from passlib.context import CryptContext
 from jose import JWTError
 
+try:  # opcional: JWT_BACKEND=pyjwt
+    import jwt as pyjwt
+except ImportError:  # pragma: no cover
+    pyjwt = None
+
+from app.core.cache import TTLCache
+from app.core.process_pool import BoundedProcessPool
+
 # ---- Config JWT ----
 SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-change-me")
 ALGORITHM: str = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
+# jose (por defecto) | pyjwt: mismo formato de token, PyJWT decodifica más rápido
+JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose").lower()
+# Caché de tokens ya verificados -> claims (nunca más allá del `exp` del token)
+JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+JWT_CACHE_TTL: float = float(os.getenv("JWT_CACHE_TTL", "300"))
+
+if JWT_BACKEND not in ("jose", "pyjwt"):
+    raise RuntimeError(f"JWT_BACKEND no soportado: {JWT_BACKEND} (usa jose o pyjwt)")
+if JWT_BACKEND == "pyjwt" and pyjwt is None:
+    raise RuntimeError("JWT_BACKEND=pyjwt requiere PyJWT (pip install PyJWT)")
 
 # ---- Password hashing ----
-# Usando pbkdf2_sha256 temporalmente para evitar problemas con bcrypt
+# pbkdf2_sha256 es el esquema actual; bcrypt queda sólo para verificar hashes heredados.
+# Tras un login correcto, verify_and_update re-hashea lo que esté desactualizado
+# (bcrypt, o pbkdf2 con menos rounds que PASSWORD_PBKDF2_ROUNDS). Calibrar con bench_password.py.
+PASSWORD_PBKDF2_ROUNDS: int = int(os.getenv("PASSWORD_PBKDF2_ROUNDS", "29000"))
+
 _pwd_ctx = CryptContext(
-    schemes=["pbkdf2_sha256"], 
-    deprecated="auto",
-    pbkdf2_sha256__rounds=29000
+    schemes=["pbkdf2_sha256", "bcrypt"],
+    deprecated=["bcrypt"],
+    pbkdf2_sha256__default_rounds=PASSWORD_PBKDF2_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_PBKDF2_ROUNDS,
 )
 
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
 
 def hash_password(plain: str) -> str:
     # Validar que la contraseña no exceda 72 bytes (límite de bcrypt)
@@ -30,25 +56,105 @@ def hash_password(plain: str) -> str:
     return _pwd_ctx.hash(plain)
 
 
-def verify_password(plain: str, hashed: str) -> bool:
+def _verify_bcrypt_direct(plain: str, hashed: str) -> bool:
+    # passlib 1.7 no reconoce bcrypt>=4.1 como backend; se verifica con la librería directamente
+    import bcrypt
+    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(ok, nuevo_hash). `nuevo_hash` viene sólo si el hash guardado usa un esquema/costo viejo."""
     # Validar que la contraseña no exceda 72 bytes (límite de bcrypt)
+    if len(plain.encode('utf-8')) > 72 or not hashed:
+        return False, None
+    try:
+        return _pwd_ctx.verify_and_update(plain, hashed)
+    except (ValueError, TypeError, AttributeError):
+        if hashed.startswith(_BCRYPT_PREFIXES):
+            try:
+                ok = _verify_bcrypt_direct(plain, hashed)
+            except (ImportError, ValueError):
+                return False, None
+            return ok, (hash_password(plain) if ok else None)
+        # hash vacío / desconocido
+        return False, None
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return verify_and_update(plain, hashed)[0]
+
+
+# ---- Pool de hashing ----
+# pbkdf2/bcrypt son CPU puro: corren en procesos aparte para no frenar el event loop
+# ni el resto de los requests del worker. Cola acotada: exceso -> 503.
+PASSWORD_WORKERS: int = int(os.getenv("PASSWORD_WORKERS", str(min(2, os.cpu_count() or 1))))
+PASSWORD_QUEUE_MAX: int = int(os.getenv("PASSWORD_QUEUE_MAX", "32"))
+PASSWORD_QUEUE_TIMEOUT: float = float(os.getenv("PASSWORD_QUEUE_TIMEOUT", "5"))
+
+password_pool = BoundedProcessPool("password", PASSWORD_WORKERS, PASSWORD_QUEUE_MAX, PASSWORD_QUEUE_TIMEOUT)
+
+
+async def hash_password_async(plain: str) -> str:
     if len(plain.encode('utf-8')) > 72:
-        return False
-    return _pwd_ctx.verify(plain, hashed)
+        raise ValueError("La contraseña no puede exceder 72 bytes")
+    return await password_pool.run(hash_password, plain)
 
 
-def create_access_token(subject: str, role_id: int, minutes: int | None = None) -> str:
-    expire = dt.datetime.utcnow() + dt.timedelta(minutes=minutes or ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload = {"sub": subject, "role_id": role_id, "exp": expire}
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return (await verify_and_update_async(plain, hashed))[0]
+
+
+async def verify_and_update_async(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    if len(plain.encode('utf-8')) > 72 or not hashed:
+        return False, None
+    return await password_pool.run(verify_and_update, plain, hashed)
+
+
+def jwt_encode(payload: dict, backend: str = JWT_BACKEND) -> str:
+    if backend == "pyjwt":
+        return pyjwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def decode_access_token(token: str) -> dict:
+def jwt_decode(token: str, backend: str = JWT_BACKEND) -> dict:
+    """Verifica firma y `exp` con el backend elegido. ValueError si no es válido."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        if backend == "pyjwt":
+            return pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise ValueError("Invalid token")
+    except Exception as e:
+        if pyjwt is not None and isinstance(e, pyjwt.PyJWTError):
+            raise ValueError("Invalid token")
+        raise
+
+
+def create_access_token(subject: str, role_id: int, minutes: int | None = None) -> str:
+    expire = dt.datetime.utcnow() + dt.timedelta(minutes=minutes or ACCESS_TOKEN_EXPIRE_MINUTES)
+    payload = {"sub": subject, "role_id": role_id, "exp": expire}
+    return jwt_encode(payload)
+
+
+token_claims_cache = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=JWT_CACHE_TTL)
+
+
+def decode_access_token(token: str) -> dict:
+    """Claims del token. Los ya verificados salen de la caché (sin HMAC) hasta su `exp`."""
+    claims = token_claims_cache.get(token)
+    now = time.time()
+    if claims is not None:
+        exp = claims.get("exp")
+        if exp is None or exp > now:
+            return dict(claims)
+        token_claims_cache.pop(token)
+    claims = jwt_decode(token)
+    exp = claims.get("exp")
+    ttl = JWT_CACHE_TTL if exp is None else min(JWT_CACHE_TTL, float(exp) - now)
+    if ttl > 0:
+        token_claims_cache.set(token, claims, ttl=ttl)
+    # copia: quien llama no debe poder alterar lo cacheado
+    return dict(claims)
 
 
 # ---- Roles helpers (lo que te estaba faltando) ----
@@ -0,0 +1,174 @@
+# backend/app/core/static_files.py
+"""
+Capa de servido de media subida (/static/images, /static/avatars).
+
+- ETag fuerte desde el hash del contenido: el propio nombre si es `<sha256><ext>`,
+  o el sha256 calculado (y cacheado por mtime/tamaño) para nombres heredados.
+- 304 con If-None-Match / If-Modified-Since.
+- Sidecars precomprimidos (`archivo.svg.br`, `archivo.json.gz`) para tipos
+  compresibles cuando el cliente los acepta.
+- Range / If-Range / 416 los resuelve FileResponse de Starlette usando el ETag de arriba.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+
+try:  # opcional: sin `brotli` sólo se generan sidecars .gz
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+from app.core.cache import TTLCache
+from app.core.http_cache import IMMUTABLE_CACHE_CONTROL, MEDIA_CACHE_CONTROL, http_date, is_not_modified, not_modified
+
+# Nombres direccionados por contenido: sha256 (64 hex) + extensión opcional
+HASHED_NAME_RE = re.compile(r"^[0-9a-f]{64}(\.[A-Za-z0-9]+)?$")
+
+# ---- Config ----
+# Archivos heredados más grandes que esto no se hashean: ETag por mtime+tamaño
+MEDIA_HASH_MAX_BYTES: int = int(float(os.getenv("MEDIA_HASH_MAX_MB", "64")) * 1024 * 1024)
+MEDIA_ETAG_CACHE_SIZE: int = int(os.getenv("MEDIA_ETAG_CACHE_SIZE", "4096"))
+
+# Tipos que vale la pena precomprimir (las imágenes raster ya van comprimidas)
+COMPRESSIBLE_EXTS = {".svg", ".json", ".txt", ".css", ".js", ".xml", ".csv"}
+# Content-Encoding -> sufijo del sidecar, en orden de preferencia
+SIDECARS = (("br", ".br"), ("gzip", ".gz"))
+
+_etag_cache = TTLCache(maxsize=MEDIA_ETAG_CACHE_SIZE, ttl=3600)
+
+
+def _content_hash(full_path: str, stat_result: os.stat_result) -> str:
+    name = os.path.basename(full_path)
+    if HASHED_NAME_RE.match(name):
+        return name.split(".", 1)[0]
+    if stat_result.st_size > MEDIA_HASH_MAX_BYTES:
+        return f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+    key = (full_path, stat_result.st_mtime_ns, stat_result.st_size)
+    digest = _etag_cache.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(full_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _etag_cache.set(key, digest)
+    return digest
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _sidecar(full_path: str, stat_result: os.stat_result, accept_encoding: str) -> Tuple[Optional[str], str, os.stat_result]:
+    """(encoding, ruta, stat) del sidecar aceptado más preferido; (None, original) si no hay."""
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding, suffix in SIDECARS:
+        if encoding not in accepted and "*" not in accepted:
+            continue
+        try:
+            side_stat = os.stat(full_path + suffix)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        # Un sidecar más viejo que el original está desactualizado
+        if stat.S_ISREG(side_stat.st_mode) and side_stat.st_mtime_ns >= stat_result.st_mtime_ns:
+            return encoding, full_path + suffix, side_stat
+    return None, full_path, stat_result
+
+
+def write_sidecars(path: str) -> None:
+    """Genera `path.gz` (y `path.br` si hay brotli) junto a un archivo compresible recién guardado."""
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTS:
+        return
+    with open(path, "rb") as f:
+        data = f.read()
+    outputs = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        outputs.append((".br", brotli.compress(data, quality=11)))
+    for suffix, payload in outputs:
+        # Si no ahorra, no vale la pena servirlo
+        if len(payload) >= len(data):
+            continue
+        tmp_path = f"{path}{suffix}.part"
+        with open(tmp_path, "wb") as out:
+            out.write(payload)
+        os.replace(tmp_path, path + suffix)
+
+
+def remove_sidecars(path: str) -> None:
+    for _encoding, suffix in SIDECARS:
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+class MediaFiles(StaticFiles):
+    """StaticFiles con ETag fuerte por contenido, 304, sidecars .br/.gz y Cache-Control largo.
+    Los nombres direccionados por contenido se sirven como immutable."""
+
+    async def get_response(self, path: str, scope):
+        if scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+        try:
+            full_path, stat_result = await run_in_threadpool(self.lookup_path, path)
+        except (OSError, ValueError):
+            # Errores de ruta: que StaticFiles responda lo de siempre (401/404)
+            return await super().get_response(path, scope)
+        if not stat_result or not stat.S_ISREG(stat_result.st_mode):
+            return await super().get_response(path, scope)
+        return await self.media_response(full_path, stat_result, scope)
+
+    async def media_response(self, full_path: str, stat_result: os.stat_result, scope):
+        request = Request(scope)
+        name = os.path.basename(full_path)
+        ext = os.path.splitext(name)[1].lower()
+        compressible = ext in COMPRESSIBLE_EXTS
+
+        encoding, serve_path, serve_stat = None, full_path, stat_result
+        if compressible:
+            encoding, serve_path, serve_stat = await run_in_threadpool(
+                _sidecar, full_path, stat_result, request.headers.get("accept-encoding", "")
+            )
+        digest = await run_in_threadpool(_content_hash, full_path, stat_result)
+        # Cada representación (identity / br / gzip) tiene su propio ETag
+        etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+        last_modified = datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc)
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.match(name) else MEDIA_CACHE_CONTROL,
+            "Last-Modified": http_date(last_modified),
+        }
+        if compressible:
+            headers["Vary"] = "Accept-Encoding"
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        # FileResponse atiende Range / If-Range (contra este ETag) y HEAD
+        return FileResponse(serve_path, stat_result=serve_stat, media_type=media_type, headers=headers)
@@ -0,0 +1,283 @@
+# backend/app/core/storage.py
+"""
+Backends de almacenamiento para la media subida (stores "images" y "avatars").
+
+    MEDIA_STORAGE=local   # por defecto: directorios del nodo (IMAGES_DIR / AVATAR_DIR)
+    MEDIA_STORAGE=s3      # bucket S3 compatible (AWS, MinIO, ...); requiere boto3
+
+Con S3 los originales se sirven con redirect a una URL pre-firmada (o a
+S3_PUBLIC_BASE_URL si el bucket/CDN es público): los workers no proxyan bytes.
+Las transformaciones de imagen descargan el original una vez a S3_CACHE_DIR.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import uuid
+from typing import Dict, Iterator, Optional, Tuple
+
+from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.types import Receive, Scope, Send
+
+from app.core.http_cache import IMMUTABLE_CACHE_CONTROL
+from app.core.static_files import HASHED_NAME_RE, MediaFiles, remove_sidecars, write_sidecars
+
+try:  # opcional: sólo necesario con MEDIA_STORAGE=s3
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover
+    boto3 = None
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+# ---- Config ----
+MEDIA_STORAGE: str = os.getenv("MEDIA_STORAGE", "local").lower()
+IMAGES_DIR: str = os.getenv("IMAGES_DIR", "uploads/images")
+AVATAR_DIR: str = os.getenv("AVATAR_DIR", os.path.join(_BACKEND_DIR, "uploads", "avatars"))
+
+S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+S3_PREFIX: str = os.getenv("S3_PREFIX", "media/")
+S3_ENDPOINT_URL: Optional[str] = os.getenv("S3_ENDPOINT_URL") or None  # MinIO / moto
+S3_REGION: Optional[str] = os.getenv("S3_REGION") or None
+S3_PUBLIC_BASE_URL: str = os.getenv("S3_PUBLIC_BASE_URL", "").rstrip("/")
+S3_PRESIGN_TTL: int = int(os.getenv("S3_PRESIGN_TTL", "3600"))
+S3_MULTIPART_THRESHOLD: int = int(float(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8")) * 1024 * 1024)
+S3_MULTIPART_CHUNK: int = int(float(os.getenv("S3_MULTIPART_CHUNK_MB", "8")) * 1024 * 1024)
+S3_MAX_CONCURRENCY: int = int(os.getenv("S3_MAX_CONCURRENCY", "4"))
+# Temporales de subida antes de enviarlos al bucket
+S3_TMP_DIR: str = os.getenv("S3_TMP_DIR", os.path.join(tempfile.gettempdir(), "media-uploads"))
+# Originales descargados para transformar; bajo la caché de derivados para que su LRU los desaloje
+S3_CACHE_DIR: str = os.getenv("S3_CACHE_DIR", os.path.join(os.getenv("IMAGE_CACHE_DIR", "uploads/.derived"), "originals"))
+
+
+class StorageBackend:
+    """Interfaz común. `name` es siempre un nombre plano (sin directorios)."""
+
+    #: True si los originales se pueden servir desde disco local (MediaFiles)
+    serves_locally = False
+
+    def tmp_dir(self, store: str) -> str:
+        """Directorio local donde save_upload escribe antes de `save`."""
+        raise NotImplementedError
+
+    async def save(self, store: str, name: str, tmp_path: str, content_type: Optional[str]) -> None:
+        """Mueve un archivo local ya completo (y verificado) al store."""
+        raise NotImplementedError
+
+    async def delete(self, store: str, name: str) -> None:
+        raise NotImplementedError
+
+    async def exists(self, store: str, name: str) -> bool:
+        raise NotImplementedError
+
+    def fetch(self, store: str, name: str) -> str:
+        """Ruta local legible del original (FileNotFoundError si no existe). Bloqueante."""
+        raise NotImplementedError
+
+    async def local_path(self, store: str, name: str) -> str:
+        return await run_in_threadpool(self.fetch, store, name)
+
+    def url(self, store: str, name: str) -> Optional[str]:
+        """URL externa para redirigir al cliente; None si se sirve desde este proceso."""
+        return None
+
+    def list(self, store: str) -> Iterator[Tuple[str, int]]:
+        """(nombre, tamaño) de los archivos del store (sync: para scripts de mantenimiento)."""
+        raise NotImplementedError
+
+
+class LocalStorage(StorageBackend):
+    serves_locally = True
+
+    def __init__(self, directories: Dict[str, str]):
+        self.directories = directories
+        for directory in directories.values():
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, store: str, name: str) -> str:
+        return os.path.join(self.directories[store], name)
+
+    def tmp_dir(self, store: str) -> str:
+        # Mismo filesystem que el store: `save` es un rename atómico. Oculto para los listados.
+        return os.path.join(self.directories[store], ".tmp")
+
+    def _save(self, store: str, name: str, tmp_path: str) -> None:
+        dest_path = self.path(store, name)
+        os.replace(tmp_path, dest_path)
+        # SVG y similares: variantes .br/.gz para MediaFiles
+        write_sidecars(dest_path)
+
+    async def save(self, store: str, name: str, tmp_path: str, content_type: Optional[str]) -> None:
+        await run_in_threadpool(self._save, store, name, tmp_path)
+
+    def _delete(self, store: str, name: str) -> None:
+        path = self.path(store, name)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        remove_sidecars(path)
+
+    async def delete(self, store: str, name: str) -> None:
+        await run_in_threadpool(self._delete, store, name)
+
+    async def exists(self, store: str, name: str) -> bool:
+        return await run_in_threadpool(os.path.isfile, self.path(store, name))
+
+    def fetch(self, store: str, name: str) -> str:
+        path = self.path(store, name)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        return path
+
+    def list(self, store: str) -> Iterator[Tuple[str, int]]:
+        directory = self.directories[store]
+        if not os.path.isdir(directory):
+            return
+        # scandir: un solo stat por entrada; se omiten ocultos (.tmp, .derived) y parciales
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.startswith(".") or entry.name.endswith(".part") or not entry.is_file():
+                    continue
+                yield entry.name, entry.stat().st_size
+
+
+class S3Storage(StorageBackend):
+    """Bucket S3 compatible. Subidas multipart desde el temporal local; lecturas por URL pre-firmada."""
+
+    def __init__(self, bucket: str, prefix: str, cache_dir: str):
+        if boto3 is None:
+            raise RuntimeError("MEDIA_STORAGE=s3 requiere boto3 (pip install boto3)")
+        if not bucket:
+            raise RuntimeError("MEDIA_STORAGE=s3 requiere S3_BUCKET")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache_dir = cache_dir
+        # El cliente de boto3 es thread-safe: uno por proceso, usado desde el threadpool
+        self.client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL, region_name=S3_REGION)
+        self.transfer = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_CHUNK,
+            max_concurrency=S3_MAX_CONCURRENCY,
+        )
+
+    def key(self, store: str, name: str) -> str:
+        return f"{self.prefix}{store}/{name}"
+
+    def tmp_dir(self, store: str) -> str:
+        return S3_TMP_DIR
+
+    def _save(self, store: str, name: str, tmp_path: str, content_type: Optional[str]) -> None:
+        extra = {"CacheControl": IMMUTABLE_CACHE_CONTROL} if HASHED_NAME_RE.match(name) else {}
+        if content_type:
+            extra["ContentType"] = content_type
+        # upload_file parte en piezas de S3_MULTIPART_CHUNK y las sube en paralelo
+        self.client.upload_file(tmp_path, self.bucket, self.key(store, name), ExtraArgs=extra, Config=self.transfer)
+        os.remove(tmp_path)
+
+    async def save(self, store: str, name: str, tmp_path: str, content_type: Optional[str]) -> None:
+        await run_in_threadpool(self._save, store, name, tmp_path, content_type)
+
+    def _cached_path(self, store: str, name: str) -> str:
+        return os.path.join(self.cache_dir, store, name)
+
+    def _delete(self, store: str, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(store, name))
+        try:
+            os.remove(self._cached_path(store, name))
+        except FileNotFoundError:
+            pass
+
+    async def delete(self, store: str, name: str) -> None:
+        await run_in_threadpool(self._delete, store, name)
+
+    def _exists(self, store: str, name: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(store, name))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def exists(self, store: str, name: str) -> bool:
+        return await run_in_threadpool(self._exists, store, name)
+
+    def fetch(self, store: str, name: str) -> str:
+        path = self._cached_path(store, name)
+        try:
+            os.utime(path)  # marca de uso para el LRU de la caché de derivados
+            return path
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"  # .part: el LRU de derivados lo ignora
+        try:
+            self.client.download_file(self.bucket, self.key(store, name), tmp_path, Config=self.transfer)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(self.key(store, name))
+            raise
+        os.replace(tmp_path, path)
+        return path
+
+    def url(self, store: str, name: str) -> Optional[str]:
+        if S3_PUBLIC_BASE_URL:
+            return f"{S3_PUBLIC_BASE_URL}/{self.key(store, name)}"
+        # Firmar es local (HMAC): no hay round-trip a S3
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self.key(store, name)}, ExpiresIn=S3_PRESIGN_TTL,
+        )
+
+    def list(self, store: str) -> Iterator[Tuple[str, int]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        prefix = self.key(store, "")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                name = obj["Key"][len(prefix):]
+                if name and "/" not in name:
+                    yield name, obj["Size"]
+
+
+def _build_storage() -> StorageBackend:
+    if MEDIA_STORAGE == "s3":
+        return S3Storage(S3_BUCKET, S3_PREFIX, S3_CACHE_DIR)
+    if MEDIA_STORAGE != "local":
+        raise RuntimeError(f"MEDIA_STORAGE no soportado: {MEDIA_STORAGE} (usa local o s3)")
+    return LocalStorage({"images": IMAGES_DIR, "avatars": AVATAR_DIR})
+
+
+storage: StorageBackend = _build_storage()
+
+
+class RedirectMedia:
+    """App ASGI para montar en /static/<store> cuando el backend no es local: 307 a la URL del bucket."""
+
+    def __init__(self, backend: StorageBackend, store: str):
+        self.backend = backend
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405, headers={"Allow": "GET, HEAD"})
+        path, root_path = scope["path"], scope.get("root_path", "")
+        name = (path[len(root_path):] if path.startswith(root_path) else path).lstrip("/")
+        if not name or name.startswith(".") or "/" in name:
+            raise HTTPException(status_code=404)
+        # La URL pre-firmada caduca: el redirect se cachea sólo la mitad de su vigencia
+        response = RedirectResponse(
+            self.backend.url(self.store, name),
+            status_code=307,
+            headers={"Cache-Control": f"public, max-age={S3_PRESIGN_TTL // 2}"},
+        )
+        await response(scope, receive, send)
+
+
+def media_app(store: str):
+    """Lo que se monta en /static/<store>: MediaFiles si el store es local, redirects si no."""
+    if isinstance(storage, LocalStorage):
+        return MediaFiles(directory=storage.directories[store])
+    return RedirectMedia(storage, store)
@@ -0,0 +1,68 @@
+# backend/app/core/uploads.py
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import BinaryIO, NamedTuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# ---- Config ----
+UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_IMAGE_UPLOAD_BYTES: int = int(float(os.getenv("MAX_IMAGE_UPLOAD_MB", "20")) * 1024 * 1024)
+MAX_AVATAR_UPLOAD_BYTES: int = int(float(os.getenv("MAX_AVATAR_UPLOAD_MB", "5")) * 1024 * 1024)
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Archivo demasiado grande (máximo {max_bytes // (1024 * 1024)} MB)")
+
+
+def _write_chunk(out: BinaryIO, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(upload: UploadFile, dest_path: str, max_bytes: int) -> StoredUpload:
+    """Guarda un UploadFile por chunks sin bloquear el event loop.
+
+    - Lectura y escritura de cada chunk en el threadpool (nunca el archivo entero en memoria).
+    - Corta con 413 en cuanto se supera `max_bytes` y borra el parcial.
+    - Calcula el sha256 mientras escribe.
+    - Escribe a `<dest>.part` y renombra al final: nunca queda un archivo a medias en `dest_path`.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+    tmp_path = f"{dest_path}.part"
+    digest = hashlib.sha256()
+    size = 0
+    out = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            await run_in_threadpool(_write_chunk, out, digest, chunk)
+    except BaseException:
+        await run_in_threadpool(out.close)
+        await run_in_threadpool(_discard, tmp_path)
+        raise
+    await run_in_threadpool(out.close)
+    await run_in_threadpool(os.replace, tmp_path, dest_path)
+    return StoredUpload(dest_path, size, digest.hexdigest())
@@ -14,6 +14,8 @@ class FieldDef(BaseModel):
     linkType: Optional[str] = None
     # Configuración específica por tipo (short/long/list, min/max, many, etc.)
     config: Optional[Dict[str, Any]] = None
+    # Crea un índice de expresión para filtrar/ordenar por este campo en delivery
+    indexed: bool = False
 
 class ContentTypeCreateDTO(BaseModel):
     id: str = Field(..., description="Internal ID (cuid/uuid)")
@@ -1,7 +1,7 @@
 
 # app/dto/entry_dto.py
-from pydantic import BaseModel
-from typing import Dict, Any, Optional, Literal
+from pydantic import BaseModel, model_validator
+from typing import Dict, Any, List, Optional, Literal
 
 Status = Literal["DRAFT","PUBLISHED","ARCHIVED"]
 
@@ -15,3 +15,29 @@ class EntryUpdateDTO(BaseModel):
     title: Optional[str] = None
     fields: Optional[Dict[str, Any]] = None
     status: Optional[Status] = None
+
+class EntryImportDTO(EntryCreateDTO):
+    """Una línea de POST /entries/bulk (mismo formato que exporta GET /entries/export)."""
+    status: Status = "DRAFT"
+
+class EntryFilterDTO(BaseModel):
+    content_type_id: Optional[str] = None
+    status: Optional[Status] = None
+
+    @model_validator(mode="after")
+    def _some_criterion(self):
+        # Un filtro vacío seleccionaría todas las entries
+        if not self.content_type_id and self.status is None:
+            raise ValueError("El filtro necesita al menos un criterio (`content_type_id` o `status`)")
+        return self
+
+class EntryBatchDTO(BaseModel):
+    """Entries a las que aplicar una transición: lista de ids o filtro (uno de los dos)."""
+    ids: Optional[List[str]] = None
+    filter: Optional[EntryFilterDTO] = None
+
+    @model_validator(mode="after")
+    def _ids_or_filter(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Indica `ids` o `filter` (sólo uno)")
+        return self
@@ -0,0 +1,53 @@
+# backend/app/models/asset.py
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, ForeignKey, Index, UniqueConstraint
+from app.core.db import Base, DB_SCHEMA, IS_SQLITE
+
+_TABLE_ARGS = {} if IS_SQLITE else {"schema": DB_SCHEMA}
+
+class Asset(Base):
+    """Blob direccionado por contenido (sha256) dentro de un store ("images", "avatars").
+    Subidas idénticas comparten archivo; el blob se borra cuando ref_count llega a 0.
+    """
+    __tablename__ = "assets"
+    __table_args__ = (
+        UniqueConstraint("store", "sha256", name="uq_assets_store_sha256"),
+        # Catálogo (/images/list): keyset por (created_at, id) dentro del store, con o sin filtro de mime
+        Index("ix_assets_store_created_id", "store", "created_at", "id"),
+        Index("ix_assets_store_mime_created_id", "store", "mime", "created_at", "id"),
+        _TABLE_ARGS,
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    store = Column(String(32), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    filename = Column(String(128), nullable=False)  # <sha256><ext> (o el nombre heredado, ver reconcile_assets.py)
+    size = Column(BigInteger, nullable=False)
+    mime = Column(String(100), nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    uploaded_by = Column(String, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=1)
+    # LQIP (data URI de unos pocos px) generado junto con las variantes
+    placeholder = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class AssetVariant(Base):
+    """Variante pre-generada (ancho x formato) de un asset, para armar srcset."""
+    __tablename__ = "asset_variants"
+    __table_args__ = (
+        UniqueConstraint("asset_id", "width", "format", name="uq_asset_variants_asset_width_format"),
+        _TABLE_ARGS,
+    )
+
+    asset_fk = f"{DB_SCHEMA}.assets.id" if not IS_SQLITE else "assets.id"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    asset_id = Column(Integer, ForeignKey(asset_fk, ondelete="CASCADE"), nullable=False, index=True)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    format = Column(String(16), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,8 +1,9 @@
 
 # app/models/content.py
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from app.core.db import Base, DB_SCHEMA, IS_SQLITE
 
@@ -26,7 +27,12 @@ class ContentType(Base):
 
 class Entry(Base):
     __tablename__ = "entries"
-    __table_args__ = _TABLE_ARGS
+    # Índice para paginación keyset de delivery/preview:
+    # WHERE status/content_type_id ... ORDER BY created_at DESC, id DESC
+    __table_args__ = (
+        Index("ix_entries_status_ct_created_id", "status", "content_type_id", "created_at", "id"),
+        _TABLE_ARGS,
+    )
     id = Column(String, primary_key=True)
     # En Postgres con esquemas, el FK debe incluir el esquema; en SQLite no.
     content_type_fk = (
@@ -35,10 +41,48 @@ class Entry(Base):
     content_type_id = Column(String, ForeignKey(content_type_fk), nullable=False, index=True)
     title = Column(String, nullable=True)
     status = Column(String, default="DRAFT")  # DRAFT | PUBLISHED | ARCHIVED
-    fields = Column(SQLiteJSON, nullable=False, default=dict)  # values by fieldId
+    # JSONB en Postgres: operadores/índices GIN y de expresión (ver services/field_query)
+    fields = Column(SQLiteJSON().with_variant(JSONB(), "postgresql"), nullable=False, default=dict)  # values by fieldId
     created_by = Column(String, nullable=False)
     updated_by = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     content_type = relationship("ContentType", back_populates="entries")
+
+
+class PublishedEntry(Base):
+    """Snapshot materializado de una entry publicada (JSON ya serializado).
+    Lo escribe el pipeline de publicación y lo sirve el Delivery API sin hidratar el ORM.
+    """
+    __tablename__ = "published_entries"
+    __table_args__ = (
+        Index("ix_published_entries_ct_created_id", "content_type_id", "created_at", "entry_id"),
+        Index("ix_published_entries_created_id", "created_at", "entry_id"),
+        _TABLE_ARGS,
+    )
+    entry_id = Column(String, primary_key=True)
+    content_type_id = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    published_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    payload = Column(Text, nullable=False)
+
+
+class EntryRevision(Base):
+    """Historial de una entry: cada REVISION_CHECKPOINT_EVERY versiones un checkpoint con el
+    documento completo (title/status/fields); en medio, el patch RFC 6902 desde la versión anterior.
+    Ver services/revision_service.
+    """
+    __tablename__ = "entry_revisions"
+    __table_args__ = (
+        # También sirve al rango checkpoint..n de la reconstrucción y al max(version)
+        UniqueConstraint("entry_id", "version", name="uq_entry_revisions_entry_version"),
+        _TABLE_ARGS,
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entry_id = Column(String, nullable=False)
+    version = Column(Integer, nullable=False)
+    kind = Column(String(16), nullable=False)  # checkpoint | patch
+    data = Column(Text, nullable=False)  # JSON: documento o lista de operaciones
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
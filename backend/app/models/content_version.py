@@ -0,0 +1,17 @@
+# backend/app/models/content_version.py
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from app.core.db import Base, DB_SCHEMA, IS_SQLITE
+
+_TABLE_ARGS = {} if IS_SQLITE else {"schema": DB_SCHEMA}
+
+class ContentVersion(Base):
+    """Contador de versión por ámbito ("delivery", "preview", "theme").
+    Se incrementa en cada escritura y alimenta ETag/Last-Modified de las lecturas públicas.
+    """
+    __tablename__ = "content_versions"
+    __table_args__ = _TABLE_ARGS
+
+    scope = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -2,24 +2,24 @@
 from __future__ import annotations
 
 import os
-import uuid
 from datetime import datetime, date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, UploadFile, File, Form
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.db import get_db
-from app.core.security import verify_password, create_access_token, ROLE_MAP_INT2STR
-from app.models.user import User
-from app.services.user_service import create_user
+from app.core.uploads import MAX_AVATAR_UPLOAD_BYTES
+from app.core.rate_limit import check_login_allowed, client_ip, login_account_limiter, login_ip_limiter
+from app.core.security import hash_password_async, verify_and_update_async, create_access_token, ROLE_MAP_INT2STR
+from app.services.asset_service import store_upload, release_asset
+from app.services.user_service import create_user, get_user_by_email, save_user
+from app.services.variant_service import generate_variants
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-AVATAR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "avatars")
-os.makedirs(AVATAR_DIR, exist_ok=True)
-
 
 def _calc_age(b: date) -> float:
     return (date.today() - b).days / 365.25
@@ -27,6 +27,7 @@ def _calc_age(b: date) -> float:
 
 @router.post("/register")
 async def register(
+    background_tasks: BackgroundTasks,
     full_name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -36,8 +37,8 @@ async def register(
     avatar: Optional[UploadFile] = File(None),
     db: Session = Depends(get_db),
 ):
-    # Email ya registrado
-    existing = db.query(User).filter(User.email == email).first()
+    # Email ya registrado (la Session es síncrona: sus consultas van al threadpool)
+    existing = await run_in_threadpool(get_user_by_email, db, email)
     if existing:
         raise HTTPException(status_code=400, detail="El email ya está registrado.")
 
@@ -58,33 +59,39 @@ async def register(
     if gender_norm not in allowed_genders:
         gender_norm = "prefer_not_to_say"
 
+    # Hash en el pool de procesos (antes del avatar: si falla no queda nada que liberar)
+    password_hash = await hash_password_async(password)
+
     # Manejo de avatar (opcional)
     avatar_url: Optional[str] = None
     if avatar is not None:
         ext = os.path.splitext(avatar.filename)[1].lower()
         if ext not in {".jpg", ".jpeg", ".png"}:
             raise HTTPException(status_code=400, detail="Tipo de imagen inválido. Usa JPG o PNG.")
-        # Guardar archivo
-        file_id = uuid.uuid4().hex
-        filename = f"{file_id}{ext}"
-        file_path = os.path.join(AVATAR_DIR, filename)
-        content = await avatar.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-        avatar_url = f"/uploads/avatars/{filename}"
+        # Guardar archivo (nombre = sha256 del contenido; duplicados comparten blob)
+        stored = await store_upload(avatar, "avatars", MAX_AVATAR_UPLOAD_BYTES, uploaded_by=email.lower())
+        avatar_url = f"/uploads/avatars/{stored.filename}"
+        background_tasks.add_task(generate_variants, stored.id)
 
     # Crear usuario
-    user = create_user(
-        db=db,
-        email=email,
-        password=password,
-        role_id=2,
-        full_name=full_name,
-        phone=phone,
-        birthdate=parsed_birthdate,
-        gender=gender_norm,
-        profile_image=avatar_url,
-    )
+    try:
+        user = await run_in_threadpool(
+            create_user,
+            db=db,
+            email=email,
+            password_hash=password_hash,
+            role_id=2,
+            full_name=full_name,
+            phone=phone,
+            birthdate=parsed_birthdate,
+            gender=gender_norm,
+            profile_image=avatar_url,
+        )
+    except Exception:
+        # No dejar la referencia al avatar si el usuario no se creó
+        if avatar_url:
+            await release_asset("avatars", stored.filename)
+        raise
 
     return JSONResponse(
         status_code=201,
@@ -111,29 +118,25 @@ class LoginDTO(BaseModel):
     password: str
 
 @router.post("/login")
-def login(payload: LoginDTO, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email.lower()).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Credenciales inválidas")
-
-    ok = False
-    try:
-        ok = verify_password(payload.password, user.password)
-    except Exception:
-        ok = False
-
-    if not ok:
-        # Fallback para hashes antiguos en bcrypt
-        try:
-            from passlib.context import CryptContext
-            if user.password.startswith("$2a$") or user.password.startswith("$2b$") or user.password.startswith("$2y$"):
-                bcrypt_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
-                ok = bcrypt_ctx.verify(payload.password, user.password)
-        except Exception:
-            ok = False
-
+async def login(payload: LoginDTO, request: Request, db: Session = Depends(get_db)):
+    account = payload.email.lower()
+    ip = client_ip(request)
+    # Throttling antes de tocar el pool de hashing
+    check_login_allowed(ip, account)
+    login_ip_limiter.hit(ip)
+
+    # La Session es síncrona: sus consultas van al threadpool, no al event loop
+    user = await run_in_threadpool(get_user_by_email, db, account)
+    # Verificación en el pool de procesos; una sola pasada para cualquier esquema
+    ok, new_hash = await verify_and_update_async(payload.password, user.password) if user else (False, None)
     if not ok:
+        login_account_limiter.hit(account)
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
+    login_account_limiter.reset(account)
+    if new_hash:
+        # Hash heredado (bcrypt / menos rounds): se migra al esquema actual en este mismo request
+        user.password = new_hash
+        await run_in_threadpool(save_user, db, user)
 
     token = create_access_token(subject=user.email, role_id=user.role_id or 2)
     role_name = ROLE_MAP_INT2STR.get(user.role_id or 2, "employee")
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
-from typing import Optional
+import hashlib
+import json
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy import or_, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
-from app.models.api_key import ApiKey
-from app.models.content import ContentType, Entry
+from app.core.db import get_async_db
+from app.core.pagination import clamp_limit, encode_cursor, decode_cursor, encode_offset_cursor, decode_offset_cursor
+from app.core.http_cache import (
+    DELIVERY_CACHE_CONTROL, PREVIEW_CACHE_CONTROL, make_etag, cache_headers, is_not_modified, not_modified,
+)
+from app.models.content import ContentType, Entry, PublishedEntry
+from app.services.api_key_service import ResolvedKey, resolve_delivery_token, resolve_preview_token
+from app.services.include_service import INCLUDE_MAX_DEPTH, resolve_includes
+from app.services.search_service import ranked_matches
+from app.services.snapshot_service import entry_to_payload
+from app.services.field_query import build_field_filters, build_field_order, has_field_params
+from app.services.variant_service import assets_with_variants
+from app.services.version_service import get_version_async, DELIVERY, PREVIEW
 
 
 delivery_router = APIRouter(prefix="/delivery", tags=["delivery"])
@@ -27,10 +39,10 @@ def _extract_bearer(auth_header: Optional[str]) -> Optional[str]:
     return None
 
 
-def _validate_delivery(db: Session, token: Optional[str], space_id: Optional[str]) -> ApiKey:
+async def _validate_delivery(db: AsyncSession, token: Optional[str], space_id: Optional[str]) -> ResolvedKey:
     if not token:
         raise HTTPException(status_code=401, detail="Missing delivery token")
-    key = db.query(ApiKey).filter(ApiKey.delivery_token == token).first()
+    key = await resolve_delivery_token(db, token)
     if not key:
         raise HTTPException(status_code=401, detail="Invalid delivery token")
     if space_id and key.space_id and key.space_id != space_id:
@@ -38,10 +50,10 @@ def _validate_delivery(db: Session, token: Optional[str], space_id: Optional[str
     return key
 
 
-def _validate_preview(db: Session, token: Optional[str], space_id: Optional[str]) -> ApiKey:
+async def _validate_preview(db: AsyncSession, token: Optional[str], space_id: Optional[str]) -> ResolvedKey:
     if not token:
         raise HTTPException(status_code=401, detail="Missing preview token")
-    key = db.query(ApiKey).filter(ApiKey.preview_token == token).first()
+    key = await resolve_preview_token(db, token)
     if not key:
         raise HTTPException(status_code=401, detail="Invalid preview token")
     if space_id and key.space_id and key.space_id != space_id:
@@ -49,73 +61,270 @@ def _validate_preview(db: Session, token: Optional[str], space_id: Optional[str]
     return key
 
 
+async def _conditional(request: Request, db: AsyncSession, scope: str, space_id: str) -> tuple[dict, bool]:
+    """Calcula ETag/Last-Modified desde la versión del ámbito (sin tocar el contenido).
+    Devuelve (headers, not_modified)."""
+    version, updated_at = await get_version_async(db, scope)
+    query = sorted(request.query_params.multi_items())
+    etag = make_etag(scope, version, space_id, request.url.path, query)
+    if scope == DELIVERY:
+        headers = cache_headers(etag, updated_at, DELIVERY_CACHE_CONTROL, vary="Authorization, X-Delivery-Token")
+    else:
+        headers = cache_headers(etag, updated_at, PREVIEW_CACHE_CONTROL, vary="Authorization, X-Preview-Token")
+    return headers, is_not_modified(request, etag, updated_at)
+
+
+def _include_conditional(request: Request, headers: dict, body: bytes) -> tuple[dict, bool]:
+    """Con `include` la respuesta trae assets cuyas variantes se generan en segundo plano (fuera de la
+    versión del ámbito): el ETag sale del cuerpo y no se envía Last-Modified."""
+    headers = {k: v for k, v in headers.items() if k != "Last-Modified"}
+    headers["ETag"] = make_etag(headers["ETag"], hashlib.sha256(body).hexdigest())
+    return headers, is_not_modified(request, headers["ETag"], None)
+
+
+async def _keyset_page(db: AsyncSession, q, created_col, id_col, limit: Optional[int], cursor: Optional[str], scalars: bool = False):
+    """Pagina por keyset sobre (created_at, id) descendente, sin OFFSET ni sort completo."""
+    limit = clamp_limit(limit)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        q = q.where(or_(
+            created_col < created_at,
+            and_(created_col == created_at, id_col < last_id),
+        ))
+    result = await db.execute(q.order_by(created_col.desc(), id_col.desc()).limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+    return items, limit, next_cursor
+
+
+async def _offset_page(db: AsyncSession, q, order_by, created_col, id_col, limit: Optional[int], cursor: Optional[str], scalars: bool = False):
+    """Paginación por posición para órdenes por campo; (created_at, id) desempata."""
+    limit = clamp_limit(limit)
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    result = await db.execute(
+        q.order_by(order_by, created_col.desc(), id_col.desc()).offset(offset).limit(limit + 1)
+    )
+    rows = result.scalars().all() if scalars else result.all()
+    next_cursor = encode_offset_cursor(offset + limit) if len(rows) > limit else None
+    return rows[:limit], limit, next_cursor
+
+
+async def _page(db: AsyncSession, q, created_col, id_col, limit: Optional[int], cursor: Optional[str], order_by=None, scalars: bool = False):
+    if order_by is None:
+        return await _keyset_page(db, q, created_col, id_col, limit, cursor, scalars=scalars)
+    return await _offset_page(db, q, order_by, created_col, id_col, limit, cursor, scalars=scalars)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+async def _paginate_entries(db: AsyncSession, q, limit: Optional[int], cursor: Optional[str], order_by=None, include: int = 0):
+    items, limit, next_cursor = await _page(db, q, Entry.created_at, Entry.id, limit, cursor, order_by, scalars=True)
+    if not include:
+        return {"items": items, "limit": limit, "next_cursor": next_cursor}
+    payloads = [entry_to_payload(e) for e in items]
+    includes = await resolve_includes(db, payloads, PREVIEW, include)
+    body = _dumps({"items": payloads, "limit": limit, "next_cursor": next_cursor, "includes": includes})
+    return Response(content=body.encode("utf-8"), media_type="application/json")
+
+
+async def _paginate_snapshots(db: AsyncSession, q, limit: Optional[int], cursor: Optional[str], order_by=None, include: int = 0) -> Response:
+    """Página de delivery armada con los JSON ya serializados del snapshot, sin pasar por el ORM."""
+    items, limit, next_cursor = await _page(db, q, PublishedEntry.created_at, PublishedEntry.entry_id, limit, cursor, order_by)
+    body = (
+        '{"items":[' + ",".join(row.payload for row in items) + "],"
+        + f'"limit":{limit},"next_cursor":{json.dumps(next_cursor)}'
+    )
+    if include:
+        # Sólo con include se parsean los snapshots (para seguir sus enlaces)
+        includes = await resolve_includes(db, [json.loads(row.payload) for row in items], DELIVERY, include)
+        body += ',"includes":' + _dumps(includes)
+    return Response(content=(body + "}").encode("utf-8"), media_type="application/json")
+
+
+def _field_query(request: Request, ct: Optional[ContentType], order: Optional[str]):
+    """Filtros `fields.*` y `order` -> (cláusulas WHERE, ORDER BY). Requieren content_type_id."""
+    params = request.query_params.multi_items()
+    if not has_field_params(params) and not order:
+        return [], None
+    if ct is None:
+        raise HTTPException(status_code=400, detail="Field filters and order require content_type_id")
+    return build_field_filters(ct.schema, params), build_field_order(ct.schema, order)
+
+
+def _empty_page(limit: Optional[int], include: int = 0) -> dict:
+    page = {"items": [], "limit": clamp_limit(limit), "next_cursor": None}
+    if include:
+        page["includes"] = {"Entry": [], "Asset": []}
+    return page
+
+
+async def _find_content_type(db: AsyncSession, content_type_id: str) -> Optional[ContentType]:
+    # Aceptar tanto el id real como el api_id del ContentType
+    result = await db.execute(
+        select(ContentType)
+        .where(or_(ContentType.id == content_type_id, ContentType.api_id == content_type_id))
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def _list_content_types(db: AsyncSession):
+    result = await db.execute(select(ContentType).order_by(ContentType.created_at.desc()))
+    return result.scalars().all()
+
+
 @delivery_router.get("/{space_id}/content_types")
-def delivery_list_content_types(
+async def delivery_list_content_types(
     space_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
     x_delivery_token: Optional[str] = Header(default=None, alias="X-Delivery-Token"),
 ):
     token = x_delivery_token or _extract_bearer(authorization)
-    _validate_delivery(db, token, space_id)
-    return db.query(ContentType).order_by(ContentType.created_at.desc()).all()
+    await _validate_delivery(db, token, space_id)
+    headers, fresh = await _conditional(request, db, DELIVERY, space_id)
+    if fresh:
+        return not_modified(headers)
+    response.headers.update(headers)
+    return await _list_content_types(db)
 
 
 @delivery_router.get("/{space_id}/entries")
-def delivery_list_entries(
+async def delivery_list_entries(
     space_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     content_type_id: Optional[str] = Query(default=None, description="Puede ser el id o el api_id del ContentType"),
+    limit: Optional[int] = Query(default=None, ge=1, description="Tamaño de página (por defecto y máximo configurables)"),
+    cursor: Optional[str] = Query(default=None, description="Cursor opaco `next_cursor` de la página anterior"),
+    order: Optional[str] = Query(default=None, description="`fields.<id>` ascendente o `-fields.<id>` descendente"),
+    query: Optional[str] = Query(default=None, description="Búsqueda full-text; sin `order`, resultados por relevancia"),
+    include: int = Query(default=0, ge=0, le=INCLUDE_MAX_DEPTH, description="Niveles de enlaces (entries/assets) a resolver en `includes`"),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
     x_delivery_token: Optional[str] = Header(default=None, alias="X-Delivery-Token"),
 ):
     token = x_delivery_token or _extract_bearer(authorization)
-    _validate_delivery(db, token, space_id)
-    q = db.query(Entry).filter(Entry.status == "PUBLISHED")
+    await _validate_delivery(db, token, space_id)
+    headers, fresh = await _conditional(request, db, DELIVERY, space_id)
+    if fresh and not include:
+        return not_modified(headers)
+    response.headers.update(headers)
+    ct = None
     if content_type_id:
-        # Aceptar tanto el id real como el api_id del ContentType
-        ct = (
-            db.query(ContentType)
-            .filter(or_(ContentType.id == content_type_id, ContentType.api_id == content_type_id))
-            .first()
-        )
+        ct = await _find_content_type(db, content_type_id)
         if not ct:
-            # Si no existe ese ContentType, devolver lista vacía
-            return []
-        q = q.filter(Entry.content_type_id == ct.id)
-    return q.order_by(Entry.created_at.desc()).all()
+            # Si no existe ese ContentType, devolver página vacía
+            return _empty_page(limit, include)
+    filters, order_by = _field_query(request, ct, order)
+    # Se sirve desde el snapshot materializado (sólo contiene entries publicadas)
+    q = select(PublishedEntry.entry_id, PublishedEntry.created_at, PublishedEntry.payload)
+    if ct:
+        q = q.where(PublishedEntry.content_type_id == ct.id)
+    if filters or order_by is not None:
+        # Filtra sobre entries.fields (mismo contenido que el snapshot publicado) con los índices por campo
+        q = q.join(Entry, Entry.id == PublishedEntry.entry_id).where(Entry.content_type_id == ct.id, *filters)
+    if query:
+        matches = ranked_matches(query)
+        if matches is None:
+            return _empty_page(limit, include)
+        q = q.join(matches, matches.c.entry_id == PublishedEntry.entry_id)
+        if order_by is None:
+            order_by = matches.c.rank.desc()
+    page = await _paginate_snapshots(db, q, limit, cursor, order_by, include)
+    if include:
+        headers, fresh = _include_conditional(request, headers, page.body)
+        if fresh:
+            return not_modified(headers)
+    page.headers.update(headers)
+    return page
+
+
+@delivery_router.get("/{space_id}/assets")
+async def delivery_list_assets(
+    space_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    filename: List[str] = Query(..., description="Nombres de archivo (repetible: ?filename=a.png&filename=b.jpg)"),
+    store: Literal["images", "avatars"] = Query(default="images"),
+    authorization: Optional[str] = Header(default=None, alias="Authorization"),
+    x_delivery_token: Optional[str] = Header(default=None, alias="X-Delivery-Token"),
+):
+    """Metadatos de imágenes para el front: URL original, placeholder LQIP, variantes y srcset por formato."""
+    token = x_delivery_token or _extract_bearer(authorization)
+    await _validate_delivery(db, token, space_id)
+    if len(filename) > 100:
+        raise HTTPException(status_code=400, detail="Máximo 100 archivos por petición")
+    items = await assets_with_variants(db, store, filename)
+    # Las variantes se generan en segundo plano: el ETag sale del propio payload
+    etag = make_etag("assets", space_id, store, json.dumps(items, sort_keys=True))
+    headers = cache_headers(etag, None, DELIVERY_CACHE_CONTROL, vary="Authorization, X-Delivery-Token")
+    if is_not_modified(request, etag, None):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return {"items": items}
 
 
 @preview_router.get("/{space_id}/content_types")
-def preview_list_content_types(
+async def preview_list_content_types(
     space_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
     x_preview_token: Optional[str] = Header(default=None, alias="X-Preview-Token"),
 ):
     token = x_preview_token or _extract_bearer(authorization)
-    _validate_preview(db, token, space_id)
-    return db.query(ContentType).order_by(ContentType.created_at.desc()).all()
+    await _validate_preview(db, token, space_id)
+    headers, fresh = await _conditional(request, db, PREVIEW, space_id)
+    if fresh:
+        return not_modified(headers)
+    response.headers.update(headers)
+    return await _list_content_types(db)
 
 
 @preview_router.get("/{space_id}/entries")
-def preview_list_entries(
+async def preview_list_entries(
     space_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     content_type_id: Optional[str] = Query(default=None, description="Puede ser el id o el api_id del ContentType"),
+    limit: Optional[int] = Query(default=None, ge=1, description="Tamaño de página (por defecto y máximo configurables)"),
+    cursor: Optional[str] = Query(default=None, description="Cursor opaco `next_cursor` de la página anterior"),
+    order: Optional[str] = Query(default=None, description="`fields.<id>` ascendente o `-fields.<id>` descendente"),
+    include: int = Query(default=0, ge=0, le=INCLUDE_MAX_DEPTH, description="Niveles de enlaces (entries/assets) a resolver en `includes`"),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
     x_preview_token: Optional[str] = Header(default=None, alias="X-Preview-Token"),
 ):
     token = x_preview_token or _extract_bearer(authorization)
-    _validate_preview(db, token, space_id)
-    q = db.query(Entry)
+    await _validate_preview(db, token, space_id)
+    headers, fresh = await _conditional(request, db, PREVIEW, space_id)
+    if fresh and not include:
+        return not_modified(headers)
+    response.headers.update(headers)
+    ct = None
     if content_type_id:
-        ct = (
-            db.query(ContentType)
-            .filter(or_(ContentType.id == content_type_id, ContentType.api_id == content_type_id))
-            .first()
-        )
+        ct = await _find_content_type(db, content_type_id)
         if not ct:
-            return []
-        q = q.filter(Entry.content_type_id == ct.id)
-    return q.order_by(Entry.created_at.desc()).all()
\ No newline at end of file
+            return _empty_page(limit, include)
+    filters, order_by = _field_query(request, ct, order)
+    q = select(Entry)
+    if ct:
+        q = q.where(Entry.content_type_id == ct.id, *filters)
+    page = await _paginate_entries(db, q, limit, cursor, order_by, include)
+    if include:
+        headers, fresh = _include_conditional(request, headers, page.body)
+        if fresh:
+            return not_modified(headers)
+        page.headers.update(headers)
+    return page
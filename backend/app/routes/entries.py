@@ -1,35 +1,110 @@
 
 # app/routes/entries.py
-from fastapi import APIRouter, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from app.core.db import get_async_db
+from app.services.bulk_service import batch_transition, export_ndjson, import_ndjson
 from app.services.content_service import ContentService
-from app.dto.entry_dto import EntryCreateDTO, EntryUpdateDTO
+from app.dto.entry_dto import EntryBatchDTO, EntryCreateDTO, EntryUpdateDTO, Status
 from app.core.auth import get_current_user
 
 router = APIRouter(prefix="/entries", tags=["entries"])
 
 @router.get("")
-def list_entries(content_type_id: Optional[str] = Query(None), service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
-    return service.list_entries(current_user["email"], content_type_id)
+async def list_entries(content_type_id: Optional[str] = Query(None), service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    return await service.list_entries(current_user["email"], content_type_id)
+
+@router.get("/search")
+async def search_entries(
+    q: str = Query(..., min_length=1, description="Texto a buscar en el título y los campos de texto"),
+    content_type_id: Optional[str] = Query(None),
+    status: Optional[Status] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
+    service: ContentService = Depends(),
+    current_user: dict = Depends(get_current_user),
+):
+    # Declarada antes de /{id} para que "search" no se tome como id
+    return await service.search_entries(q, content_type_id, status, limit, cursor)
+
+@router.post("/bulk")
+async def bulk_import_entries(request: Request, db: AsyncSession = Depends(get_async_db), current_user: dict = Depends(get_current_user)):
+    """Crea entries desde NDJSON (una entry por línea, campos de EntryCreateDTO + `status` opcional).
+    Se procesa en lotes con un commit por lote; los errores se reportan por número de línea."""
+    return await import_ndjson(db, request.stream(), current_user["email"])
+
+@router.get("/export")
+async def export_entries(
+    content_type_id: Optional[str] = Query(None),
+    status: Optional[Status] = Query(None),
+    service: ContentService = Depends(),
+    current_user: dict = Depends(get_current_user),
+):
+    """Todas las entries (o las filtradas) en NDJSON, en streaming; reimportable con POST /entries/bulk"""
+    if content_type_id:
+        await service.get_type(content_type_id)
+    return StreamingResponse(
+        export_ndjson(content_type_id, status),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="entries.ndjson"'},
+    )
+
+@router.post("/batch/{action}")
+async def batch_status_entries(
+    action: Literal["publish", "unpublish", "archive"],
+    payload: EntryBatchDTO,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Publica / despublica / archiva varias entries (por `ids` o `filter`) en una transacción"""
+    # Declarada antes de /{id}/publish para que "batch" no se tome como id
+    return await batch_transition(db, action, payload.ids, payload.filter, current_user["email"])
 
 @router.get("/{id}")
-def get_entry(id: str, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+async def get_entry(id: str, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
     # Permitir lectura del detalle para cualquier usuario; escritura sigue protegida en el servicio
-    obj = service.get_entry(id)
+    obj = await service.get_entry(id)
     return obj
 
+@router.get("/{id}/versions")
+async def list_entry_versions(
+    id: str,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
+    service: ContentService = Depends(),
+    current_user: dict = Depends(get_current_user),
+):
+    """Historial de versiones (la más reciente primero)"""
+    return await service.list_versions(id, limit, cursor)
+
+@router.get("/{id}/versions/{version}")
+async def get_entry_version(id: str, version: int = Path(..., ge=1), service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    """Documento (title/status/fields) de la entry en esa versión"""
+    return await service.get_version(id, version)
+
+@router.post("/{id}/versions/{version}/restore")
+async def restore_entry_version(id: str, version: int = Path(..., ge=1), service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    """Restaura title/fields de una versión anterior (crea una versión nueva)"""
+    return await service.restore_version(id, version, current_user["email"])
+
 @router.post("")
-def create_entry(payload: EntryCreateDTO, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
-    return service.create_entry(payload, current_user["email"])
+async def create_entry(payload: EntryCreateDTO, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    return await service.create_entry(payload, current_user["email"])
 
 @router.put("/{id}")
-def update_entry(id: str, payload: EntryUpdateDTO, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
-    return service.update_entry(id, payload, current_user["email"])
+async def update_entry(id: str, payload: EntryUpdateDTO, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    return await service.update_entry(id, payload, current_user["email"])
 
 @router.post("/{id}/publish")
-def publish_entry(id: str, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
-    return service.publish_entry(id, current_user["email"])
+async def publish_entry(id: str, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    return await service.publish_entry(id, current_user["email"])
+
+@router.post("/{id}/unpublish")
+async def unpublish_entry(id: str, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    return await service.unpublish_entry(id, current_user["email"])
 
 @router.delete("/{id}")
-def delete_entry(id: str, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
-    return service.delete_entry(id, current_user["email"])
+async def delete_entry(id: str, service: ContentService = Depends(), current_user: dict = Depends(get_current_user)):
+    return await service.delete_entry(id, current_user["email"])
@@ -1,58 +1,144 @@
 # backend/app/routes/images.py
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
-import shutil
-import uuid
-from typing import List
+import re
+from typing import List, Literal, Optional
 
-from app.core.db import get_db
+from PIL import Image, UnidentifiedImageError
 
-router = APIRouter(prefix="/images", tags=["images"])
+from app.core.auth import get_optional_user
+from app.core.db import get_async_db
+from app.core.http_cache import IMAGE_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL
+from app.core.static_files import HASHED_NAME_RE
+from app.core.storage import storage
+from app.core.uploads import MAX_IMAGE_UPLOAD_BYTES
+from app.models.asset import Asset
+from app.services.asset_service import list_assets, store_upload, release_asset
+from app.services.image_service import MAX_IMAGE_DIMENSION, DEFAULT_IMAGE_QUALITY, default_format, derived_image
+from app.services.image_transform import OUTPUT_FORMATS, TransformParams
+from app.services.variant_service import generate_variants
 
-# Directorio para almacenar imágenes
-IMAGES_DIR = "uploads/images"
-os.makedirs(IMAGES_DIR, exist_ok=True)
+router = APIRouter(prefix="/images", tags=["images"])
 
 @router.post("/upload")
-async def upload_image(file: UploadFile = File(...)):
+async def upload_image(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: Optional[dict] = Depends(get_optional_user),
+):
     """Sube una imagen al servidor"""
-    if not file.content_type.startswith("image/"):
+    if not (file.content_type or "").startswith("image/"):
         raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
     
-    # Generar nombre único para la imagen
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(IMAGES_DIR, unique_filename)
-    
-    # Guardar la imagen
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Nombre = sha256 del contenido: subir la misma imagen otra vez no ocupa disco
+    uploaded_by = current_user["email"] if current_user else None
+    stored = await store_upload(file, "images", MAX_IMAGE_UPLOAD_BYTES, uploaded_by=uploaded_by)
+    # Variantes de srcset y placeholder en segundo plano (no demora la respuesta)
+    background_tasks.add_task(generate_variants, stored.id)
     
     return {
-        "filename": unique_filename,
-        "url": f"/static/images/{unique_filename}"
+        "filename": stored.filename,
+        "url": f"/static/images/{stored.filename}",
+        "size": stored.size,
+        "sha256": stored.sha256,
+        "deduplicated": stored.deduplicated,
+    }
+
+def _catalogue_item(asset: Asset) -> dict:
+    return {
+        "filename": asset.filename,
+        "url": f"/static/images/{asset.filename}",
+        "size": asset.size,
+        "mime": asset.mime,
+        "width": asset.width,
+        "height": asset.height,
+        "sha256": asset.sha256,
+        "uploaded_by": asset.uploaded_by,
+        "references": asset.ref_count,
+        "created_at": asset.created_at,
     }
 
 @router.get("/list")
-async def list_images():
-    """Lista todas las imágenes disponibles"""
-    images = []
-    for filename in os.listdir(IMAGES_DIR):
-        if os.path.isfile(os.path.join(IMAGES_DIR, filename)):
-            images.append({
-                "filename": filename,
-                "url": f"/static/images/{filename}"
-            })
-    return images
+async def list_images(
+    db: AsyncSession = Depends(get_async_db),
+    mime: Optional[str] = Query(None, description="Tipo exacto (`image/png`) o familia (`image/*`)"),
+    sort: Optional[str] = Query(None, description="created_at, size, filename o width; prefijo `-` = descendente (por defecto `-created_at`)"),
+    limit: Optional[int] = Query(None, ge=1, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco `next_cursor` de la página anterior"),
+):
+    """Catálogo paginado de imágenes (tabla assets; `python reconcile_assets.py` indexa archivos previos)"""
+    items, limit, next_cursor = await list_assets(db, "images", mime, sort, limit, cursor)
+    return {"items": [_catalogue_item(a) for a in items], "limit": limit, "next_cursor": next_cursor}
+
+def _check_name(filename: str) -> str:
+    if os.path.basename(filename) != filename or filename.startswith("."):
+        raise HTTPException(status_code=400, detail="Nombre de archivo inválido")
+    return filename
+
+def transform_query(
+    w: Optional[int] = Query(None, ge=1, le=MAX_IMAGE_DIMENSION, description="Ancho máximo en px"),
+    h: Optional[int] = Query(None, ge=1, le=MAX_IMAGE_DIMENSION, description="Alto máximo en px"),
+    fm: Optional[str] = Query(None, description="Formato de salida: jpg, png, webp (avif si está disponible)"),
+    q: int = Query(DEFAULT_IMAGE_QUALITY, ge=1, le=100, description="Calidad (jpg/webp/avif)"),
+    fit: Literal["fit", "fill", "pad", "scale"] = Query("fit", description="Cómo encajar en w x h"),
+    bg: Optional[str] = Query(None, description="Color de relleno `rgb:RRGGBB` (pad / transparencias en jpg)"),
+) -> Optional[dict]:
+    """Parámetros de transformación validados; None si se pide el original."""
+    if fm is not None and fm not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato no soportado: {fm}")
+    if bg is not None and not re.match(r"^rgb:[0-9a-fA-F]{6}$", bg):
+        raise HTTPException(status_code=400, detail="bg debe tener la forma rgb:RRGGBB")
+    if not (w or h or fm):
+        return None
+    return {"w": w, "h": h, "fm": fm, "q": q, "fit": fit, "bg": f"#{bg[4:]}" if bg else "#ffffff"}
+
+async def _serve_image(store: str, filename: str, transform: Optional[dict]):
+    _check_name(filename)
+    cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.match(filename) else IMAGE_CACHE_CONTROL
+    if transform is None:
+        external = storage.url(store, filename)
+        if external:
+            # Bucket remoto: el cliente baja el original directo de ahí
+            return RedirectResponse(external, status_code=307)
+    try:
+        source_path = await storage.local_path(store, filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    if transform is None:
+        return FileResponse(source_path, headers={"Cache-Control": cache_control})
+    params = TransformParams(**{**transform, "fm": transform["fm"] or default_format(filename)})
+    try:
+        path = await derived_image(source_path, filename, params)
+    except Image.DecompressionBombError:
+        # No es subclase de OSError/ValueError
+        raise HTTPException(status_code=413, detail="La imagen tiene demasiados píxeles para transformarla")
+    except (UnidentifiedImageError, OSError, ValueError):
+        raise HTTPException(status_code=400, detail="No se pudo procesar la imagen")
+    return FileResponse(path, media_type=OUTPUT_FORMATS[params.fm][2], headers={"Cache-Control": cache_control})
+
+@router.get("/avatars/{filename}")
+async def get_avatar_image(filename: str, transform: Optional[dict] = Depends(transform_query)):
+    """Avatar original o transformado (mismos parámetros que /images/{filename})"""
+    return await _serve_image("avatars", filename, transform)
+
+@router.get("/{filename}")
+async def get_image(filename: str, transform: Optional[dict] = Depends(transform_query)):
+    """Sirve la imagen original o una variante redimensionada/convertida (cacheada en disco)"""
+    return await _serve_image("images", filename, transform)
 
 @router.delete("/{filename}")
 async def delete_image(filename: str):
-    """Elimina una imagen del servidor"""
-    file_path = os.path.join(IMAGES_DIR, filename)
-    if not os.path.exists(file_path):
+    """Elimina una referencia a la imagen; el archivo se borra cuando no quedan referencias"""
+    _check_name(filename)
+    remaining = await release_asset("images", filename)
+    if remaining is not None:
+        return {"message": "Imagen eliminada correctamente", "references": remaining}
+    
+    # Imágenes previas al store direccionado por contenido (sin fila en assets)
+    if not await storage.exists("images", filename):
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
     
-    os.remove(file_path)
-    return {"message": "Imagen eliminada correctamente"}
\ No newline at end of file
+    await storage.delete("images", filename)
+    return {"message": "Imagen eliminada correctamente", "references": 0}
\ No newline at end of file
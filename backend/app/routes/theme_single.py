@@ -2,11 +2,15 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Request, Response
+from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
-from app.models.theme import Theme
+from app.core.http_cache import THEME_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, make_etag, cache_headers, is_not_modified, not_modified
+from app.services.version_service import bump_versions, get_version, THEME
+from app.services.theme_service import get_active_theme
+from app.services.theme_css import current_theme_css, theme_css_by_hash, invalidate_theme_css
 
 from pydantic import BaseModel
 
@@ -24,21 +28,17 @@ class ThemeUpdateDTO(BaseModel):
     mode: Optional[str] = None
 
 
-def _get_active_theme(db: Session) -> Theme:
-    """Obtiene el tema activo (primer registro) o crea uno por defecto."""
-    t = db.query(Theme).order_by(Theme.id.asc()).first()
-    if not t:
-        t = Theme()
-        db.add(t)
-        db.commit()
-        db.refresh(t)
-    return t
-
-
 @router.get("/theme")
-def get_theme(db: Session = Depends(get_db)):
-    """Devuelve el tema activo único para toda la web."""
-    return _get_active_theme(db)
+def get_theme(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Devuelve el tema activo único para toda la web.
+    Responde 304 si el cliente ya tiene la versión vigente (ETag/Last-Modified)."""
+    version, updated_at = get_version(db, THEME)
+    etag = make_etag(THEME, version)
+    headers = cache_headers(etag, updated_at, THEME_CACHE_CONTROL)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return get_active_theme(db)
 
 
 @router.put("/theme")
@@ -59,81 +59,78 @@ def update_theme(
         if not key_obj:
             raise HTTPException(status_code=401, detail="Invalid API key")
 
-    t = _get_active_theme(db)
+    t = get_active_theme(db)
     update_data = payload.model_dump(exclude_unset=True)
     for k, v in update_data.items():
         setattr(t, k, v)
+    bump_versions(db, THEME)
     db.commit()
     db.refresh(t)
+    invalidate_theme_css()
     return t
 
 
+_CSS_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET",
+    "Access-Control-Allow-Headers": "*",
+}
+
+
+def _css_url(css_hash: str) -> str:
+    return f"{router.prefix}/theme/{css_hash}.css"
+
+
 @router.get("/theme/css")
 def get_theme_css(db: Session = Depends(get_db)):
+    """
+    Redirige al CSS versionado del tema activo (`/api/theme/{hash}.css`).
+    La redirección no se cachea; el destino es inmutable.
+    """
+    item = current_theme_css(db)
+    return RedirectResponse(
+        url=_css_url(item.hash),
+        status_code=302,
+        headers={"Cache-Control": "no-cache", **_CSS_CORS_HEADERS},
+    )
+
+
+@router.get("/theme/css/manifest")
+def get_theme_css_manifest(db: Session = Depends(get_db)):
+    """Manifest con el hash y la URL del CSS vigente."""
+    item = current_theme_css(db)
+    return JSONResponse(
+        content={"hash": item.hash, "url": _css_url(item.hash)},
+        headers={"Cache-Control": "no-cache", **_CSS_CORS_HEADERS},
+    )
+
+
+@router.get("/theme/{css_hash}.css")
+def get_theme_css_versioned(
+    css_hash: str = Path(..., pattern=r"^[0-9a-f]{16}$"),
+    db: Session = Depends(get_db),
+):
     """
     Devuelve las variables CSS del tema activo para ser consumidas por galeriq-web.
-    Formato CSS custom properties listo para usar.
+    El contenido de cada hash nunca cambia, por lo que se sirve como inmutable.
     """
-    from fastapi.responses import Response
-    
-    theme = _get_active_theme(db)
-    
-    # Generar CSS con variables personalizadas
-    css_content = f"""/* Tema generado automáticamente desde CMS Galeriq */
-:root {{
-  --primary-color: {theme.primary_color or '#6366f1'};
-  --secondary-color: {theme.secondary_color or '#8b5cf6'};
-  --accent-color: {theme.accent_color or '#06b6d4'};
-  --background-color: {theme.background_color or '#ffffff'};
-  --text-color: {theme.text_color or '#1f2937'};
-  --theme-mode: {theme.mode or 'light'};
-}}
-
-/* Clases de utilidad para aplicar colores */
-.primary-bg {{ background-color: var(--primary-color); }}
-.secondary-bg {{ background-color: var(--secondary-color); }}
-.accent-bg {{ background-color: var(--accent-color); }}
-.primary-text {{ color: var(--primary-color); }}
-.secondary-text {{ color: var(--secondary-color); }}
-.accent-text {{ color: var(--accent-color); }}
-
-/* Estilos específicos para galeriq-web */
-.hero-section {{
-  background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-  color: white;
-}}
-
-.btn-primary {{
-  background-color: var(--primary-color);
-  border-color: var(--primary-color);
-  color: white;
-}}
-
-.btn-primary:hover {{
-  background-color: var(--accent-color);
-  border-color: var(--accent-color);
-}}
-
-.navbar {{
-  background-color: var(--background-color);
-  color: var(--text-color);
-}}
-
-.card {{
-  background-color: var(--background-color);
-  border-color: var(--primary-color);
-}}
-"""
-    
+    item = theme_css_by_hash(css_hash)
+    if item is None:
+        # Hash desconocido en este proceso: puede ser el vigente (renderizado en otro worker)
+        current = current_theme_css(db)
+        if current.hash != css_hash:
+            return RedirectResponse(
+                url=_css_url(current.hash),
+                status_code=302,
+                headers={"Cache-Control": "no-store", **_CSS_CORS_HEADERS},
+            )
+        item = current
     return Response(
-        content=css_content,
+        content=item.css,
         media_type="text/css",
         headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET",
-            "Access-Control-Allow-Headers": "*"
-        }
-    )
\ No newline at end of file
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "ETag": f'"{item.hash}"',
+            **_CSS_CORS_HEADERS,
+        },
+    )
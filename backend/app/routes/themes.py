@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.services.theme_service import ThemeService
 from app.dto.theme_dto import ThemeCreateDTO
+from app.services.theme_css import invalidate_theme_css
 from pydantic import BaseModel
 from typing import Optional
 
@@ -21,7 +22,9 @@ def list_themes(service: ThemeService = Depends()):
 
 @router.post("")
 def create_theme(payload: ThemeCreateDTO, service: ThemeService = Depends()):
-    return service.create(payload)
+    theme = service.create(payload)
+    invalidate_theme_css()
+    return theme
 
 @router.get("/{theme_id}")
 def get_theme(theme_id: int, service: ThemeService = Depends()):
@@ -38,7 +41,9 @@ def update_theme(theme_id: int, payload: ThemeUpdateDTO, service: ThemeService =
     
     # Actualizar solo los campos proporcionados
     update_data = payload.dict(exclude_unset=True)
-    return service.update(theme_id, update_data)
+    theme = service.update(theme_id, update_data)
+    invalidate_theme_css()
+    return theme
 
 @router.delete("/{theme_id}")
 def delete_theme(theme_id: int, service: ThemeService = Depends()):
@@ -47,4 +52,5 @@ def delete_theme(theme_id: int, service: ThemeService = Depends()):
         raise HTTPException(status_code=404, detail="Tema no encontrado")
     
     service.delete(theme_id)
+    invalidate_theme_css()
     return {"message": "Tema eliminado correctamente"}
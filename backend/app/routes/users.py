@@ -2,18 +2,21 @@
 from __future__ import annotations
 
 import os
-import uuid
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.db import get_db
+from app.core.uploads import MAX_AVATAR_UPLOAD_BYTES
+from app.services.asset_service import store_upload, release_asset, asset_filename_from_url
+from app.services.variant_service import generate_variants
 from app.core.auth import get_current_user, get_role
-from app.core.security import verify_password, hash_password, ROLE_MAP_INT2STR, ROLE_MAP_STR2INT
+from app.core.security import verify_password_async, hash_password_async, ROLE_MAP_INT2STR, ROLE_MAP_STR2INT
 from app.models.user import User
-from app.services.user_service import create_user
+from app.services.user_service import create_user, get_user_by_email, save_user
 from app.dto.user_dto import UserProfileUpdateDTO, PasswordChangeDTO
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -30,9 +33,12 @@ class UserCreate(BaseModel):
 
 
 @router.post("", status_code=201)
-def create_user_endpoint(payload: UserCreate, db: Session = Depends(get_db)):
+async def create_user_endpoint(payload: UserCreate, db: Session = Depends(get_db)):
+    data = payload.model_dump()
+    password_hash = await hash_password_async(data.pop("password"))
     try:
-        u = create_user(db, **payload.model_dump())
+        # La Session es síncrona: create_user (consulta + commit) va al threadpool
+        u = await run_in_threadpool(create_user, db, password_hash=password_hash, **data)
         # Devolvemos un identificador lógico (email) para consistencia con el frontend
         return {"ok": True, "id": u.email}
     except ValueError as e:
@@ -43,10 +49,7 @@ def create_user_endpoint(payload: UserCreate, db: Session = Depends(get_db)):
 
 # === Perfil del usuario autenticado ===
 
-# Directorio de avatares (alineado con auth.register)
-AVATAR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "avatars")
-os.makedirs(AVATAR_DIR, exist_ok=True)
-
+# Directorio de avatares (store "avatars", compartido con auth.register)
 
 def _user_to_payload(u: User):
     return {
@@ -120,32 +123,31 @@ def update_my_profile(payload: UserProfileUpdateDTO, db: Session = Depends(get_d
 
 
 @router.put("/me/password")
-def change_my_password(payload: PasswordChangeDTO, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    u = db.query(User).filter(User.email == current_user["email"].lower()).first()
+async def change_my_password(payload: PasswordChangeDTO, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    u = await run_in_threadpool(get_user_by_email, db, current_user["email"])
     if not u:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    if not verify_password(payload.current_password, u.password):
+    if not await verify_password_async(payload.current_password, u.password):
         raise HTTPException(status_code=400, detail="Contraseña actual incorrecta")
-    u.password = hash_password(payload.new_password)
-    db.commit()
+    u.password = await hash_password_async(payload.new_password)
+    await run_in_threadpool(db.commit)
     return {"message": "Contraseña actualizada"}
 
 
 @router.put("/me/avatar")
-async def update_my_avatar(file: UploadFile = File(...), db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    u = db.query(User).filter(User.email == current_user["email"].lower()).first()
+async def update_my_avatar(background_tasks: BackgroundTasks, file: UploadFile = File(...), db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    u = await run_in_threadpool(get_user_by_email, db, current_user["email"])
     if not u:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     ext = os.path.splitext(file.filename)[1].lower()
     if ext not in {".jpg", ".jpeg", ".png"}:
         raise HTTPException(status_code=400, detail="Tipo de imagen inválido. Usa JPG o PNG.")
-    file_id = uuid.uuid4().hex
-    filename = f"{file_id}{ext}"
-    file_path = os.path.join(AVATAR_DIR, filename)
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
-    u.profile_image = f"/uploads/avatars/{filename}"
-    db.commit()
-    db.refresh(u)
+    stored = await store_upload(file, "avatars", MAX_AVATAR_UPLOAD_BYTES, uploaded_by=u.email)
+    previous = asset_filename_from_url(u.profile_image, "/uploads/avatars/")
+    u.profile_image = f"/uploads/avatars/{stored.filename}"
+    await run_in_threadpool(save_user, db, u)
+    # El avatar anterior pierde una referencia (se borra si nadie más lo usa)
+    if previous and previous != stored.filename:
+        await release_asset("avatars", previous)
+    background_tasks.add_task(generate_variants, stored.id)
     return _user_to_payload(u)
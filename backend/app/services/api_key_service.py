@@ -1,8 +1,70 @@
+import os
+import threading
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.api_key import ApiKey
 from app.core.db import get_db
+from app.core.cache import TTLCache
 from fastapi import Depends
 
+# ---- Caché de resolución de tokens (delivery/preview) ----
+# Clave: (kind, token). Valor: ResolvedKey o None (token inválido, con TTL corto).
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_NEGATIVE_TTL = float(os.getenv("TOKEN_CACHE_NEGATIVE_TTL", "5"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+_MISSING = object()
+
+# Sube en cada invalidate_tokens: un resolve que leyó la DB antes de una revocación
+# no debe volver a cachear el token después de que ésta lo haya quitado.
+_token_generation = 0
+_generation_lock = threading.Lock()
+
+
+class ResolvedKey(NamedTuple):
+    """Datos mínimos de una API key; no depende de la sesión de DB."""
+    id: int
+    space_id: Optional[str]
+
+
+async def _resolve_token(db: AsyncSession, kind: str, column, token: str) -> Optional[ResolvedKey]:
+    cached = token_cache.get((kind, token), _MISSING)
+    if cached is not _MISSING:
+        return cached
+    generation = _token_generation
+    key = (await db.execute(select(ApiKey.id, ApiKey.space_id).where(column == token))).first()
+    resolved = ResolvedKey(id=key.id, space_id=key.space_id) if key else None
+    if generation == _token_generation:
+        if resolved is None:
+            token_cache.set((kind, token), None, ttl=min(TOKEN_CACHE_NEGATIVE_TTL, TOKEN_CACHE_TTL))
+        else:
+            token_cache.set((kind, token), resolved)
+    return resolved
+
+
+async def resolve_delivery_token(db: AsyncSession, token: str) -> Optional[ResolvedKey]:
+    return await _resolve_token(db, "delivery", ApiKey.delivery_token, token)
+
+
+async def resolve_preview_token(db: AsyncSession, token: str) -> Optional[ResolvedKey]:
+    return await _resolve_token(db, "preview", ApiKey.preview_token, token)
+
+
+def invalidate_tokens(delivery_token: Optional[str], preview_token: Optional[str]) -> None:
+    """Quita de la caché los tokens de una API key (creada o revocada)."""
+    global _token_generation
+    with _generation_lock:
+        _token_generation += 1
+    if delivery_token:
+        token_cache.pop(("delivery", delivery_token))
+    if preview_token:
+        token_cache.pop(("preview", preview_token))
+
+
 class ApiKeyService:
     def __init__(self, db: Session = Depends(get_db)):
         self.db = db
@@ -18,12 +80,17 @@ class ApiKeyService:
         self.db.add(obj)
         self.db.commit()
         self.db.refresh(obj)
+        # Un token recién creado pudo quedar cacheado como inválido
+        invalidate_tokens(obj.delivery_token, obj.preview_token)
         return obj
 
     def delete(self, id: int):
         obj = self.db.query(ApiKey).filter(ApiKey.id == id).first()
         if not obj:
             return False
+        tokens = (obj.delivery_token, obj.preview_token)
         self.db.delete(obj)
         self.db.commit()
+        # Revocación inmediata: el token deja de resolverse en este proceso
+        invalidate_tokens(*tokens)
         return True
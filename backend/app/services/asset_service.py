@@ -0,0 +1,197 @@
+# backend/app/services/asset_service.py
+"""
+Almacenamiento direccionado por contenido para imágenes y avatares.
+
+El archivo se llama `<sha256><ext>`: subir los mismos bytes otra vez sólo
+incrementa `ref_count` en `assets`, y la URL resultante nunca cambia de
+contenido (se sirve con Cache-Control immutable).
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.db import AsyncSessionLocal
+from app.core.pagination import clamp_limit, decode_cursor, decode_offset_cursor, encode_cursor, encode_offset_cursor
+from app.core.storage import storage
+from app.core.uploads import save_upload
+from app.models.asset import Asset, AssetVariant
+from app.services.image_transform import MAX_IMAGE_PIXELS, image_info
+
+# Stores lógicos; dónde viven los bytes lo decide app.core.storage (MEDIA_STORAGE)
+STORES = ("images", "avatars")
+
+# URL pública del original y prefijo del endpoint de transformación, por store
+ORIGINAL_URLS = {"images": "/static/images/", "avatars": "/uploads/avatars/"}
+TRANSFORM_URLS = {"images": "/images/", "avatars": "/images/avatars/"}
+
+# La extensión viene del nombre que manda el cliente y acaba en Asset.filename (String(128))
+ALLOWED_EXTENSIONS = {"", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".bmp", ".tif", ".tiff", ".ico", ".svg"}
+
+
+class StoredAsset(NamedTuple):
+    id: int
+    filename: str
+    sha256: str
+    size: int
+    mime: Optional[str]
+    ref_count: int
+    deduplicated: bool
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def image_dimensions(path: str) -> Tuple[Optional[int], Optional[int]]:
+    """(ancho, alto) leyendo la cabecera; (None, None) si no es una imagen legible.
+    Image.DecompressionBombError si supera MAX_IMAGE_PIXELS."""
+    try:
+        return image_info(path)
+    except Image.DecompressionBombError:
+        raise
+    except Exception:
+        return None, None
+
+
+async def _add_ref(db, store: str, sha256: str) -> Optional[Asset]:
+    """Incrementa la referencia de un blob existente (UPDATE atómico)."""
+    result = await db.execute(
+        update(Asset)
+        .where(Asset.store == store, Asset.sha256 == sha256)
+        .values(ref_count=Asset.ref_count + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        return None
+    return (await db.execute(select(Asset).where(Asset.store == store, Asset.sha256 == sha256))).scalar_one()
+
+
+async def store_upload(upload: UploadFile, store: str, max_bytes: int, uploaded_by: Optional[str] = None) -> StoredAsset:
+    """Guarda la subida en el store; si los bytes ya existían, sólo suma una referencia."""
+    ext = os.path.splitext(upload.filename or "")[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Extensión de archivo no permitida")
+    tmp_dir = storage.tmp_dir(store)
+    await run_in_threadpool(os.makedirs, tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+    stored = await save_upload(upload, tmp_path, max_bytes)
+    try:
+        async with AsyncSessionLocal() as db:
+            asset = await _add_ref(db, store, stored.sha256)
+            if asset is None:
+                filename = f"{stored.sha256}{ext}"
+                try:
+                    width, height = await run_in_threadpool(image_dimensions, tmp_path)
+                except Image.DecompressionBombError:
+                    raise HTTPException(status_code=413, detail=f"La imagen supera {MAX_IMAGE_PIXELS} píxeles")
+                await storage.save(store, filename, tmp_path, upload.content_type)
+                asset = Asset(store=store, sha256=stored.sha256, filename=filename, size=stored.size,
+                              mime=upload.content_type, width=width, height=height,
+                              uploaded_by=uploaded_by, ref_count=1)
+                db.add(asset)
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    # Subida concurrente de los mismos bytes: ganó la otra; el archivo es idéntico
+                    await db.rollback()
+                    asset = await _add_ref(db, store, stored.sha256)
+                    await db.commit()
+                    return _stored(asset, deduplicated=True)
+                return _stored(asset, deduplicated=False)
+            await db.commit()
+            return _stored(asset, deduplicated=True)
+    finally:
+        await run_in_threadpool(_discard, tmp_path)
+
+
+def _stored(asset: Asset, deduplicated: bool) -> StoredAsset:
+    return StoredAsset(asset.id, asset.filename, asset.sha256, asset.size, asset.mime, asset.ref_count, deduplicated)
+
+
+async def release_asset(store: str, filename: str) -> Optional[int]:
+    """Quita una referencia. Devuelve las restantes (0 = blob borrado) o None si no es un asset."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(Asset)
+            .where(Asset.store == store, Asset.filename == filename, Asset.ref_count > 0)
+            .values(ref_count=Asset.ref_count - 1, updated_at=datetime.utcnow())
+            .returning(Asset.ref_count)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        remaining = row[0]
+        if remaining <= 0:
+            gone = select(Asset.id).where(Asset.store == store, Asset.filename == filename, Asset.ref_count <= 0)
+            await db.execute(delete(AssetVariant).where(AssetVariant.asset_id.in_(gone)))
+            await db.execute(delete(Asset).where(Asset.store == store, Asset.filename == filename, Asset.ref_count <= 0))
+            # El blob se borra antes del commit, con la fila aún bloqueada por el UPDATE: una subida
+            # de los mismos bytes espera en _add_ref y, al no encontrar la fila, guarda el archivo de
+            # nuevo. Borrándolo después del commit podía llevarse el archivo de esa subida.
+            await storage.delete(store, filename)
+        await db.commit()
+    return max(remaining, 0)
+
+
+def asset_filename_from_url(url: Optional[str], prefix: str) -> Optional[str]:
+    """`/uploads/avatars/<file>` -> `<file>` (release_asset ignora los que no están catalogados)."""
+    if not url or not url.startswith(prefix):
+        return None
+    name = url[len(prefix):]
+    return name if name and os.path.basename(name) == name and not name.startswith(".") else None
+
+
+# Orden del catálogo -> columna; "-" = descendente
+ASSET_SORTS = {
+    "created_at": Asset.created_at,
+    "size": Asset.size,
+    "filename": Asset.filename,
+    "width": Asset.width,
+}
+
+
+async def list_assets(
+    db, store: str, mime: Optional[str], sort: Optional[str], limit: Optional[int], cursor: Optional[str],
+) -> Tuple[List[Asset], int, Optional[str]]:
+    """Página del catálogo de un store. Por defecto (más recientes primero) pagina por keyset;
+    con otro orden, por posición. `mime` acepta un tipo exacto o `image/*`."""
+    limit = clamp_limit(limit)
+    q = select(Asset).where(Asset.store == store)
+    if mime:
+        if mime.endswith("/*"):
+            q = q.where(Asset.mime.like(mime[:-1] + "%"))
+        else:
+            q = q.where(Asset.mime == mime)
+    if sort and sort not in ("-created_at",):
+        column = ASSET_SORTS.get(sort.lstrip("-"))
+        if column is None:
+            raise HTTPException(status_code=400, detail=f"Orden no soportado: {sort}")
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        order = column.desc() if sort.startswith("-") else column.asc()
+        rows = (await db.execute(
+            q.order_by(order, Asset.created_at.desc(), Asset.id.desc()).offset(offset).limit(limit + 1)
+        )).scalars().all()
+        return rows[:limit], limit, encode_offset_cursor(offset + limit) if len(rows) > limit else None
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        try:
+            last_id = int(last_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.where(or_(Asset.created_at < created_at, and_(Asset.created_at == created_at, Asset.id < last_id)))
+    rows = (await db.execute(q.order_by(Asset.created_at.desc(), Asset.id.desc()).limit(limit + 1))).scalars().all()
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if len(rows) > limit else None
+    return items, limit, next_cursor
@@ -0,0 +1,283 @@
+# backend/app/services/bulk_service.py
+"""
+Importación / exportación masiva de entries en NDJSON (una entry JSON por línea).
+
+- Import: el cuerpo se lee en streaming y se procesa en lotes de BULK_BATCH_SIZE líneas.
+  Por lote: una consulta de content types (validadores cacheados), una de ids existentes, INSERTs executemany
+  (entries, índice de búsqueda, snapshots de las publicadas), un bump de versiones y un commit.
+  Un lote que falla se deshace entero sin afectar a los anteriores.
+- Export: cursor del lado del servidor (AsyncSession.stream + yield_per) y filas sin ORM:
+  la memoria no depende del tamaño del dataset.
+- Transiciones de estado en lote (publish/unpublish/archive): un UPDATE ... WHERE id IN (...)
+  por bloque, snapshots por bloque y un único bump de versiones (invalidación) al final.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.dto.entry_dto import EntryFilterDTO, EntryImportDTO
+from app.models.content import ContentType, Entry, PublishedEntry
+from app.services.entry_validation import get_validator
+from app.services.revision_service import entry_document, record_revisions
+from app.services.search_service import index_entries
+from app.services.snapshot_service import serialize_entry, snapshot_values
+from app.services.version_service import bump_versions_async, DELIVERY, PREVIEW
+
+# ---- Config ----
+BULK_BATCH_SIZE: int = max(int(os.getenv("BULK_BATCH_SIZE", "500")), 1)
+BULK_MAX_LINE_BYTES: int = int(os.getenv("BULK_MAX_LINE_BYTES", str(1024 * 1024)))
+# Errores detallados en la respuesta (el contador `failed` los cuenta todos)
+BULK_MAX_ERRORS: int = int(os.getenv("BULK_MAX_ERRORS", "100"))
+BULK_EXPORT_CHUNK: int = max(int(os.getenv("BULK_EXPORT_CHUNK", "1000")), 1)
+# Máximo de entries por transición en lote (la respuesta lleva un resultado por id)
+BATCH_MAX_ENTRIES: int = int(os.getenv("BATCH_MAX_ENTRIES", "10000"))
+
+# Acción -> estado destino
+BATCH_ACTIONS = {"publish": "PUBLISHED", "unpublish": "DRAFT", "archive": "ARCHIVED"}
+
+# Columnas de Entry (sin relaciones) para el INSERT executemany
+_ENTRY_COLUMNS = [c.key for c in Entry.__table__.columns]
+
+
+def _entry_rows():
+    """SELECT de las columnas de Entry sin hidratar el ORM (Row tiene los mismos atributos)."""
+    return select(*(Entry.__table__.c[k] for k in _ENTRY_COLUMNS))
+
+
+class ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.created = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, detail: str, entry_id: Optional[str] = None) -> None:
+        self.failed += 1
+        if len(self.errors) < BULK_MAX_ERRORS:
+            self.errors.append({"line": line, "id": entry_id, "detail": detail})
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "created": self.created,
+            "failed": self.failed,
+            "batches": self.batches,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """(número de línea, bytes) a partir de trozos arbitrarios del cuerpo."""
+    pending = b""
+    lineno = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            lineno += 1
+            yield lineno, line
+        if len(pending) > BULK_MAX_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"La línea {lineno + 1} supera {BULK_MAX_LINE_BYTES} bytes")
+    if pending.strip():
+        yield lineno + 1, pending
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    err = exc.errors(include_url=False)[0]
+    loc = ".".join(str(p) for p in err.get("loc", ())) or "entry"
+    return f"{loc}: {err.get('msg')}"
+
+
+def _parse_line(lineno: int, raw: bytes, report: ImportReport) -> Optional[EntryImportDTO]:
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        report.error(lineno, "JSON inválido")
+        return None
+    try:
+        return EntryImportDTO.model_validate(data)
+    except ValidationError as exc:
+        report.error(lineno, _validation_detail(exc), data.get("id") if isinstance(data, dict) else None)
+        return None
+
+
+def _field_errors(ct, fields) -> Optional[str]:
+    try:
+        errors = get_validator(ct.id, ct.updated_at, ct.schema).errors(fields)
+    except HTTPException as exc:  # schema del tipo inválido
+        return str(exc.detail)
+    return "; ".join(f"{e['field']}: {e['detail']}" for e in errors) or None
+
+
+async def _flush_batch(db: AsyncSession, batch: List[Tuple[int, EntryImportDTO]], user_email: str, report: ImportReport) -> None:
+    report.batches += 1
+    ct_ids = {dto.content_type_id for _, dto in batch}
+    result = await db.execute(select(ContentType.id, ContentType.schema, ContentType.updated_at).where(ContentType.id.in_(ct_ids)))
+    types = {row.id: row for row in result}
+    schemas = {ct_id: row.schema for ct_id, row in types.items()}
+    result = await db.execute(select(Entry.id).where(Entry.id.in_([dto.id for _, dto in batch])))
+    taken = set(result.scalars())
+
+    now = datetime.utcnow()
+    accepted: List[Tuple[int, Entry]] = []
+    for lineno, dto in batch:
+        if dto.content_type_id not in schemas:
+            report.error(lineno, "ContentType not found", dto.id)
+        elif dto.id in taken:
+            report.error(lineno, "Entry already exists", dto.id)
+        elif errors := _field_errors(types[dto.content_type_id], dto.fields):
+            report.error(lineno, errors, dto.id)
+        else:
+            taken.add(dto.id)  # ids repetidos dentro del mismo lote
+            entry = Entry(**dto.model_dump(), created_by=user_email, updated_by=user_email, created_at=now, updated_at=now)
+            accepted.append((lineno, entry))
+    if not accepted:
+        return
+
+    entries = [e for _, e in accepted]
+    published = [snapshot_values(e) for e in entries if e.status == "PUBLISHED"]
+    try:
+        await db.execute(insert(Entry), [{k: getattr(e, k) for k in _ENTRY_COLUMNS} for e in entries])
+        await index_entries(db, entries, schemas)
+        if published:
+            await db.execute(insert(PublishedEntry), published)
+        await record_revisions(db, [(e.id, None, entry_document(e)) for e in entries], user_email)
+        await bump_versions_async(db, *((DELIVERY, PREVIEW) if published else (PREVIEW,)))
+        await db.commit()
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        print(f"⚠️ Lote de import fallido ({len(entries)} entries): {exc.__class__.__name__}: {exc}")
+        for lineno, e in accepted:
+            report.error(lineno, f"Lote rechazado por la base de datos ({exc.__class__.__name__})", e.id)
+        return
+    except HTTPException as exc:  # 409: historial modificado a la vez por otra operación
+        await db.rollback()
+        for lineno, e in accepted:
+            report.error(lineno, f"Lote rechazado: {exc.detail}", e.id)
+        return
+    report.created += len(entries)
+
+
+async def import_ndjson(db: AsyncSession, chunks: AsyncIterable[bytes], user_email: str) -> dict:
+    """Crea entries desde un cuerpo NDJSON en streaming. Devuelve el resumen con errores por línea."""
+    report = ImportReport()
+    batch: List[Tuple[int, EntryImportDTO]] = []
+    async for lineno, raw in iter_lines(chunks):
+        if not raw.strip():
+            continue
+        report.received += 1
+        dto = _parse_line(lineno, raw, report)
+        if dto is not None:
+            batch.append((lineno, dto))
+        if len(batch) >= BULK_BATCH_SIZE:
+            await _flush_batch(db, batch, user_email, report)
+            batch = []
+    if batch:
+        await _flush_batch(db, batch, user_email, report)
+    return report.as_dict()
+
+
+async def export_ndjson(content_type_id: Optional[str] = None, status: Optional[str] = None) -> AsyncIterator[bytes]:
+    """Entries en NDJSON (orden created_at, id), leídas por bloques de BULK_EXPORT_CHUNK filas.
+    Abre su propia sesión: el stream sigue vivo después de que la ruta devuelve la respuesta."""
+    q = _entry_rows()
+    if content_type_id:
+        q = q.where(Entry.content_type_id == content_type_id)
+    if status:
+        q = q.where(Entry.status == status)
+    q = q.order_by(Entry.created_at, Entry.id).execution_options(yield_per=BULK_EXPORT_CHUNK)
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(q)
+        async for rows in result.partitions():
+            # Row expone los mismos atributos que Entry: mismo JSON que el resto de la API
+            yield "".join(serialize_entry(row) + "\n" for row in rows).encode("utf-8")
+
+
+# ------------------------------------------------------------------
+# Transiciones de estado en lote
+# ------------------------------------------------------------------
+def _chunks(items: List[str], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _filtered_ids(db: AsyncSession, flt: EntryFilterDTO) -> List[str]:
+    q = select(Entry.id)
+    if flt.content_type_id:
+        q = q.where(Entry.content_type_id == flt.content_type_id)
+    if flt.status:
+        q = q.where(Entry.status == flt.status)
+    result = await db.execute(q.order_by(Entry.created_at, Entry.id).limit(BATCH_MAX_ENTRIES + 1))
+    return list(result.scalars())
+
+
+async def batch_transition(db: AsyncSession, action: str, ids: Optional[List[str]], flt: Optional[EntryFilterDTO],
+                           user_email: str) -> dict:
+    """Cambia el estado de muchas entries en una transacción. Resultado por id: updated | unchanged | not_found."""
+    target = BATCH_ACTIONS[action]
+    if ids is None and not (flt and (flt.content_type_id or flt.status)):
+        raise HTTPException(status_code=422, detail="El filtro necesita al menos un criterio")
+    ids = list(dict.fromkeys(ids)) if ids is not None else await _filtered_ids(db, flt)
+    if len(ids) > BATCH_MAX_ENTRIES:
+        raise HTTPException(status_code=400, detail=f"Como mucho {BATCH_MAX_ENTRIES} entries por operación")
+
+    outcomes = {}
+    updated = 0
+    delivery_changed = False
+    now = datetime.utcnow()
+    for chunk in _chunks(ids, BULK_BATCH_SIZE):
+        result = await db.execute(select(Entry.id, Entry.status).where(Entry.id.in_(chunk)))
+        current = {row.id: row.status for row in result}
+        changed = [i for i in chunk if i in current and current[i] != target]
+        for i in chunk:
+            outcomes[i] = "not_found" if i not in current else ("unchanged" if current[i] == target else "updated")
+        if not changed:
+            continue
+        await db.execute(
+            update(Entry)
+            .where(Entry.id.in_(changed))
+            .values(status=target, updated_by=user_email, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        removed = await db.execute(
+            delete(PublishedEntry).where(PublishedEntry.entry_id.in_(changed)).execution_options(synchronize_session=False)
+        )
+        rows = (await db.execute(_entry_rows().where(Entry.id.in_(changed)))).all()
+        await record_revisions(
+            db, [(row.id, {**entry_document(row), "status": current[row.id]}, entry_document(row)) for row in rows], user_email
+        )
+        if target == "PUBLISHED":
+            await db.execute(insert(PublishedEntry), [snapshot_values(row) for row in rows])
+            delivery_changed = True
+        elif removed.rowcount:
+            delivery_changed = True
+        updated += len(changed)
+
+    if updated:
+        # Una sola invalidación para todo el lote
+        await bump_versions_async(db, *((DELIVERY, PREVIEW) if delivery_changed else (PREVIEW,)))
+        await db.commit()
+
+    counts = {"updated": 0, "unchanged": 0, "not_found": 0}
+    for outcome in outcomes.values():
+        counts[outcome] += 1
+    return {
+        "action": action,
+        "status": target,
+        **counts,
+        "results": [{"id": i, "outcome": outcomes[i]} for i in ids],
+    }
@@ -1,56 +1,84 @@
-
 # app/services/content_service.py
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_db
 from app.models.content import ContentType, Entry
 from app.dto.content_type_dto import ContentTypeCreateDTO, ContentTypeUpdateDTO
 from app.dto.entry_dto import EntryCreateDTO, EntryUpdateDTO
+from app.services.field_query import ensure_field_indexes
+from app.services.entry_validation import check_schema, validate_entry_fields
+from app.core.pagination import clamp_limit, encode_offset_cursor, decode_offset_cursor
+from app.services.search_service import index_entry, reindex_type, unindex_entry, unindex_type, ranked_matches
+from app.services.snapshot_service import entry_to_payload, write_snapshot, remove_snapshot, remove_type_snapshots
+from app.services.version_service import bump_versions_async, DELIVERY, PREVIEW
+from app.services.revision_service import (
+    entry_document, record_revision, delete_revisions, delete_type_revisions, list_revisions, get_revision,
+)
 from typing import List
 
 class ContentService:
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
         self.db = db
 
     # Content Types
-    def list_types(self, owner_email: str) -> List[ContentType]:
-        return (
-            self.db.query(ContentType)
-            .filter(ContentType.owner_email == owner_email)
+    async def list_types(self, owner_email: str) -> List[ContentType]:
+        result = await self.db.execute(
+            select(ContentType)
+            .where(ContentType.owner_email == owner_email)
             .order_by(ContentType.created_at.desc())
-            .all()
         )
+        return result.scalars().all()
 
-    def get_type(self, id: str) -> ContentType:
-        obj = self.db.query(ContentType).get(id)
+    async def get_type(self, id: str) -> ContentType:
+        obj = await self.db.get(ContentType, id)
         if not obj: raise HTTPException(status_code=404, detail="ContentType not found")
         return obj
 
-    def create_type(self, payload: ContentTypeCreateDTO, user_email: str):
+    async def create_type(self, payload: ContentTypeCreateDTO, user_email: str):
+        check_schema(payload.schema)
         data = payload.model_dump()
         obj = ContentType(**data)
         obj.owner_email = user_email
         obj.created_by = user_email
         obj.updated_by = user_email
-        self.db.add(obj); self.db.commit(); self.db.refresh(obj); return obj
+        self.db.add(obj)
+        await bump_versions_async(self.db, DELIVERY, PREVIEW)
+        await self.db.commit(); await self.db.refresh(obj)
+        await ensure_field_indexes(obj.schema)
+        return obj
 
-    def update_type(self, id: str, payload: ContentTypeUpdateDTO, user_email: str):
-        obj = self.get_type(id)
+    async def update_type(self, id: str, payload: ContentTypeUpdateDTO, user_email: str):
+        obj = await self.get_type(id)
         if obj.owner_email != user_email:
             raise HTTPException(status_code=403, detail="Not allowed")
         data = payload.model_dump(exclude_unset=True)
+        if "schema" in data:
+            check_schema(data["schema"])
         for k,v in data.items(): setattr(obj, k, v)
         obj.updated_by = user_email
-        self.db.commit(); self.db.refresh(obj); return obj
+        if "schema" in data:
+            # Cambian los campos de texto indexados para búsqueda
+            await reindex_type(self.db, obj)
+        await bump_versions_async(self.db, DELIVERY, PREVIEW)
+        await self.db.commit(); await self.db.refresh(obj)
+        if "schema" in data:
+            await ensure_field_indexes(obj.schema)
+        return obj
 
-    def delete_type(self, id: str, user_email: str):
-        obj = self.get_type(id)
+    async def delete_type(self, id: str, user_email: str):
+        obj = await self.get_type(id)
         if obj.owner_email != user_email:
             raise HTTPException(status_code=403, detail="Not allowed")
-        self.db.delete(obj); self.db.commit(); return {"ok": True}
+        await remove_type_snapshots(self.db, obj.id)
+        await unindex_type(self.db, obj.id)
+        await delete_type_revisions(self.db, obj.id)
+        await bump_versions_async(self.db, DELIVERY, PREVIEW)
+        # AsyncSession.delete carga la relación `entries` para el cascade
+        await self.db.delete(obj); await self.db.commit(); return {"ok": True}
 
     # Entries
-    def list_entries(self, owner_email: str, content_type_id: str | None = None):
+    async def list_entries(self, owner_email: str, content_type_id: str | None = None):
         """
         Listar entries visibles para todos los usuarios.
         - Si se provee content_type_id, listar entries de ese tipo sin validar propietario.
@@ -58,51 +86,136 @@ class ContentService:
         Nota: las operaciones de escritura siguen restringidas por propietario.
         """
         if content_type_id:
-            ct = self.db.query(ContentType).get(content_type_id)
+            ct = await self.db.get(ContentType, content_type_id)
             if not ct:
                 raise HTTPException(status_code=404, detail="ContentType not found")
-            q = self.db.query(Entry).filter(Entry.content_type_id == content_type_id)
+            q = select(Entry).where(Entry.content_type_id == content_type_id)
         else:
             # Listar todas las entries (sin filtrar por owner del content type)
             q = (
-                self.db.query(Entry)
+                select(Entry)
                 .join(ContentType, Entry.content_type_id == ContentType.id)
             )
-        return q.order_by(Entry.created_at.desc()).all()
+        result = await self.db.execute(q.order_by(Entry.created_at.desc()))
+        return result.scalars().all()
 
-    def get_entry(self, id: str) -> Entry:
-        obj = self.db.query(Entry).get(id)
+    async def search_entries(self, query: str, content_type_id: str | None = None, status: str | None = None,
+                             limit: int | None = None, cursor: str | None = None) -> dict:
+        """Búsqueda full-text ordenada por relevancia, paginada con cursor opaco."""
+        limit = clamp_limit(limit)
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        matches = ranked_matches(query)
+        if matches is None:
+            return {"items": [], "limit": limit, "next_cursor": None}
+        q = select(Entry, matches.c.rank).join(matches, matches.c.entry_id == Entry.id)
+        if content_type_id:
+            q = q.where(Entry.content_type_id == content_type_id)
+        if status:
+            q = q.where(Entry.status == status)
+        result = await self.db.execute(
+            q.order_by(matches.c.rank.desc(), Entry.created_at.desc(), Entry.id.desc()).offset(offset).limit(limit + 1)
+        )
+        rows = result.all()
+        items = [{**entry_to_payload(e), "rank": rank} for e, rank in rows[:limit]]
+        next_cursor = encode_offset_cursor(offset + limit) if len(rows) > limit else None
+        return {"items": items, "limit": limit, "next_cursor": next_cursor}
+
+    async def get_entry(self, id: str) -> Entry:
+        obj = await self.db.get(Entry, id)
         if not obj: raise HTTPException(status_code=404, detail="Entry not found")
         return obj
 
-    def create_entry(self, payload: EntryCreateDTO, user_email: str):
+    async def create_entry(self, payload: EntryCreateDTO, user_email: str):
         # Permitir creación de entries para cualquier ContentType existente
-        ct = self.db.query(ContentType).get(payload.content_type_id)
+        ct = await self.db.get(ContentType, payload.content_type_id)
         if not ct:
             raise HTTPException(status_code=404, detail="ContentType not found")
+        validate_entry_fields(ct, payload.fields)
         obj = Entry(**payload.model_dump())
         obj.created_by = user_email
         obj.updated_by = user_email
-        self.db.add(obj); self.db.commit(); self.db.refresh(obj); return obj
+        self.db.add(obj)
+        await index_entry(self.db, obj, ct.schema)
+        await record_revision(self.db, obj, None, user_email)
+        await bump_versions_async(self.db, PREVIEW)
+        await self.db.commit(); await self.db.refresh(obj); return obj
 
-    def update_entry(self, id: str, payload: EntryUpdateDTO, user_email: str):
-        obj = self.get_entry(id)
+    async def update_entry(self, id: str, payload: EntryUpdateDTO, user_email: str):
+        obj = await self.get_entry(id)
+        before = entry_document(obj)
         # Permitir actualización por cualquier usuario autenticado
         data = payload.model_dump(exclude_unset=True)
+        ct = None
+        if data.get("title") is not None or data.get("fields") is not None:
+            ct = await self.db.get(ContentType, obj.content_type_id)
+        if ct is not None and data.get("fields") is not None:
+            validate_entry_fields(ct, data["fields"])
         for k,v in data.items():
             if v is not None: setattr(obj, k, v)
         obj.updated_by = user_email
-        self.db.commit(); self.db.refresh(obj); return obj
+        if data.get("title") is not None or data.get("fields") is not None:
+            await index_entry(self.db, obj, ct.schema if ct else [])
+        await record_revision(self.db, obj, before, user_email)
+        await self._sync_snapshot(obj)
+        await self.db.commit(); await self.db.refresh(obj); return obj
 
-    def publish_entry(self, id: str, user_email: str):
-        obj = self.get_entry(id)
+    async def publish_entry(self, id: str, user_email: str):
+        obj = await self.get_entry(id)
+        before = entry_document(obj)
         # Permitir publicación por cualquier usuario autenticado
         obj.status = "PUBLISHED"
         obj.updated_by = user_email
-        self.db.commit(); self.db.refresh(obj); return obj
+        await record_revision(self.db, obj, before, user_email)
+        await self._sync_snapshot(obj)
+        await self.db.commit(); await self.db.refresh(obj); return obj
+
+    async def unpublish_entry(self, id: str, user_email: str):
+        obj = await self.get_entry(id)
+        before = entry_document(obj)
+        obj.status = "DRAFT"
+        obj.updated_by = user_email
+        await record_revision(self.db, obj, before, user_email)
+        await self._sync_snapshot(obj)
+        await self.db.commit(); await self.db.refresh(obj); return obj
+
+    async def _sync_snapshot(self, obj: Entry):
+        """Mantiene el snapshot de delivery alineado con el estado de la entry (misma transacción)."""
+        await self.db.flush()
+        if obj.status == "PUBLISHED":
+            await write_snapshot(self.db, obj)
+            await bump_versions_async(self.db, DELIVERY, PREVIEW)
+        elif await remove_snapshot(self.db, obj.id):
+            await bump_versions_async(self.db, DELIVERY, PREVIEW)
+        else:
+            # Borrador que nunca estuvo publicado: sólo cambia preview
+            await bump_versions_async(self.db, PREVIEW)
+
+    # Versiones
+    async def list_versions(self, id: str, limit: int | None = None, cursor: str | None = None) -> dict:
+        await self.get_entry(id)
+        return await list_revisions(self.db, id, limit, cursor)
+
+    async def get_version(self, id: str, version: int) -> dict:
+        await self.get_entry(id)
+        revision = await get_revision(self.db, id, version)
+        if revision is None:
+            raise HTTPException(status_code=404, detail="Version not found")
+        return {"entry_id": id, **revision}
+
+    async def restore_version(self, id: str, version: int, user_email: str):
+        """Vuelve title/fields a los de `version` (queda registrado como una versión nueva; el estado no cambia)."""
+        revision = await self.get_version(id, version)
+        doc = revision["document"]
+        return await self.update_entry(id, EntryUpdateDTO(title=doc["title"], fields=doc["fields"]), user_email)
 
-    def delete_entry(self, id: str, user_email: str):
-        obj = self.get_entry(id)
-        if obj.content_type.owner_email != user_email:
+    async def delete_entry(self, id: str, user_email: str):
+        obj = await self.get_entry(id)
+        # Sin lazy-load de obj.content_type (no permitido fuera del greenlet)
+        ct = await self.db.get(ContentType, obj.content_type_id)
+        if ct is None or ct.owner_email != user_email:
             raise HTTPException(status_code=403, detail="Not allowed")
-        self.db.delete(obj); self.db.commit(); return {"ok": True}
+        scopes = (DELIVERY, PREVIEW) if await remove_snapshot(self.db, obj.id) else (PREVIEW,)
+        await unindex_entry(self.db, obj.id)
+        await delete_revisions(self.db, obj.id)
+        await bump_versions_async(self.db, *scopes)
+        await self.db.delete(obj); await self.db.commit(); return {"ok": True}
@@ -0,0 +1,398 @@
+# backend/app/services/entry_validation.py
+"""
+Validación de `Entry.fields` contra el schema (lista de FieldDef) de su ContentType.
+
+El schema se compila una vez a una lista de closures (regex ya compiladas, límites
+ya leídos) y se cachea por (content_type_id, updated_at): editar el tipo cambia
+updated_at y la siguiente validación recompila. Validar una entry es recorrer los
+campos del schema sin volver a interpretar el JSON del tipo.
+
+Valores por tipo (los que guarda el editor):
+    shortText / richText   "texto" o {"text": "...", "style": {...}}; config.mode == "list" -> lista de textos
+    number                 int/float (config.variant == "integer" exige entero)
+    boolean                true/false
+    datetime               {"date": "YYYY-MM-DD", "time": "HH:MM"} o string ISO 8601
+    media / reference      id o {"id": ...}; lista si config.many / config.multiple
+    Link / Array(Link)     estilo Contentful: linkType Entry|Asset, items.linkType
+    json y tipos desconocidos: cualquier valor
+
+Validaciones soportadas (FieldDef.validations): size {min,max}, range {min,max},
+regexp {pattern,flags}, in [...]; `message` opcional reemplaza el texto del error.
+Los campos number admiten además config.validations {min, max} (lo que guarda el editor).
+Las demás (unique, linkContentType...) se ignoran aquí. Campos fuera del schema no se validan.
+
+regexp: `re` hace backtracking, así que se rechazan los patrones con riesgo de ReDoS
+(más largos que VALIDATOR_REGEX_MAX_PATTERN o con un cuantificador sin tope dentro de otro
+que repite, p.ej. (a+)+) y no se evalúan textos de más de VALIDATOR_REGEX_MAX_INPUT caracteres.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+
+try:  # Python >= 3.11
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants, sre_parse
+
+# ---- Config ----
+VALIDATOR_CACHE_SIZE: int = int(os.getenv("VALIDATOR_CACHE_SIZE", "512"))
+VALIDATOR_CACHE_TTL: float = float(os.getenv("VALIDATOR_CACHE_TTL", "3600"))
+VALIDATOR_REGEX_MAX_PATTERN: int = int(os.getenv("VALIDATOR_REGEX_MAX_PATTERN", "256"))
+VALIDATOR_REGEX_MAX_INPUT: int = int(os.getenv("VALIDATOR_REGEX_MAX_INPUT", "10000"))
+
+validator_cache = TTLCache(maxsize=VALIDATOR_CACHE_SIZE, ttl=VALIDATOR_CACHE_TTL)
+
+Check = Callable[[Any], Optional[str]]
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_TIME_RE = re.compile(r"^\d{2}:\d{2}(:\d{2})?$")
+_RE_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+
+
+# ------------------------------------------------------------------
+# Enlaces (compartido con la resolución de includes)
+# ------------------------------------------------------------------
+def field_link(f: dict) -> Optional[Tuple[str, bool]]:
+    """("Entry" | "Asset", many) si el campo guarda enlaces; None si no."""
+    ftype = f.get("type")
+    config = f.get("config") or {}
+    if ftype == "reference":
+        return "Entry", bool(config.get("multiple"))
+    if ftype == "media":
+        return "Asset", bool(config.get("many"))
+    if ftype == "Link" and f.get("linkType") in ("Entry", "Asset"):
+        return f["linkType"], False
+    items = f.get("items") or {}
+    if ftype == "Array" and items.get("type") == "Link" and items.get("linkType") in ("Entry", "Asset"):
+        return items["linkType"], True
+    return None
+
+
+def link_id(value: Any) -> Optional[str]:
+    """Id de un enlace: string o {"id": ...} (también {"sys": {"id": ...}})."""
+    if isinstance(value, str):
+        return value or None
+    if isinstance(value, dict):
+        ref = value.get("id")
+        if ref is None and isinstance(value.get("sys"), dict):
+            ref = value["sys"].get("id")
+        return ref if isinstance(ref, str) and ref else None
+    return None
+
+
+# ------------------------------------------------------------------
+# Valor por tipo: valor crudo -> (error, escalar al que aplican las validaciones)
+# ------------------------------------------------------------------
+def _text_value(value: Any):
+    if isinstance(value, str):
+        return None, value
+    # Sólo {text, style}: un dict de locales ({es: ..., en: ...}) no es un texto
+    if isinstance(value, dict) and set(value) <= {"text", "style"} and isinstance(value.get("text", ""), str):
+        return None, value.get("text", "")
+    return "debe ser texto o {text, style}", None
+
+
+def _number_value(integer: bool):
+    def extract(value: Any):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return "debe ser un número", None
+        if integer and not float(value).is_integer():
+            return "debe ser un entero", None
+        return None, value
+    return extract
+
+
+def _boolean_value(value: Any):
+    return (None, value) if isinstance(value, bool) else ("debe ser true o false", None)
+
+
+def _datetime_value(value: Any):
+    if isinstance(value, str):
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return "fecha ISO 8601 inválida", None
+        return None, value
+    if isinstance(value, dict):
+        date, time = value.get("date") or "", value.get("time") or ""
+        if not (isinstance(date, str) and _DATE_RE.match(date)):
+            return "date debe tener la forma YYYY-MM-DD", None
+        if time and not (isinstance(time, str) and _TIME_RE.match(time)):
+            return "time debe tener la forma HH:MM", None
+        try:
+            datetime.fromisoformat(f"{date}T{time or '00:00'}")
+        except ValueError:
+            return "fecha inexistente", None
+        return None, f"{date}T{time}" if time else date
+    return "debe ser una fecha", None
+
+
+def _link_value(value: Any):
+    ref = link_id(value)
+    return (None, ref) if ref else ("debe ser un id o {id}", None)
+
+
+def _any_value(value: Any):
+    return None, value
+
+
+# ------------------------------------------------------------------
+# Validaciones del schema
+# ------------------------------------------------------------------
+def _bounds(spec: Any) -> Tuple[Optional[float], Optional[float]]:
+    spec = spec if isinstance(spec, dict) else {}
+    lo, hi = spec.get("min"), spec.get("max")
+    if (lo is not None and not isinstance(lo, (int, float))) or (hi is not None and not isinstance(hi, (int, float))):
+        raise ValueError("min/max deben ser numéricos")
+    return lo, hi
+
+
+def _between(lo, hi, what: str, message: Optional[str]) -> Callable[[Any], Optional[str]]:
+    text = message or " y ".join(
+        p for p in (f"{what} mínimo {lo}" if lo is not None else "", f"{what} máximo {hi}" if hi is not None else "") if p
+    )
+
+    def check(n):
+        if (lo is not None and n < lo) or (hi is not None and n > hi):
+            return text
+        return None
+    return check
+
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+
+def _nested_repeat(items, repeated: bool = False) -> bool:
+    """True si hay un cuantificador sin tope dentro de otro que repite (backtracking exponencial)."""
+    for op, av in items:
+        if op in _REPEATS:
+            _, hi, sub = av
+            if repeated and hi == sre_constants.MAXREPEAT:
+                return True
+            if _nested_repeat(sub, repeated or hi > 1):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _nested_repeat(av[3], repeated):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(_nested_repeat(branch, repeated) for branch in av[1]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _nested_repeat(av[1], repeated):
+                return True
+        elif op is sre_constants.GROUPREF_EXISTS:
+            if any(_nested_repeat(branch, repeated) for branch in av[1:] if branch):
+                return True
+        # POSSESSIVE_REPEAT / ATOMIC_GROUP no hacen backtracking: no se miran
+    return False
+
+
+def _compile_regexp(pattern: Any, flags: int) -> re.Pattern:
+    if not isinstance(pattern, str):
+        raise ValueError("regexp.pattern debe ser texto")
+    if len(pattern) > VALIDATOR_REGEX_MAX_PATTERN:
+        raise ValueError(f"regexp de más de {VALIDATOR_REGEX_MAX_PATTERN} caracteres")
+    try:
+        compiled = re.compile(pattern, flags)
+        nested = _nested_repeat(sre_parse.parse(pattern, flags))
+    except re.error as exc:
+        raise ValueError(f"regexp inválida: {exc}")
+    if nested:
+        raise ValueError(f"regexp con cuantificadores anidados (riesgo de ReDoS): {pattern}")
+    return compiled
+
+
+def _compile_rule(rule: dict) -> Optional[Tuple[str, Callable[[Any], Optional[str]]]]:
+    """Una validación -> ("size" | "value", check). ValueError si la validación está mal formada."""
+    message = rule.get("message")
+    if "size" in rule:
+        return "size", _between(*_bounds(rule["size"]), "tamaño", message)
+    if "range" in rule:
+        between = _between(*_bounds(rule["range"]), "valor", message)
+        return "value", lambda v: between(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+    if "regexp" in rule:
+        spec = rule["regexp"] if isinstance(rule["regexp"], dict) else {"pattern": rule["regexp"]}
+        flags = 0
+        for flag in spec.get("flags") or "":
+            flags |= _RE_FLAGS.get(flag, 0)
+        pattern = _compile_regexp(spec.get("pattern") or "", flags)
+        text = message or f"no coincide con el patrón {pattern.pattern}"
+
+        def check(v):
+            if not isinstance(v, str):
+                return None
+            if len(v) > VALIDATOR_REGEX_MAX_INPUT:
+                return f"texto de más de {VALIDATOR_REGEX_MAX_INPUT} caracteres para el patrón"
+            return None if pattern.search(v) else text
+        return "value", check
+    if "in" in rule:
+        allowed = rule["in"] if isinstance(rule["in"], list) else []
+        text = message or f"debe ser uno de: {', '.join(map(str, allowed))}"
+        return "value", lambda v: None if v in allowed else text
+    return None
+
+
+def _compile_field(f: dict) -> Tuple[str, bool, Check]:
+    ftype = f.get("type")
+    config = f.get("config") or {}
+    link = field_link(f)
+    many = link[1] if link else (ftype == "shortText" and config.get("mode") == "list")
+    if link:
+        extract = _link_value
+    elif ftype in ("shortText", "richText"):
+        extract = _text_value
+    elif ftype == "number":
+        extract = _number_value(config.get("variant") == "integer")
+    elif ftype == "boolean":
+        extract = _boolean_value
+    elif ftype == "datetime":
+        extract = _datetime_value
+    else:
+        extract = _any_value
+
+    size_checks: List[Callable] = []
+    value_checks: List[Callable] = []
+    if extract is not _any_value:
+        for rule in f.get("validations") or []:
+            compiled = _compile_rule(rule) if isinstance(rule, dict) else None
+            if compiled:
+                (size_checks if compiled[0] == "size" else value_checks).append(compiled[1])
+    if ftype == "number" and isinstance(config.get("validations"), dict):
+        # Editor de campos: config.validations = {min, max} (null si está vacío)
+        lo, hi = _bounds(config["validations"])
+        if lo is not None or hi is not None:
+            value_checks.append(_between(lo, hi, "valor", None))
+
+    def check_one(value: Any) -> Optional[str]:
+        err, scalar = extract(value)
+        if err:
+            return err
+        if not many and isinstance(scalar, str):
+            for size in size_checks:
+                err = size(len(scalar))
+                if err:
+                    return err
+        for rule in value_checks:
+            err = rule(scalar)
+            if err:
+                return err
+        return None
+
+    if not many:
+        return f.get("id"), bool(f.get("required")), check_one
+
+    def check_many(value: Any) -> Optional[str]:
+        if not isinstance(value, list):
+            return "debe ser una lista"
+        for size in size_checks:
+            err = size(len(value))
+            if err:
+                return err
+        for i, item in enumerate(value):
+            err = check_one(item)
+            if err:
+                return f"[{i}] {err}"
+        return None
+    return f.get("id"), bool(f.get("required")), check_many
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None or value == "" or value == [] or value == {}:
+        return True
+    if isinstance(value, dict) and set(value) <= {"text", "style", "date", "time"}:
+        # {text: ""} / {date: "", time: ""} que deja el editor al borrar
+        return not (value.get("text") or value.get("date"))
+    return False
+
+
+class EntryValidator:
+    """Schema compilado: lista de (field_id, required, check)."""
+
+    __slots__ = ("checks", "localized")
+
+    def __init__(self, schema: Iterable[dict]):
+        self.checks: List[Tuple[str, bool, Check]] = []
+        self.localized = set()
+        for f in schema or []:
+            if not isinstance(f, dict) or not f.get("id"):
+                continue
+            self.checks.append(_compile_field(f))
+            if f.get("localized"):
+                self.localized.add(f["id"])
+
+    def _check_value(self, fid: str, check: Check, value: Any) -> Optional[str]:
+        err = check(value)
+        if err and fid in self.localized and isinstance(value, dict):
+            # Campo localizado: {locale: valor}
+            for locale, localized in value.items():
+                if not _is_empty(localized):
+                    locale_err = check(localized)
+                    if locale_err:
+                        return f"{locale}: {locale_err}"
+            return None
+        return err
+
+    def errors(self, fields: Any) -> List[dict]:
+        if not isinstance(fields, dict):
+            return [{"field": None, "detail": "fields debe ser un objeto"}]
+        errors = []
+        for fid, required, check in self.checks:
+            value = fields.get(fid)
+            if _is_empty(value):
+                if required:
+                    errors.append({"field": fid, "detail": "es obligatorio"})
+                continue
+            err = self._check_value(fid, check, value)
+            if err:
+                errors.append({"field": fid, "detail": err})
+        return errors
+
+    def validate(self, fields: Any) -> None:
+        """422 con la lista de errores por campo."""
+        errors = self.errors(fields)
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+
+
+def _as_json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def compile_schema(schema: Any) -> EntryValidator:
+    """Compila sin caché (p.ej. para rechazar un schema con una regexp inválida). ValueError si está mal formado."""
+    return EntryValidator(_as_json(schema) or [])
+
+
+def check_schema(schema: Iterable[Any]) -> None:
+    """422 si alguna validación del schema no compila."""
+    try:
+        compile_schema([f.model_dump() if hasattr(f, "model_dump") else f for f in schema or []])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=f"Schema inválido: {exc}")
+
+
+def get_validator(content_type_id: str, updated_at: Optional[datetime], schema: Any) -> EntryValidator:
+    """Validador compilado del tipo; se recompila cuando cambia updated_at.
+    422 si el schema guardado no compila (p.ej. anterior a check_schema): hay que corregir el tipo."""
+    key = (content_type_id, updated_at)
+    validator = validator_cache.get(key)
+    if validator is None:
+        try:
+            validator = compile_schema(schema)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=f"Schema de {content_type_id} inválido: {exc}")
+        validator_cache.set(key, validator)
+    return validator
+
+
+def validate_entry_fields(ct, fields: Any) -> None:
+    """422 si `fields` no cumple el schema del ContentType `ct`."""
+    get_validator(ct.id, ct.updated_at, ct.schema).validate(fields)
@@ -0,0 +1,271 @@
+# backend/app/services/field_query.py
+"""
+Filtros y orden sobre `Entry.fields` para delivery/preview.
+
+    ?fields.slug=hola            igualdad
+    ?fields.price[gte]=10        eq | ne | gt | gte | lt | lte | in | exists
+    ?order=fields.date           ascendente; `-fields.date` descendente
+
+Las expresiones SQL se arman con el id del campo como literal (validado) para que
+coincidan exactamente con los índices de expresión que se crean para los campos
+marcados `indexed` en el schema del ContentType.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Boolean, Float, String, literal_column, or_, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.db import async_engine, IS_SQLITE, DB_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+FIELD_ID_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_PARAM_RE = re.compile(r"^fields\.([^\[\]]+)(?:\[(\w+)\])?$")
+
+OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in", "exists")
+
+# Tipo de campo -> tipo de valor comparable
+_KIND_BY_TYPE = {
+    "shortText": "text",
+    "richText": "text",
+    "number": "number",
+    "datetime": "datetime",
+    "boolean": "boolean",
+}
+_SQL_TYPE = {"text": String, "number": Float, "datetime": String, "boolean": Boolean}
+
+
+def _sqlite_expr(kind: str, fid: str) -> str:
+    path = f"'$.{fid}'"
+    if kind == "text":
+        # {text, style} o string plano
+        return f"coalesce(json_extract(fields, '$.{fid}.text'), json_extract(fields, {path}))"
+    if kind == "number":
+        return f"CASE WHEN json_type(fields, {path}) IN ('integer', 'real') THEN json_extract(fields, {path}) END"
+    if kind == "boolean":
+        return f"CASE WHEN json_type(fields, {path}) IN ('true', 'false') THEN json_extract(fields, {path}) END"
+    # datetime: {date, time} -> 'YYYY-MM-DDTHH:MM' (orden lexicográfico = cronológico)
+    return (
+        f"CASE WHEN json_type(fields, {path}) = 'object' "
+        f"THEN nullif(json_extract(fields, '$.{fid}.date'), '') || 'T' || "
+        f"coalesce(nullif(json_extract(fields, '$.{fid}.time'), ''), '00:00') "
+        f"ELSE json_extract(fields, {path}) END"
+    )
+
+
+def _pg_expr(kind: str, fid: str) -> str:
+    val = f"(fields -> '{fid}')"
+    if kind == "text":
+        return f"coalesce({val} ->> 'text', fields ->> '{fid}')"
+    if kind == "number":
+        return f"CASE WHEN jsonb_typeof({val}) = 'number' THEN (fields ->> '{fid}')::float8 END"
+    if kind == "boolean":
+        return f"CASE WHEN jsonb_typeof({val}) = 'boolean' THEN (fields ->> '{fid}')::boolean END"
+    return (
+        f"CASE WHEN jsonb_typeof({val}) = 'object' "
+        f"THEN nullif({val} ->> 'date', '') || 'T' || coalesce(nullif({val} ->> 'time', ''), '00:00') "
+        f"ELSE fields ->> '{fid}' END"
+    )
+
+
+def field_sql(kind: str, fid: str) -> str:
+    """Expresión SQL (texto) del valor comparable de un campo."""
+    return _sqlite_expr(kind, fid) if IS_SQLITE else _pg_expr(kind, fid)
+
+
+def _field_kind(schema: Iterable[dict], fid: str) -> str:
+    if not FIELD_ID_RE.match(fid):
+        raise HTTPException(status_code=400, detail=f"Invalid field id: {fid}")
+    for f in schema or []:
+        if f.get("id") == fid:
+            kind = _KIND_BY_TYPE.get(f.get("type"))
+            if not kind:
+                raise HTTPException(status_code=400, detail=f"Field '{fid}' of type {f.get('type')} is not filterable")
+            return kind
+    raise HTTPException(status_code=400, detail=f"Unknown field: {fid}")
+
+
+def _coerce(kind: str, raw: str) -> Any:
+    if kind == "number":
+        try:
+            return float(raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid number: {raw}")
+    if kind == "boolean":
+        return _parse_bool(raw)
+    return raw
+
+
+def _parse_bool(raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in ("true", "1"):
+        return True
+    if value in ("false", "0"):
+        return False
+    raise HTTPException(status_code=400, detail=f"Invalid boolean: {raw}")
+
+
+def _exists_clause(fid: str, present: bool):
+    # En Postgres `?` usa el índice GIN sobre fields
+    sql = f"json_type(fields, '$.{fid}') IS NOT NULL" if IS_SQLITE else f"fields ? '{fid}'"
+    return text(sql if present else f"NOT ({sql})")
+
+
+def has_field_params(params: Iterable[Tuple[str, str]]) -> bool:
+    return any(k.startswith("fields.") for k, _ in params)
+
+
+def build_field_filters(schema: List[dict], params: Iterable[Tuple[str, str]]) -> list:
+    """Traduce los query params `fields.*` a cláusulas WHERE (400 si son inválidos)."""
+    clauses = []
+    for key, raw in params:
+        if not key.startswith("fields."):
+            continue
+        m = _PARAM_RE.match(key)
+        if not m:
+            raise HTTPException(status_code=400, detail=f"Invalid filter: {key}")
+        fid, op = m.group(1), (m.group(2) or "eq")
+        if op not in OPERATORS:
+            raise HTTPException(status_code=400, detail=f"Unknown operator: {op}")
+        kind = _field_kind(schema, fid)
+        if op == "exists":
+            clauses.append(_exists_clause(fid, _parse_bool(raw)))
+            continue
+        expr = literal_column(field_sql(kind, fid), _SQL_TYPE[kind]())
+        if op == "in":
+            clauses.append(expr.in_([_coerce(kind, v) for v in raw.split(",") if v != ""]))
+            continue
+        value = _coerce(kind, raw)
+        if op == "eq":
+            clauses.append(expr == value)
+        elif op == "ne":
+            clauses.append(or_(expr != value, expr.is_(None)))
+        elif op == "gt":
+            clauses.append(expr > value)
+        elif op == "gte":
+            clauses.append(expr >= value)
+        elif op == "lt":
+            clauses.append(expr < value)
+        else:
+            clauses.append(expr <= value)
+    return clauses
+
+
+def build_field_order(schema: List[dict], order: Optional[str]):
+    """`fields.x` / `-fields.x` -> expresión ORDER BY (None si no hay orden por campo)."""
+    if not order:
+        return None
+    desc = order.startswith("-")
+    name = order[1:] if desc else order
+    if not name.startswith("fields."):
+        raise HTTPException(status_code=400, detail=f"Invalid order: {order}")
+    fid = name[len("fields."):]
+    kind = _field_kind(schema, fid)
+    expr = literal_column(field_sql(kind, fid), _SQL_TYPE[kind]())
+    return expr.desc() if desc else expr.asc()
+
+
+# ------------------------------------------------------------------
+# Índices por campo
+# ------------------------------------------------------------------
+def _index_name(kind: str, fid: str) -> str:
+    name = f"ix_entries_fld_{fid}_{kind}"
+    if len(name) > 63:  # límite de identificadores en Postgres
+        name = f"ix_entries_fld_{hashlib.sha1(f'{fid}:{kind}'.encode()).hexdigest()[:16]}_{kind}"
+    return name
+
+
+def _field_indexes(schema: List[dict], concurrently: bool = False) -> List[Tuple[str, str]]:
+    """(nombre, CREATE INDEX) de los campos `indexed` del schema: (content_type_id, expresión)."""
+    table = "entries" if IS_SQLITE else f'"{DB_SCHEMA}".entries'
+    conc = "CONCURRENTLY " if concurrently and not IS_SQLITE else ""
+    specs = []
+    for f in schema or []:
+        fid, kind = f.get("id") or "", _KIND_BY_TYPE.get(f.get("type"))
+        if not f.get("indexed") or not kind or not FIELD_ID_RE.match(fid):
+            continue
+        name = _index_name(kind, fid)
+        specs.append((name, f"CREATE INDEX {conc}IF NOT EXISTS {name} ON {table} (content_type_id, ({field_sql(kind, fid)}))"))
+    return specs
+
+
+def field_index_ddl(schema: List[dict], concurrently: bool = False) -> List[str]:
+    """CREATE INDEX de los campos `indexed` del schema."""
+    return [ddl for _, ddl in _field_indexes(schema, concurrently)]
+
+
+def _as_schema(value: Any) -> List[dict]:
+    return json.loads(value) if isinstance(value, str) else (value or [])
+
+
+def create_all_field_indexes(conn: Connection) -> None:
+    """Índices de todos los ContentType existentes (migraciones)."""
+    table = "content_types" if IS_SQLITE else f'"{DB_SCHEMA}".content_types'
+    for (schema,) in conn.execute(text(f"SELECT schema FROM {table}")).fetchall():
+        for ddl in field_index_ddl(_as_schema(schema)):
+            conn.execute(text(ddl))
+
+
+def _already_exists(exc: Exception) -> bool:
+    # Dos requests creando el mismo índice a la vez: IF NOT EXISTS no evita la carrera en Postgres
+    msg = str(getattr(exc, "orig", exc)).lower()
+    return "already exists" in msg or "pg_class_relname_nsp_index" in msg
+
+
+async def _drop_invalid_index(conn, name: str) -> None:
+    """Un CREATE INDEX CONCURRENTLY fallido deja el índice INVALID, que IF NOT EXISTS saltaría
+    en los reintentos: se elimina para que la próxima llamada lo vuelva a crear."""
+    if IS_SQLITE:
+        return
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = :name AND n.nspname = :schema AND NOT i.indisvalid"
+        ),
+        {"name": name, "schema": DB_SCHEMA},
+    )
+    if result.first():
+        await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{DB_SCHEMA}".{name}'))
+
+
+async def ensure_field_indexes(schema: List[dict]) -> List[str]:
+    """Crea (fuera de la transacción del request) los índices de los campos `indexed`.
+
+    Idempotente: cada índice es IF NOT EXISTS y se crea por separado, de modo que un fallo
+    no impide los demás ni el cambio de schema ya confirmado; los fallos se registran y se
+    reintentan en la próxima llamada (o con create_all_field_indexes en las migraciones).
+    Devuelve los nombres de los índices que no se pudieron crear."""
+    specs = _field_indexes(_as_schema(schema), concurrently=True)
+    if not specs:
+        return []
+    failed = []
+    try:
+        async with async_engine.connect() as conn:
+            # CONCURRENTLY no puede ir dentro de una transacción
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for name, ddl in specs:
+                try:
+                    await conn.execute(text(ddl))
+                except SQLAlchemyError as exc:
+                    if _already_exists(exc):
+                        continue
+                    logger.warning("No fue posible crear el índice de campo %s: %s", name, exc)
+                    failed.append(name)
+                    try:
+                        await _drop_invalid_index(conn, name)
+                    except SQLAlchemyError:
+                        logger.exception("No fue posible limpiar el índice inválido %s", name)
+    except Exception:
+        # Sin conexión, etc.: el cambio de schema ya está confirmado
+        logger.exception("No fue posible crear índices de campos")
+        return [name for name, _ in specs]
+    return failed
@@ -0,0 +1,172 @@
+# backend/app/services/image_service.py
+"""
+Variantes derivadas de imágenes (resize / formato) con caché en disco.
+
+- El trabajo de Pillow corre en un pool de procesos con cola acotada (no bloquea el
+  event loop ni compite por el GIL con los requests). El endpoint de transformación es
+  público: con IMAGE_QUEUE_MAX renders esperando, los siguientes reciben 503.
+- Cada variante se guarda en IMAGE_CACHE_DIR con una clave derivada del origen y
+  de los parámetros; el LRU se lleva por mtime (se "toca" en cada hit) y se
+  desaloja por tamaño total cuando se supera IMAGE_CACHE_MAX_MB.
+- Peticiones concurrentes de la misma variante comparten un único render.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.process_pool import BoundedProcessPool
+from app.core.static_files import HASHED_NAME_RE
+from app.services.image_transform import MAX_IMAGE_DIMENSION, OUTPUT_FORMATS, TransformParams, render
+
+# ---- Config ----
+IMAGE_CACHE_DIR: str = os.getenv("IMAGE_CACHE_DIR", "uploads/.derived")
+IMAGE_CACHE_MAX_BYTES: int = int(float(os.getenv("IMAGE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+IMAGE_QUEUE_MAX: int = int(os.getenv("IMAGE_QUEUE_MAX", "16"))
+IMAGE_QUEUE_TIMEOUT: float = float(os.getenv("IMAGE_QUEUE_TIMEOUT", "10"))
+DEFAULT_IMAGE_QUALITY: int = int(os.getenv("DEFAULT_IMAGE_QUALITY", "80"))
+# Variantes que se generan al subir (srcset)
+IMAGE_VARIANT_WIDTHS: list[int] = sorted(int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "160,480,1080").split(",") if w.strip())
+IMAGE_VARIANT_FORMATS: list[str] = [
+    f.strip() for f in os.getenv("IMAGE_VARIANT_FORMATS", "webp,jpg").split(",") if f.strip() in OUTPUT_FORMATS
+]
+
+# Extensión del original -> formato de salida por defecto
+_FORMAT_BY_EXT = {".jpg": "jpg", ".jpeg": "jpg", ".png": "png", ".webp": "webp", ".avif": "avif"}
+
+
+def default_format(filename: str) -> str:
+    fm = _FORMAT_BY_EXT.get(os.path.splitext(filename)[1].lower(), "png")
+    return fm if fm in OUTPUT_FORMATS else "png"
+
+
+class DerivedImageCache:
+    """Caché de variantes en disco con desalojo LRU por tamaño total."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None  # se calcula al primer uso
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}{ext}")
+
+    def lookup(self, path: str) -> bool:
+        try:
+            os.utime(path)  # marca de uso para el LRU
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        files = []
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def added(self, size: int) -> None:
+        """Registra una variante nueva y desaloja si se supera el máximo."""
+        with self._lock:
+            if self._total is None:
+                self._total = sum(s for _, s, _ in self._scan())
+            else:
+                self._total += size
+            if self._total <= self.max_bytes:
+                return
+            # Desalojar las menos usadas hasta quedar en el 90% del máximo
+            files = sorted(self._scan())
+            total = sum(s for _, s, _ in files)
+            target = int(self.max_bytes * 0.9)
+            for _mtime, fsize, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= fsize
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+            self._total = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "dir": self.directory,
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+image_cache = DerivedImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+
+image_pool = BoundedProcessPool("images", IMAGE_WORKERS, IMAGE_QUEUE_MAX, IMAGE_QUEUE_TIMEOUT)
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def shutdown_image_pool() -> None:
+    image_pool.shutdown()
+
+
+async def run_in_pool(fn, *args):
+    """Ejecuta una función de image_transform en el pool de procesos (503 si la cola está llena)."""
+    return await image_pool.run(fn, *args)
+
+
+def variant_key(source_path: str, source_name: str, params: TransformParams) -> str:
+    # Los nombres direccionados por contenido no cambian; los heredados se versionan por mtime
+    version = "" if HASHED_NAME_RE.match(source_name) else str(os.stat(source_path).st_mtime_ns)
+    raw = f"{source_name}|{version}|{params.w}|{params.h}|{params.fm}|{params.q}|{params.fit}|{params.bg}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _render(source_path: str, dest_path: str, params: TransformParams) -> None:
+    await run_in_threadpool(os.makedirs, os.path.dirname(dest_path), exist_ok=True)
+    size = await run_in_pool(render, source_path, dest_path, params)
+    await run_in_threadpool(image_cache.added, size)
+
+
+async def derived_image(source_path: str, source_name: str, params: TransformParams) -> str:
+    """Ruta de la variante pedida, generándola si no está en caché."""
+    key = await run_in_threadpool(variant_key, source_path, source_name, params)
+    dest_path = image_cache.path_for(key, OUTPUT_FORMATS[params.fm][1])
+    if await run_in_threadpool(image_cache.lookup, dest_path):
+        return dest_path
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_render(source_path, dest_path, params))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    # shield: si un cliente corta, el render sigue para los demás
+    await asyncio.shield(task)
+    return dest_path
+
+
+def image_cache_stats() -> dict:
+    return {**image_cache.stats(), "pool": image_pool.stats(), "inflight": len(_inflight)}
@@ -0,0 +1,145 @@
+# backend/app/services/image_transform.py
+"""
+Transformaciones de imagen con Pillow (redimensionar / recortar / convertir).
+
+Este módulo corre dentro de los procesos del pool de imágenes: no importa nada
+de la app (DB, settings) para que los workers arranquen livianos.
+"""
+from __future__ import annotations
+
+import base64
+import io
+import os
+from typing import NamedTuple, Optional
+
+from PIL import Image, ImageOps, features
+
+# ---- Config ----
+MAX_IMAGE_DIMENSION: int = int(os.getenv("MAX_IMAGE_DIMENSION", "4000"))
+# Píxeles de un original que se aceptan decodificar (por defecto, el doble de MAX_IMAGE_DIMENSION por lado).
+# Por encima se lanza Image.DecompressionBombError: un PNG de pocos KB puede ocupar GB al decodificarse.
+MAX_IMAGE_PIXELS: int = int(os.getenv("MAX_IMAGE_PIXELS", str((2 * MAX_IMAGE_DIMENSION) ** 2)))
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+# Formato de salida -> (formato Pillow, extensión, mime)
+OUTPUT_FORMATS = {
+    "jpg": ("JPEG", ".jpg", "image/jpeg"),
+    "png": ("PNG", ".png", "image/png"),
+    "webp": ("WEBP", ".webp", "image/webp"),
+}
+if features.check("avif"):
+    OUTPUT_FORMATS["avif"] = ("AVIF", ".avif", "image/avif")
+
+# fit: cómo encajar en w x h (estilo Contentful Images API)
+#   fit   conserva proporción dentro de la caja (por defecto)
+#   fill  cubre la caja y recorta el excedente (centrado)
+#   pad   conserva proporción y rellena hasta la caja
+#   scale estira a w x h exactos
+FITS = ("fit", "fill", "pad", "scale")
+
+
+class TransformParams(NamedTuple):
+    w: Optional[int]
+    h: Optional[int]
+    fm: str  # clave de OUTPUT_FORMATS
+    q: int
+    fit: str
+    bg: str  # color de relleno para `pad` y para aplanar transparencias en jpg
+
+
+def _open(source_path: str) -> Image.Image:
+    """Image.open con el límite de píxeles exacto (Pillow sólo falla a partir del doble y antes avisa)."""
+    img = Image.open(source_path)
+    if img.width * img.height > MAX_IMAGE_PIXELS:
+        img.close()
+        raise Image.DecompressionBombError(f"{img.width}x{img.height} supera MAX_IMAGE_PIXELS ({MAX_IMAGE_PIXELS})")
+    return img
+
+
+def _target_size(img: Image.Image, w: Optional[int], h: Optional[int]) -> tuple[int, int]:
+    """Completa la dimensión faltante conservando la proporción; nunca agranda."""
+    src_w, src_h = img.size
+    if w and h:
+        return w, h
+    if w:
+        w = min(w, src_w)
+        return w, max(1, round(src_h * w / src_w))
+    if h:
+        h = min(h, src_h)
+        return max(1, round(src_w * h / src_h)), h
+    return src_w, src_h
+
+
+def _resize(img: Image.Image, params: TransformParams) -> Image.Image:
+    if not params.w and not params.h:
+        return img
+    size = _target_size(img, params.w, params.h)
+    if params.fit == "scale" or not (params.w and params.h):
+        return img.resize(size, Image.LANCZOS) if size != img.size else img
+    if params.fit == "fill":
+        return ImageOps.fit(img, size, Image.LANCZOS)
+    if params.fit == "fit" and img.width <= size[0] and img.height <= size[1]:
+        return img
+    fitted = ImageOps.contain(img, size, Image.LANCZOS)
+    if params.fit == "pad":
+        canvas = Image.new("RGBA" if fitted.mode == "RGBA" else "RGB", size, params.bg)
+        canvas.paste(fitted, ((size[0] - fitted.width) // 2, (size[1] - fitted.height) // 2))
+        return canvas
+    return fitted
+
+
+def _for_format(img: Image.Image, pil_format: str, bg: str) -> Image.Image:
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    if pil_format == "JPEG":
+        if has_alpha:
+            rgba = img.convert("RGBA")
+            flat = Image.new("RGB", rgba.size, bg)
+            flat.paste(rgba, mask=rgba.getchannel("A"))
+            return flat
+        return img.convert("RGB") if img.mode != "RGB" else img
+    if img.mode not in ("RGB", "RGBA"):
+        return img.convert("RGBA" if has_alpha else "RGB")
+    return img
+
+
+def render(source_path: str, dest_path: str, params: TransformParams) -> int:
+    """Genera la variante en `dest_path` (escritura atómica). Devuelve su tamaño en bytes."""
+    with _open(source_path) as src:
+        src.seek(0)  # animados: primer frame
+        img = ImageOps.exif_transpose(src)
+        img = _resize(img, params)
+        pil_format = OUTPUT_FORMATS[params.fm][0]
+        img = _for_format(img, pil_format, params.bg)
+        save_kwargs = {}
+        if pil_format in ("JPEG", "WEBP", "AVIF"):
+            save_kwargs["quality"] = params.q
+        if pil_format == "JPEG":
+            save_kwargs.update(optimize=True, progressive=True)
+        elif pil_format == "PNG":
+            save_kwargs["optimize"] = True
+        tmp_path = f"{dest_path}.{os.getpid()}.part"
+        img.save(tmp_path, pil_format, **save_kwargs)
+    os.replace(tmp_path, dest_path)
+    return os.path.getsize(dest_path)
+
+
+def image_info(source_path: str) -> tuple[int, int]:
+    """Dimensiones (orientadas según EXIF) leyendo sólo la cabecera, sin decodificar píxeles."""
+    with _open(source_path) as src:
+        width, height = src.size
+        # Orientaciones 5-8 rotan 90°: ancho y alto se intercambian al mostrarse
+        if src.getexif().get(0x0112) in (5, 6, 7, 8):
+            return height, width
+        return width, height
+
+
+def placeholder(source_path: str, size: int = 16) -> str:
+    """LQIP: miniatura de `size` px en WebP/base64 lista para usar como data URI."""
+    with _open(source_path) as src:
+        src.seek(0)
+        img = ImageOps.exif_transpose(src)
+        img.thumbnail((size, size), Image.LANCZOS)
+        img = _for_format(img, "WEBP", "#ffffff")
+        buf = io.BytesIO()
+        img.save(buf, "WEBP", quality=40)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
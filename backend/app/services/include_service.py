@@ -0,0 +1,118 @@
+# backend/app/services/include_service.py
+"""
+Resolución de enlaces (`include=<depth>`) para delivery/preview, al estilo Contentful.
+
+Por nivel se juntan los ids enlazados desde las entries del nivel anterior (campos
+reference/media o Link/Array de Link, ver entry_validation.field_link) y se cargan con
+una consulta IN para entries y otra para assets (+ sus variantes). Los enlaces ya
+presentes en `items` o en niveles previos no se repiten, y el total se corta en
+INCLUDE_MAX_ITEMS.
+
+- Delivery: sólo entries publicadas (payload del snapshot).
+- Preview: cualquier entry.
+- Assets: se enlazan por nombre de archivo del store "images" (o su URL /static/images/...).
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content import ContentType, Entry, PublishedEntry
+from app.services.asset_service import ORIGINAL_URLS, asset_filename_from_url
+from app.services.entry_validation import field_link, link_id
+from app.services.snapshot_service import entry_to_payload
+from app.services.variant_service import assets_with_variants
+from app.services.version_service import DELIVERY
+
+# ---- Config ----
+INCLUDE_MAX_DEPTH: int = int(os.getenv("INCLUDE_MAX_DEPTH", "10"))
+INCLUDE_MAX_ITEMS: int = int(os.getenv("INCLUDE_MAX_ITEMS", "1000"))
+
+_ASSET_STORE = "images"
+
+
+def _asset_name(ref: str) -> Optional[str]:
+    if ref.startswith("/"):
+        return asset_filename_from_url(ref, ORIGINAL_URLS[_ASSET_STORE])
+    return ref
+
+
+async def _link_fields(db: AsyncSession, ct_ids: set, cache: Dict[str, List[Tuple[str, str, bool]]]) -> None:
+    """Carga (una consulta) los campos de enlace de los tipos que aún no están en `cache`."""
+    missing = [i for i in ct_ids if i not in cache]
+    if not missing:
+        return
+    result = await db.execute(select(ContentType.id, ContentType.schema).where(ContentType.id.in_(missing)))
+    for row in result:
+        schema = json.loads(row.schema) if isinstance(row.schema, str) else (row.schema or [])
+        links = []
+        for f in schema:
+            link = field_link(f) if isinstance(f, dict) else None
+            if link and f.get("id"):
+                links.append((f["id"], link[0], link[1]))
+        cache[row.id] = links
+    for ct_id in missing:
+        cache.setdefault(ct_id, [])
+
+
+def _collect(entries: List[dict], link_fields: Dict[str, List[Tuple[str, str, bool]]]) -> Tuple[List[str], List[str]]:
+    """Ids de entries y nombres de assets enlazados desde `entries` (en orden de aparición)."""
+    entry_ids: Dict[str, None] = {}
+    asset_names: Dict[str, None] = {}
+    for e in entries:
+        fields = e.get("fields") or {}
+        if isinstance(fields, str):
+            fields = json.loads(fields)
+        for fid, kind, many in link_fields.get(e.get("content_type_id"), ()):
+            value = fields.get(fid)
+            values = value if many and isinstance(value, list) else [value]
+            for v in values:
+                ref = link_id(v)
+                if not ref:
+                    continue
+                if kind == "Entry":
+                    entry_ids[ref] = None
+                else:
+                    name = _asset_name(ref)
+                    if name:
+                        asset_names[name] = None
+    return list(entry_ids), list(asset_names)
+
+
+async def _load_entries(db: AsyncSession, ids: List[str], scope: str) -> List[dict]:
+    if scope == DELIVERY:
+        result = await db.execute(select(PublishedEntry.entry_id, PublishedEntry.payload).where(PublishedEntry.entry_id.in_(ids)))
+        by_id = {row.entry_id: json.loads(row.payload) for row in result}
+    else:
+        result = await db.execute(select(Entry).where(Entry.id.in_(ids)))
+        by_id = {e.id: entry_to_payload(e) for e in result.scalars()}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+async def resolve_includes(db: AsyncSession, items: List[dict], scope: str, depth: int) -> Dict[str, List[dict]]:
+    """Bloque `includes` {"Entry": [...], "Asset": [...]} para las entries de `items`."""
+    includes: Dict[str, List[dict]] = {"Entry": [], "Asset": []}
+    seen_entries = {e.get("id") for e in items}
+    seen_assets: set = set()
+    link_fields: Dict[str, List[Tuple[str, str, bool]]] = {}
+    budget = INCLUDE_MAX_ITEMS
+    level = items
+    for _ in range(min(depth, INCLUDE_MAX_DEPTH)):
+        if not level or budget <= 0:
+            break
+        await _link_fields(db, {e.get("content_type_id") for e in level}, link_fields)
+        entry_ids, asset_names = _collect(level, link_fields)
+        entry_ids = [i for i in entry_ids if i not in seen_entries][:budget]
+        asset_names = [n for n in asset_names if n not in seen_assets][:max(budget - len(entry_ids), 0)]
+        seen_entries.update(entry_ids)
+        seen_assets.update(asset_names)
+        level = await _load_entries(db, entry_ids, scope) if entry_ids else []
+        assets = await assets_with_variants(db, _ASSET_STORE, asset_names) if asset_names else []
+        includes["Entry"].extend(level)
+        includes["Asset"].extend(assets)
+        budget -= len(level) + len(assets)
+    return includes
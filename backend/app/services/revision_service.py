@@ -0,0 +1,165 @@
+# backend/app/services/revision_service.py
+"""
+Historial de versiones de entries con almacenamiento por deltas.
+
+El documento versionado es {title, status, fields}. La versión v es checkpoint (documento
+completo) si (v - 1) % REVISION_CHECKPOINT_EVERY == 0 o si la entry es nueva (también con un
+id reutilizado); el resto guarda el patch RFC 6902 desde v - 1. Reconstruir una
+versión busca el último checkpoint <= v (no depende del REVISION_CHECKPOINT_EVERY actual)
+y aplica en memoria los patches siguientes (rango por la clave única entry_id, version).
+
+Entries previas al historial: el primer cambio registra antes su estado actual como versión 1.
+Las revisiones se insertan en la transacción del cambio (sin commit propio). Si otra
+transacción registró la misma versión a la vez, la clave única lo detecta y se responde 409.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import json_patch
+from app.core.pagination import clamp_limit, decode_offset_cursor, encode_offset_cursor
+from app.models.content import Entry, EntryRevision
+
+# ---- Config ----
+REVISION_CHECKPOINT_EVERY: int = max(int(os.getenv("REVISION_CHECKPOINT_EVERY", "20")), 1)
+
+
+def entry_document(e) -> Dict[str, Any]:
+    """Parte versionada de una entry (copia: el ORM muta `fields` en el mismo objeto)."""
+    fields = e.fields
+    if isinstance(fields, str):
+        fields = json.loads(fields)
+    # status aún es None antes del flush de una entry nueva (default de columna)
+    return {"title": e.title, "status": e.status or "DRAFT", "fields": copy.deepcopy(fields or {})}
+
+
+def _is_checkpoint(version: int) -> bool:
+    return (version - 1) % REVISION_CHECKPOINT_EVERY == 0
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _row(entry_id: str, version: int, before: Optional[dict], after: dict, user_email: Optional[str], now: datetime) -> dict:
+    if before is None or _is_checkpoint(version):
+        kind, data = "checkpoint", after
+    else:
+        kind, data = "patch", json_patch.diff(before, after)
+    return {"entry_id": entry_id, "version": version, "kind": kind, "data": _dumps(data), "created_by": user_email, "created_at": now}
+
+
+async def latest_versions(db: AsyncSession, entry_ids: List[str]) -> Dict[str, int]:
+    """Última versión registrada por entry (una consulta)."""
+    if not entry_ids:
+        return {}
+    result = await db.execute(
+        select(EntryRevision.entry_id, func.max(EntryRevision.version))
+        .where(EntryRevision.entry_id.in_(entry_ids))
+        .group_by(EntryRevision.entry_id)
+    )
+    return {entry_id: version for entry_id, version in result.all()}
+
+
+async def record_revisions(db: AsyncSession, changes: Iterable[Tuple[str, Optional[dict], dict]], user_email: Optional[str]) -> int:
+    """Registra (entry_id, documento anterior | None si es nueva, documento nuevo) con un INSERT executemany.
+    Omite los cambios que no alteran el documento. Devuelve las versiones creadas.
+    409 si otra transacción registró la misma versión de alguna de las entries."""
+    changes = [(entry_id, before, after) for entry_id, before, after in changes if before != after]
+    if not changes:
+        return 0
+    # También para las nuevas: un id reutilizado puede tener historial (p.ej. importado de nuevo)
+    latest = await latest_versions(db, [entry_id for entry_id, _, _ in changes])
+    now = datetime.utcnow()
+    rows = []
+    for entry_id, before, after in changes:
+        version = latest.get(entry_id, 0)
+        if version == 0 and before is not None:
+            # Entry anterior al historial: su estado previo pasa a ser la versión 1
+            rows.append(_row(entry_id, 1, None, before, None, now))
+            version = 1
+        rows.append(_row(entry_id, version + 1, before, after, user_email, now))
+    try:
+        await db.execute(insert(EntryRevision), rows)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="La entry fue modificada por otra operación; reintenta")
+    return len(changes)
+
+
+async def record_revision(db: AsyncSession, entry, before: Optional[dict], user_email: Optional[str]) -> None:
+    await record_revisions(db, [(entry.id, before, entry_document(entry))], user_email)
+
+
+async def delete_revisions(db: AsyncSession, entry_id: str) -> None:
+    await db.execute(
+        delete(EntryRevision).where(EntryRevision.entry_id == entry_id).execution_options(synchronize_session=False)
+    )
+
+
+async def delete_type_revisions(db: AsyncSession, content_type_id: str) -> None:
+    """Historial de todas las entries del tipo (antes de borrarlas en cascada)."""
+    await db.execute(
+        delete(EntryRevision)
+        .where(EntryRevision.entry_id.in_(select(Entry.id).where(Entry.content_type_id == content_type_id)))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _meta(r) -> dict:
+    return {
+        "version": r.version,
+        "kind": r.kind,
+        "created_by": r.created_by,
+        "created_at": r.created_at.isoformat() if r.created_at else None,
+    }
+
+
+async def list_revisions(db: AsyncSession, entry_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> dict:
+    """Versiones de la entry, la más reciente primero (sin reconstruir documentos)."""
+    limit = clamp_limit(limit)
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    result = await db.execute(
+        select(EntryRevision.version, EntryRevision.kind, EntryRevision.created_by, EntryRevision.created_at)
+        .where(EntryRevision.entry_id == entry_id)
+        .order_by(EntryRevision.version.desc())
+        .offset(offset)
+        .limit(limit + 1)
+    )
+    rows = result.all()
+    next_cursor = encode_offset_cursor(offset + limit) if len(rows) > limit else None
+    return {"items": [_meta(r) for r in rows[:limit]], "limit": limit, "next_cursor": next_cursor}
+
+
+async def get_revision(db: AsyncSession, entry_id: str, version: int) -> Optional[dict]:
+    """Metadatos + documento de la versión `version`, desde el último checkpoint anterior. None si no existe."""
+    start = (await db.execute(
+        select(EntryRevision.version)
+        .where(EntryRevision.entry_id == entry_id, EntryRevision.kind == "checkpoint", EntryRevision.version <= version)
+        .order_by(EntryRevision.version.desc())
+        .limit(1)
+    )).scalar()
+    if start is None:
+        return None
+    result = await db.execute(
+        select(EntryRevision)
+        .where(EntryRevision.entry_id == entry_id, EntryRevision.version >= start, EntryRevision.version <= version)
+        .order_by(EntryRevision.version)
+    )
+    rows = result.scalars().all()
+    if not rows or rows[-1].version != version:
+        return None
+    doc: Any = None
+    for r in rows:
+        data = json.loads(r.data)
+        doc = data if r.kind == "checkpoint" else json_patch.apply(doc, data)
+    return {**_meta(rows[-1]), "document": doc}
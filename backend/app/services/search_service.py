@@ -0,0 +1,175 @@
+# backend/app/services/search_service.py
+"""
+Índice de búsqueda full-text de entries (título + campos de texto del schema).
+
+- Postgres: tabla `entry_search(entry_id, document tsvector)` con índice GIN;
+  el título pesa 'A' y el cuerpo 'B' (ts_rank_cd).
+- SQLite: tabla virtual FTS5 `entry_search(entry_id UNINDEXED, title, body)`; bm25.
+
+El índice se mantiene en la misma transacción que el cambio de la entry.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import Float, String, select, text
+from sqlalchemy.engine import Connection
+
+from app.core.db import IS_SQLITE, DB_SCHEMA
+from app.models.content import Entry
+
+# Configuración de text search de Postgres (p.ej. simple, spanish, english)
+SEARCH_TS_CONFIG: str = os.getenv("SEARCH_TS_CONFIG", "simple")
+if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", SEARCH_TS_CONFIG):
+    raise RuntimeError(f"SEARCH_TS_CONFIG inválido: {SEARCH_TS_CONFIG}")
+
+# Campos cuyo contenido se indexa
+TEXT_FIELD_TYPES = ("shortText", "richText")
+
+_TABLE = "entry_search" if IS_SQLITE else f'"{DB_SCHEMA}".entry_search'
+_ENTRIES = "entries" if IS_SQLITE else f'"{DB_SCHEMA}".entries'
+_TYPES = "content_types" if IS_SQLITE else f'"{DB_SCHEMA}".content_types'
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ------------------------------------------------------------------
+# Documento
+# ------------------------------------------------------------------
+def _text_of(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return _text_of(value.get("text"))
+    if isinstance(value, list):
+        return " ".join(_text_of(v) for v in value)
+    return ""
+
+
+def _as_json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def document_body(schema: Iterable[dict], fields: dict) -> str:
+    """Concatena el texto de los campos shortText/richText declarados en el schema."""
+    fields = _as_json(fields) or {}
+    parts = [
+        _text_of(fields.get(f.get("id")))
+        for f in (_as_json(schema) or [])
+        if f.get("type") in TEXT_FIELD_TYPES
+    ]
+    return "\n".join(p for p in parts if p)
+
+
+# ------------------------------------------------------------------
+# SQL (compartido entre Connection sync y AsyncSession)
+# ------------------------------------------------------------------
+_DELETE_SQL = text(f"DELETE FROM {_TABLE} WHERE entry_id = :entry_id")
+_DELETE_TYPE_SQL = text(
+    f"DELETE FROM {_TABLE} WHERE entry_id IN (SELECT id FROM {_ENTRIES} WHERE content_type_id = :content_type_id)"
+)
+if IS_SQLITE:
+    # FTS5 no soporta UPSERT: se borra y se inserta
+    _INSERT_SQL = text(f"INSERT INTO {_TABLE} (entry_id, title, body) VALUES (:entry_id, :title, :body)")
+else:
+    _INSERT_SQL = text(
+        f"INSERT INTO {_TABLE} (entry_id, document) VALUES (:entry_id, "
+        f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', :title), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', :body), 'B')) "
+        "ON CONFLICT (entry_id) DO UPDATE SET document = EXCLUDED.document"
+    )
+
+
+def _params(entry_id: str, title: Optional[str], schema, fields) -> dict:
+    return {"entry_id": entry_id, "title": title or "", "body": document_body(schema, fields)}
+
+
+async def index_entry(db, entry, schema) -> None:
+    """Inserta/actualiza el documento de una entry. No hace commit."""
+    if IS_SQLITE:
+        await db.execute(_DELETE_SQL, {"entry_id": entry.id})
+    await db.execute(_INSERT_SQL, _params(entry.id, entry.title, schema, entry.fields))
+
+
+async def index_entries(db, entries: Iterable[Any], schemas: dict) -> None:
+    """Indexa entries nuevas en lote (executemany); `schemas` = {content_type_id: schema}. No hace commit."""
+    params = [_params(e.id, e.title, schemas.get(e.content_type_id), e.fields) for e in entries]
+    if params:
+        await db.execute(_INSERT_SQL, params)
+
+
+async def reindex_type(db, ct) -> None:
+    """Reindexa las entries de un tipo (cambió qué campos son de texto)."""
+    result = await db.execute(select(Entry).where(Entry.content_type_id == ct.id))
+    for e in result.scalars().all():
+        await index_entry(db, e, ct.schema)
+
+
+async def unindex_entry(db, entry_id: str) -> None:
+    await db.execute(_DELETE_SQL, {"entry_id": entry_id})
+
+
+async def unindex_type(db, content_type_id: str) -> None:
+    await db.execute(_DELETE_TYPE_SQL, {"content_type_id": content_type_id})
+
+
+def create_search_index(conn: Connection) -> None:
+    """DDL del índice (migraciones)."""
+    if IS_SQLITE:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS entry_search USING fts5("
+            "entry_id UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        return
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {_TABLE} (entry_id VARCHAR PRIMARY KEY, document TSVECTOR NOT NULL)"))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_entry_search_document ON {_TABLE} USING gin (document)"))
+
+
+def rebuild_search_index(conn: Connection) -> int:
+    """Reindexa todas las entries (migraciones / mantenimiento)."""
+    conn.execute(text(f"DELETE FROM {_TABLE}"))
+    schemas = {r[0]: r[1] for r in conn.execute(text(f"SELECT id, schema FROM {_TYPES}")).fetchall()}
+    rows = conn.execute(text(f"SELECT id, content_type_id, title, fields FROM {_ENTRIES}")).fetchall()
+    params = [_params(r[0], r[2], schemas.get(r[1]), r[3]) for r in rows]
+    if params:
+        conn.execute(_INSERT_SQL, params)
+    return len(params)
+
+
+# ------------------------------------------------------------------
+# Consulta
+# ------------------------------------------------------------------
+def _fts5_query(query: str) -> Optional[str]:
+    """Texto libre -> expresión FTS5 segura: términos entre comillas (AND), prefijo en el último."""
+    words = _WORD_RE.findall(query)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def ranked_matches(query: str):
+    """Subquery (entry_id, rank) de las entries que coinciden; mayor rank = más relevante.
+    Devuelve None si la consulta no tiene términos buscables."""
+    if IS_SQLITE:
+        expr = _fts5_query(query)
+        if expr is None:
+            return None
+        # bm25: menor es mejor; pesos por columna (entry_id, title, body)
+        sql = (
+            "SELECT entry_id, -bm25(entry_search, 0.0, 10.0, 1.0) AS rank "
+            "FROM entry_search WHERE entry_search MATCH :search_query"
+        )
+        params = {"search_query": expr}
+    else:
+        if not _WORD_RE.search(query):
+            return None
+        tsq = f"websearch_to_tsquery('{SEARCH_TS_CONFIG}', :search_query)"
+        sql = f"SELECT entry_id, ts_rank_cd(document, {tsq}) AS rank FROM {_TABLE} WHERE document @@ {tsq}"
+        params = {"search_query": query}
+    return text(sql).bindparams(**params).columns(entry_id=String, rank=Float).subquery("search")
@@ -0,0 +1,95 @@
+# backend/app/services/snapshot_service.py
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.content import Entry, PublishedEntry
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def entry_to_payload(e: Entry) -> Dict[str, Any]:
+    """Representación pública de una entry (misma forma que devolvía el ORM vía FastAPI)."""
+    return {
+        "id": e.id,
+        "content_type_id": e.content_type_id,
+        "title": e.title,
+        "status": e.status,
+        "fields": e.fields,
+        "created_by": e.created_by,
+        "updated_by": e.updated_by,
+        "created_at": _iso(e.created_at),
+        "updated_at": _iso(e.updated_at),
+    }
+
+
+def serialize_entry(e: Entry) -> str:
+    # Mismo formato compacto que JSONResponse de Starlette
+    return json.dumps(entry_to_payload(e), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _fill_snapshot(snap: PublishedEntry, e: Entry) -> PublishedEntry:
+    snap.content_type_id = e.content_type_id
+    snap.created_at = e.created_at or datetime.utcnow()
+    snap.payload = serialize_entry(e)
+    return snap
+
+
+def snapshot_values(e: Entry) -> Dict[str, Any]:
+    """Fila de published_entries para inserts en lote (executemany)."""
+    return {
+        "entry_id": e.id,
+        "content_type_id": e.content_type_id,
+        "created_at": e.created_at or datetime.utcnow(),
+        "published_at": datetime.utcnow(),
+        "payload": serialize_entry(e),
+    }
+
+
+async def write_snapshot(db: AsyncSession, e: Entry) -> None:
+    """Inserta/actualiza el snapshot de una entry publicada. No hace commit."""
+    snap = await db.get(PublishedEntry, e.id)
+    if snap is None:
+        db.add(_fill_snapshot(PublishedEntry(entry_id=e.id), e))
+    else:
+        _fill_snapshot(snap, e)
+
+
+async def remove_snapshot(db: AsyncSession, entry_id: str) -> int:
+    """Quita el snapshot (unpublish/archive/delete). No hace commit. Devuelve filas borradas."""
+    result = await db.execute(
+        delete(PublishedEntry).where(PublishedEntry.entry_id == entry_id).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def remove_type_snapshots(db: AsyncSession, content_type_id: str) -> None:
+    await db.execute(
+        delete(PublishedEntry)
+        .where(PublishedEntry.content_type_id == content_type_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def fill_snapshots(db: Session) -> int:
+    """Regenera todos los snapshots a partir de las entries publicadas. No hace commit."""
+    db.query(PublishedEntry).delete(synchronize_session=False)
+    count = 0
+    for e in db.query(Entry).filter(Entry.status == "PUBLISHED").yield_per(500):
+        db.add(_fill_snapshot(PublishedEntry(entry_id=e.id), e))
+        count += 1
+    return count
+
+
+def rebuild_snapshots(db: Session) -> int:
+    count = fill_snapshots(db)
+    db.commit()
+    return count
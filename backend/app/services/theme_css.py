@@ -0,0 +1,101 @@
+# backend/app/services/theme_css.py
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.theme import Theme
+from app.services.theme_service import get_active_theme
+
+# ---- Config ----
+# TTL del CSS "vigente" en memoria: acota cuánto tarda otro worker en ver un cambio.
+THEME_CSS_CACHE_TTL = float(os.getenv("THEME_CSS_CACHE_TTL", "30"))
+# Las versiones por hash son inmutables; se conservan más tiempo.
+THEME_CSS_HASH_TTL = float(os.getenv("THEME_CSS_HASH_TTL", "86400"))
+
+_css_cache = TTLCache(maxsize=32, ttl=THEME_CSS_CACHE_TTL)
+_CURRENT = "current"
+
+
+class ThemeCss(NamedTuple):
+    hash: str
+    css: str
+
+
+def render_theme_css(theme: Theme) -> str:
+    """Variables CSS del tema activo para ser consumidas por galeriq-web."""
+    # Generar CSS con variables personalizadas
+    return f"""/* Tema generado automáticamente desde CMS Galeriq */
+:root {{
+  --primary-color: {theme.primary_color or '#6366f1'};
+  --secondary-color: {theme.secondary_color or '#8b5cf6'};
+  --accent-color: {theme.accent_color or '#06b6d4'};
+  --background-color: {theme.background_color or '#ffffff'};
+  --text-color: {theme.text_color or '#1f2937'};
+  --theme-mode: {theme.mode or 'light'};
+}}
+
+/* Clases de utilidad para aplicar colores */
+.primary-bg {{ background-color: var(--primary-color); }}
+.secondary-bg {{ background-color: var(--secondary-color); }}
+.accent-bg {{ background-color: var(--accent-color); }}
+.primary-text {{ color: var(--primary-color); }}
+.secondary-text {{ color: var(--secondary-color); }}
+.accent-text {{ color: var(--accent-color); }}
+
+/* Estilos específicos para galeriq-web */
+.hero-section {{
+  background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
+  color: white;
+}}
+
+.btn-primary {{
+  background-color: var(--primary-color);
+  border-color: var(--primary-color);
+  color: white;
+}}
+
+.btn-primary:hover {{
+  background-color: var(--accent-color);
+  border-color: var(--accent-color);
+}}
+
+.navbar {{
+  background-color: var(--background-color);
+  color: var(--text-color);
+}}
+
+.card {{
+  background-color: var(--background-color);
+  border-color: var(--primary-color);
+}}
+"""
+
+
+def current_theme_css(db: Session) -> ThemeCss:
+    """CSS vigente desde memoria; sólo consulta la DB si la caché expiró o fue invalidada."""
+    cached = _css_cache.get(_CURRENT)
+    if cached is not None:
+        return cached
+    css = render_theme_css(get_active_theme(db))
+    item = ThemeCss(hash=hashlib.sha256(css.encode("utf-8")).hexdigest()[:16], css=css)
+    _css_cache.set(_CURRENT, item)
+    _css_cache.set(("hash", item.hash), item, ttl=THEME_CSS_HASH_TTL)
+    return item
+
+
+def theme_css_by_hash(css_hash: str) -> ThemeCss | None:
+    return _css_cache.get(("hash", css_hash))
+
+
+def invalidate_theme_css() -> None:
+    """Descarta el CSS vigente de este proceso (las versiones por hash siguen siendo válidas)."""
+    _css_cache.pop(_CURRENT)
+
+
+def theme_css_cache_stats() -> dict:
+    return _css_cache.stats()
@@ -1,8 +1,21 @@
 from sqlalchemy.orm import Session
 from app.models.theme import Theme
 from app.core.db import get_db
+from app.services.version_service import bump_versions, THEME
 from fastapi import Depends
 
+
+def get_active_theme(db: Session) -> Theme:
+    """Obtiene el tema activo (primer registro) o crea uno por defecto."""
+    t = db.query(Theme).order_by(Theme.id.asc()).first()
+    if not t:
+        t = Theme()
+        db.add(t)
+        db.commit()
+        db.refresh(t)
+    return t
+
+
 class ThemeService:
     def __init__(self, db: Session = Depends(get_db)):
         self.db = db
@@ -16,6 +29,7 @@ class ThemeService:
     def create(self, payload):
         obj = Theme(**payload.dict())
         self.db.add(obj)
+        bump_versions(self.db, THEME)
         self.db.commit()
         self.db.refresh(obj)
         return obj
@@ -24,6 +38,7 @@ class ThemeService:
         theme = self.get(theme_id)
         for key, value in update_data.items():
             setattr(theme, key, value)
+        bump_versions(self.db, THEME)
         self.db.commit()
         self.db.refresh(theme)
         return theme
@@ -31,5 +46,6 @@ class ThemeService:
     def delete(self, theme_id: int):
         theme = self.get(theme_id)
         self.db.delete(theme)
+        bump_versions(self.db, THEME)
         self.db.commit()
         return True
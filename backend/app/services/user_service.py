@@ -12,12 +12,20 @@ def get_user_by_email(db: Session, email: str) -> User | None:
     return db.query(User).filter(User.email == email.lower()).first()
 
 
+def save_user(db: Session, u: User) -> User:
+    """commit + refresh (las rutas async lo llaman con run_in_threadpool)."""
+    db.commit()
+    db.refresh(u)
+    return u
+
+
 def create_user(
     db: Session,
     *,
     full_name: str,
     email: str,
-    password: str,
+    password: str | None = None,
+    password_hash: str | None = None,
     phone: str | None = None,
     role_id: int | None = None,
     profile_image: str | None = None,
@@ -26,11 +34,14 @@ def create_user(
 ) -> User:
     if get_user_by_email(db, email):
         raise ValueError("El email ya está registrado")
+    if password_hash is None:
+        # Las rutas pasan el hash ya calculado en el pool (hash_password_async)
+        password_hash = hash_password(password)
 
     u = User(
         full_name=full_name,
         email=email.lower(),
-        password=hash_password(password),
+        password=password_hash,
         phone=phone,
         role_id=role_id if role_id is not None else User.DEFAULT_ROLE_ID,
         status=True,
@@ -0,0 +1,116 @@
+# backend/app/services/variant_service.py
+"""
+Generación anticipada de variantes (srcset) y placeholder LQIP de un asset.
+
+Se encola con BackgroundTasks al subir; las variantes quedan en la caché de
+derivados (image_service) y registradas en `asset_variants`, de modo que la
+primera petición de `/images/<file>?w=..&fm=..` ya es un hit.
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, List
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.db import AsyncSessionLocal
+from app.models.asset import Asset, AssetVariant
+from app.core.storage import storage
+from app.services.asset_service import ORIGINAL_URLS, TRANSFORM_URLS
+from app.services.image_service import (
+    DEFAULT_IMAGE_QUALITY, IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_WIDTHS, derived_image, run_in_pool,
+)
+from app.services.image_transform import OUTPUT_FORMATS, TransformParams, image_info, placeholder
+
+
+def variant_params(width: int, fm: str) -> TransformParams:
+    # Mismos valores por defecto que el endpoint /images/{filename}: la URL pública cae en la misma clave de caché
+    return TransformParams(w=width, h=None, fm=fm, q=DEFAULT_IMAGE_QUALITY, fit="fit", bg="#ffffff")
+
+
+def _widths_for(original_width: int) -> List[int]:
+    """Anchos configurados que no agrandan el original (al menos uno)."""
+    widths = [w for w in IMAGE_VARIANT_WIDTHS if w < original_width]
+    return widths or [original_width]
+
+
+async def generate_variants(asset_id: int) -> None:
+    """Job de fondo: genera las variantes faltantes y el placeholder del asset."""
+    try:
+        async with AsyncSessionLocal() as db:
+            asset = await db.get(Asset, asset_id)
+            # SVG y no-imágenes: no hay variantes raster que generar
+            if asset is None or not (asset.mime or "").startswith("image/") or asset.mime == "image/svg+xml":
+                return
+            existing = {
+                (v.width, v.format)
+                for v in (await db.execute(select(AssetVariant).where(AssetVariant.asset_id == asset_id))).scalars()
+            }
+            source_path = await storage.local_path(asset.store, asset.filename)
+            if not (asset.width and asset.height):
+                asset.width, asset.height = await run_in_pool(image_info, source_path)
+            width, height = asset.width, asset.height
+            for w in _widths_for(width):
+                for fm in IMAGE_VARIANT_FORMATS:
+                    if (w, fm) in existing:
+                        continue
+                    path = await derived_image(source_path, asset.filename, variant_params(w, fm))
+                    size = await run_in_threadpool(os.path.getsize, path)
+                    db.add(AssetVariant(
+                        asset_id=asset_id, width=w, height=max(1, round(height * w / width)), format=fm, size=size,
+                    ))
+            if not asset.placeholder:
+                asset.placeholder = await run_in_pool(placeholder, source_path)
+            await db.commit()
+    except Exception as e:
+        # Sin variantes el endpoint las genera bajo demanda; no es fatal
+        print(f"⚠️ No fue posible generar variantes del asset {asset_id}: {e}")
+
+
+def asset_payload(asset: Asset, variants: List[AssetVariant]) -> dict:
+    """Representación para delivery: original, placeholder, variantes y srcset por formato."""
+    base = TRANSFORM_URLS[asset.store] + asset.filename
+    items = [
+        {
+            "url": f"{base}?w={v.width}&fm={v.format}",
+            "width": v.width,
+            "height": v.height,
+            "format": v.format,
+            "mime": OUTPUT_FORMATS.get(v.format, (None, None, None))[2],
+            "size": v.size,
+        }
+        for v in sorted(variants, key=lambda v: (v.format, v.width))
+    ]
+    srcset: Dict[str, str] = {}
+    for item in items:
+        entry = f"{item['url']} {item['width']}w"
+        srcset[item["format"]] = f"{srcset[item['format']]}, {entry}" if item["format"] in srcset else entry
+    return {
+        "filename": asset.filename,
+        "store": asset.store,
+        "url": ORIGINAL_URLS[asset.store] + asset.filename,
+        "mime": asset.mime,
+        "size": asset.size,
+        "sha256": asset.sha256,
+        "width": asset.width,
+        "height": asset.height,
+        "placeholder": asset.placeholder,
+        "variants": items,
+        "srcset": srcset,
+    }
+
+
+async def assets_with_variants(db, store: str, filenames: List[str]) -> List[dict]:
+    """Payloads de varios assets (en el orden pedido) con 2 consultas en total."""
+    if not filenames:
+        return []
+    assets = (await db.execute(
+        select(Asset).where(Asset.store == store, Asset.filename.in_(filenames))
+    )).scalars().all()
+    by_id: Dict[int, List[AssetVariant]] = {a.id: [] for a in assets}
+    if by_id:
+        for v in (await db.execute(select(AssetVariant).where(AssetVariant.asset_id.in_(list(by_id))))).scalars():
+            by_id[v.asset_id].append(v)
+    by_name: Dict[str, Asset] = {a.filename: a for a in assets}
+    return [asset_payload(by_name[f], by_id[by_name[f].id]) for f in filenames if f in by_name]
@@ -0,0 +1,62 @@
+# backend/app/services/version_service.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.content_version import ContentVersion
+
+# Ámbitos conocidos
+DELIVERY = "delivery"   # entries publicadas + content types
+PREVIEW = "preview"     # cualquier entry + content types
+THEME = "theme"         # tema activo
+
+
+def _bump_stmt(scope: str, now: datetime):
+    return (
+        update(ContentVersion)
+        .where(ContentVersion.scope == scope)
+        .values(version=ContentVersion.version + 1, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _version_stmt(scope: str):
+    return select(ContentVersion.version, ContentVersion.updated_at).where(ContentVersion.scope == scope)
+
+
+def bump_versions(db: Session, *scopes: str) -> None:
+    """Incrementa la versión de cada ámbito. No hace commit (va en la transacción del cambio)."""
+    now = datetime.utcnow()
+    for scope in scopes:
+        if not db.execute(_bump_stmt(scope, now)).rowcount:
+            # Las filas las siembra la migración 007; esto sólo cubre ámbitos nuevos
+            db.add(ContentVersion(scope=scope, version=1, updated_at=now))
+
+
+async def bump_versions_async(db: AsyncSession, *scopes: str) -> None:
+    """Variante async de bump_versions."""
+    now = datetime.utcnow()
+    for scope in scopes:
+        if not (await db.execute(_bump_stmt(scope, now))).rowcount:
+            db.add(ContentVersion(scope=scope, version=1, updated_at=now))
+
+
+def get_version(db: Session, scope: str) -> Tuple[int, datetime | None]:
+    """Versión actual del ámbito (lookup por PK)."""
+    row = db.execute(_version_stmt(scope)).first()
+    if not row:
+        return 0, None
+    return row.version, row.updated_at
+
+
+async def get_version_async(db: AsyncSession, scope: str) -> Tuple[int, datetime | None]:
+    row = (await db.execute(_version_stmt(scope))).first()
+    if not row:
+        return 0, None
+    return row.version, row.updated_at
+
@@ -0,0 +1,41 @@
+# backend/bench_jwt.py
+"""
+Micro-benchmark de verificación de JWT: python-jose vs PyJWT, y el efecto de la caché de claims.
+
+    python bench_jwt.py            # 20000 iteraciones
+    python bench_jwt.py 100000
+
+Elegir backend con JWT_BACKEND=jose|pyjwt (PyJWT es opcional: pip install PyJWT).
+"""
+import sys
+import time
+
+from app.core import security
+from app.core.security import create_access_token, decode_access_token, jwt_decode, token_claims_cache
+
+
+def _per_call_us(fn, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) * 1_000_000 / n
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    token = create_access_token("bench@example.com", 1)
+    backends = ["jose"] + (["pyjwt"] if security.pyjwt is not None else [])
+    print(f"{n} iteraciones | backend configurado: {security.JWT_BACKEND}")
+    for backend in backends:
+        us = _per_call_us(lambda: jwt_decode(token, backend=backend), n)
+        print(f"  decode {backend:<6}: {us:8.1f} µs/token")
+    if security.pyjwt is None:
+        print("  (PyJWT no instalado: pip install PyJWT para comparar)")
+    token_claims_cache.clear()
+    decode_access_token(token)
+    us = _per_call_us(lambda: decode_access_token(token), n)
+    print(f"  decode cacheado  : {us:8.1f} µs/token  (JWT_CACHE_SIZE={security.JWT_CACHE_SIZE}, TTL={security.JWT_CACHE_TTL:g}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# backend/bench_password.py
+"""
+Micro-benchmark de hashing de contraseñas para calibrar PASSWORD_PBKDF2_ROUNDS.
+
+Correr en el hardware de producción (idealmente con la carga típica):
+    python bench_password.py                  # tabla de latencias
+    python bench_password.py --target-ms 100  # rounds sugeridos para ~100 ms por verificación
+
+Subir PASSWORD_PBKDF2_ROUNDS es transparente: los hashes con menos rounds se
+re-hashean en el siguiente login correcto. Tener en cuenta PASSWORD_WORKERS:
+cada verificación ocupa un proceso del pool durante ese tiempo.
+"""
+import statistics
+import sys
+import time
+
+from passlib.hash import pbkdf2_sha256
+
+from app.core.security import PASSWORD_PBKDF2_ROUNDS, PASSWORD_WORKERS
+
+ROUNDS = (29000, 100000, 210000, 310000, 600000)
+
+
+def benchmark_pbkdf2(rounds: int, samples: int = 5) -> float:
+    """Mediana en ms de verificar un hash pbkdf2_sha256 con `rounds` en esta máquina."""
+    hashed = pbkdf2_sha256.using(rounds=rounds).hash("benchmark-password")
+    timings = []
+    for _ in range(max(samples, 1)):
+        started = time.perf_counter()
+        pbkdf2_sha256.verify("benchmark-password", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_pbkdf2_rounds(target_ms: float, probe_rounds: int = 20000) -> int:
+    """Rounds para que una verificación tarde ~target_ms (el costo de pbkdf2 es lineal en rounds)."""
+    per_round = benchmark_pbkdf2(probe_rounds) / probe_rounds
+    # Redondeo a miles; pbkdf2_sha256 de passlib exige al menos 1000
+    return max(int(target_ms / per_round) // 1000 * 1000, 1000)
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    print(f"PASSWORD_PBKDF2_ROUNDS actual: {PASSWORD_PBKDF2_ROUNDS} | PASSWORD_WORKERS: {PASSWORD_WORKERS}")
+    for rounds in sorted(set(ROUNDS) | {PASSWORD_PBKDF2_ROUNDS}):
+        ms = benchmark_pbkdf2(rounds)
+        # Techo de logins/s del pool si sólo hiciera esto
+        print(f"  pbkdf2_sha256 rounds={rounds:>7}: {ms:8.1f} ms/verify  (~{PASSWORD_WORKERS * 1000 / ms:,.0f} verify/s)")
+    if "--target-ms" in args:
+        target_ms = float(args[args.index("--target-ms") + 1])
+        rounds = calibrate_pbkdf2_rounds(target_ms)
+        print(f"✅ Para ~{target_ms:g} ms por verificación: PASSWORD_PBKDF2_ROUNDS={rounds} "
+              f"(medido: {benchmark_pbkdf2(rounds):.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
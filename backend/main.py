@@ -2,18 +2,22 @@
 from __future__ import annotations
 
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from app.core.db import Base, engine, SessionLocal, ensure_schema_and_search_path, ensure_user_profile_columns, ensure_content_columns, ensure_api_key_columns
+from app.core.pool_metrics import start_request_stats
+from app.core.db import engine
+from app.core.storage import media_app
+from app.core.migrations import check_schema_version
 
 # importa modelos para que se creen las tablas
 from app.models import api_key, theme, user  # noqa: F401
 from app.models.api_key import ApiKey        # noqa: F401
 from app.models.theme import Theme           # noqa: F401
 from app.models.user import User             # noqa: F401
-from app.models.content import ContentType, Entry  # noqa: F401
+from app.models.content import ContentType, Entry, PublishedEntry, EntryRevision  # noqa: F401
+from app.models.content_version import ContentVersion  # noqa: F401
+from app.models.asset import Asset           # noqa: F401
 
 # routers
 from app.routes.root import router as root_router
@@ -53,19 +57,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# estáticos (avatares)
-os.makedirs("uploads/avatars", exist_ok=True)
-app.mount("/static/avatars", StaticFiles(directory="uploads/avatars"), name="avatars")
-
-# DB: schema + tablas
-ensure_schema_and_search_path()
-Base.metadata.create_all(bind=engine)
-# Migración ligera: columnas opcionales de perfil
-ensure_user_profile_columns()
-# Migración ligera: columnas de contenido (owner/auditoría)
-ensure_content_columns()
-# Migración ligera: columnas de api_keys (space_id & tokens)
-ensure_api_key_columns()
+# estáticos (avatares): disco local o redirect al bucket según MEDIA_STORAGE
+app.mount("/static/avatars", media_app("avatars"), name="avatars")
+# URL que guardan register / PUT /users/me/avatar en profile_image
+app.mount("/uploads/avatars", media_app("avatars"), name="uploaded_avatars")
+
+# DB: el esquema lo gestiona `python migrate.py`; aquí sólo se compara la versión
+check_schema_version()
 try:
     from app.core.db import DATABASE_URL, IS_SQLITE, DB_SCHEMA
     print(f"🔧 DB_URL={DATABASE_URL} | IS_SQLITE={IS_SQLITE} | SCHEMA={DB_SCHEMA}")
@@ -87,20 +85,37 @@ app.include_router(delivery_router)
 app.include_router(preview_router)
 
 # estáticos (imágenes)
-os.makedirs("uploads/images", exist_ok=True)
-app.mount("/static/images", StaticFiles(directory="uploads/images"), name="images")
+app.mount("/static/images", media_app("images"), name="images")
 app.include_router(api_keys_router)
 app.include_router(themes_router)
 app.include_router(content_types_router)
 app.include_router(entries_router)
 # app.include_router(users_router)
 
+# Telemetría de conexiones por request (Server-Timing)
+@app.middleware("http")
+async def db_pool_timing(request: Request, call_next):
+    stats = start_request_stats()
+    response = await call_next(request)
+    if stats["checkouts"]:
+        response.headers["Server-Timing"] = (
+            f'db-pool;dur={stats["wait_ms"]:.2f};desc="{stats["checkouts"]} checkouts"'
+        )
+    return response
+
 # seed admin
 @app.on_event("startup")
 def startup_message():
     # Mostrar únicamente un mensaje indicando que el backend corre correctamente
     print("✅ Backend CMS iniciado correctamente")
 
+@app.on_event("shutdown")
+def shutdown_workers():
+    from app.services.image_service import shutdown_image_pool
+    from app.core.security import password_pool
+    shutdown_image_pool()
+    password_pool.shutdown()
+
 @app.get("/health/db")
 def health_db():
     # endpoint para verificar conexión
@@ -111,6 +126,45 @@ def health_db():
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
+@app.get("/health/db/pool")
+def health_db_pool():
+    # estado en vivo de los pools (sync y async) de este proceso
+    from app.core.db import async_engine, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT
+    from app.core.pool_metrics import pool_stats
+    return {
+        "config": {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        },
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.sync_engine.pool),
+    }
+
+@app.get("/health/auth")
+def health_auth():
+    # cola del pool de hashing y contadores de throttling de login de este proceso
+    from app.core.security import password_pool
+    from app.core.rate_limit import login_throttle_stats
+    return {"password_pool": password_pool.stats(), "login_throttle": login_throttle_stats()}
+
+@app.get("/health/cache")
+def health_cache():
+    # contadores de las cachés en memoria de este proceso
+    from app.services.api_key_service import token_cache
+    from app.services.theme_css import theme_css_cache_stats
+    from app.services.image_service import image_cache_stats
+    from app.core.security import token_claims_cache
+    from app.services.entry_validation import validator_cache
+    return {
+        "api_tokens": token_cache.stats(),
+        "jwt_claims": token_claims_cache.stats(),
+        "theme_css": theme_css_cache_stats(),
+        "images": image_cache_stats(),
+        "entry_validators": validator_cache.stats(),
+    }
+
 @app.get("/")
 def root():
     return {"ok": True, "service": "Galeriq CMS API"}
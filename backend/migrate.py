@@ -0,0 +1,34 @@
+# backend/migrate.py
+"""
+Aplica las migraciones pendientes del esquema.
+
+Ejecutar una vez por despliegue (antes de levantar los workers):
+    python migrate.py            # aplica las pendientes
+    python migrate.py --status   # muestra versión actual y pendientes
+"""
+import sys
+
+from app.core.migrations import MIGRATIONS, LATEST_VERSION, current_version, run_migrations
+
+
+def status() -> None:
+    version = current_version()
+    print(f"Versión del esquema: {version} (última: {LATEST_VERSION})")
+    for m in MIGRATIONS:
+        mark = "✔" if m.version <= version else "·"
+        print(f"  {mark} {m.version:03d} {m.name}")
+
+
+def main() -> None:
+    if "--status" in sys.argv[1:]:
+        status()
+        return
+    applied = run_migrations()
+    if not applied:
+        print("✅ El esquema ya está al día.")
+    else:
+        print(f"✅ {len(applied)} migración(es) aplicada(s). Versión {LATEST_VERSION}.")
+
+
+if __name__ == "__main__":
+    main()
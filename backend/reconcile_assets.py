@@ -0,0 +1,103 @@
+# backend/reconcile_assets.py
+"""
+Concilia la tabla `assets` con los archivos del storage (disco local o bucket S3).
+
+- Indexa los archivos de cada store que no tienen fila (subidos antes del catálogo):
+  sha256, tamaño, mime y dimensiones. Conservan su nombre: las URLs ya guardadas
+  en entries / usuarios siguen funcionando.
+- Completa dimensiones faltantes de filas existentes.
+- Con --prune, borra las filas cuyo archivo ya no existe.
+
+    python reconcile_assets.py             # aplica
+    python reconcile_assets.py --dry-run   # sólo informa
+    python reconcile_assets.py --prune     # además quita filas huérfanas
+"""
+import hashlib
+import mimetypes
+import os
+import sys
+
+from sqlalchemy import delete, select
+
+from app.core.db import SessionLocal
+from app.core.static_files import COMPRESSIBLE_EXTS, SIDECARS
+from app.core.storage import storage
+from app.core.uploads import UPLOAD_CHUNK_SIZE
+from app.models.asset import Asset, AssetVariant
+from app.services.asset_service import STORES, image_dimensions
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_sidecar(name: str) -> bool:
+    # `logo.svg.br` / `logo.svg.gz`: variantes precomprimidas que sirve MediaFiles
+    base, suffix = os.path.splitext(name)
+    return suffix in {s for _, s in SIDECARS} and os.path.splitext(base)[1].lower() in COMPRESSIBLE_EXTS
+
+
+def reconcile_store(db, store: str, dry_run: bool, prune: bool) -> dict:
+    rows = {a.filename: a for a in db.execute(select(Asset).where(Asset.store == store)).scalars()}
+    known_hashes = {a.sha256: a.filename for a in rows.values()}
+    stats = {"indexed": 0, "updated": 0, "duplicates": 0, "pruned": 0}
+    in_storage = set()
+    # storage.list omite ocultos (.tmp) y parciales; con S3, fetch descarga el original a la caché local
+    for name, size in storage.list(store):
+        if _is_sidecar(name):
+            continue
+        in_storage.add(name)
+        asset = rows.get(name)
+        if asset is not None:
+            if asset.width is None and (asset.mime or "").startswith("image/"):
+                asset.width, asset.height = image_dimensions(storage.fetch(store, name))
+                stats["updated"] += 1
+            continue
+        path = storage.fetch(store, name)
+        sha256 = _sha256(path)
+        if sha256 in known_hashes:
+            # (store, sha256) es único: un duplicado heredado queda fuera del catálogo
+            print(f"⚠️ {store}/{name}: mismo contenido que {known_hashes[sha256]}, no se indexa")
+            stats["duplicates"] += 1
+            continue
+        width, height = image_dimensions(path)
+        known_hashes[sha256] = name
+        stats["indexed"] += 1
+        if not dry_run:
+            db.add(Asset(
+                store=store, sha256=sha256, filename=name, size=size,
+                mime=mimetypes.guess_type(name)[0], width=width, height=height, ref_count=1,
+            ))
+    if prune:
+        orphans = [a.id for name, a in rows.items() if name not in in_storage]
+        stats["pruned"] = len(orphans)
+        if orphans and not dry_run:
+            db.execute(delete(AssetVariant).where(AssetVariant.asset_id.in_(orphans)))
+            db.execute(delete(Asset).where(Asset.id.in_(orphans)))
+    return stats
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    dry_run, prune = "--dry-run" in args, "--prune" in args
+    db = SessionLocal()
+    try:
+        for store in STORES:
+            stats = reconcile_store(db, store, dry_run, prune)
+            print(f"{store}: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+        if dry_run:
+            db.rollback()
+            print("ℹ️ --dry-run: no se guardaron cambios.")
+        else:
+            db.commit()
+            print("✅ Catálogo conciliado.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# backend/tests/conftest.py
+"""
+Fixtures comunes: BD SQLite y directorios de media en un tmp por sesión.
+
+El entorno se fija antes de importar la app (la config se lee al importar los módulos).
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+_TMP = tempfile.mkdtemp(prefix="cms-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["IMAGES_DIR"] = os.path.join(_TMP, "uploads", "images")
+os.environ["AVATAR_DIR"] = os.path.join(_TMP, "uploads", "avatars")
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(_TMP, "uploads", ".derived")
+os.environ.setdefault("MEDIA_STORAGE", "local")
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def tmp_root():
+    return _TMP
+
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    from app.core.security import create_access_token
+    return {"Authorization": f"Bearer {create_access_token('admin@test.local', 1)}", "X-Role": "admin"}
+
+
+@pytest.fixture
+def uid():
+    """Sufijo único: los tests comparten la BD de la sesión."""
+    return uuid.uuid4().hex[:10]
+
+
+@pytest.fixture
+def content_type(client, admin_headers, uid):
+    """ContentType con un campo de texto y uno numérico."""
+    payload = {
+        "id": f"ct-{uid}",
+        "name": "Post",
+        "api_id": f"post_{uid}",
+        "schema": [
+            {"id": "slug", "name": "Slug", "type": "shortText"},
+            {"id": "price", "name": "Price", "type": "number"},
+        ],
+    }
+    r = client.post("/content_types", json=payload, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.fixture(scope="session")
+def api_key(client, admin_headers):
+    """API key con tokens de delivery/preview (una por sesión)."""
+    r = client.post("/api-keys", json={"name": "tests"}, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.fixture
+def make_entry(client, admin_headers):
+    def make(content_type_id: str, id: str, **fields):
+        r = client.post(
+            "/entries", json={"id": id, "content_type_id": content_type_id, "title": id, "fields": fields}, headers=admin_headers,
+        )
+        assert r.status_code == 200, r.text
+        return r.json()
+    return make
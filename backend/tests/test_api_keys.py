@@ -0,0 +1,33 @@
+# backend/tests/test_api_keys.py
+import asyncio
+
+from app.core.db import AsyncSessionLocal
+from app.services.api_key_service import invalidate_tokens, resolve_delivery_token, token_cache
+
+
+def test_revoke_during_resolve_is_not_recached(client, admin_headers, api_key, monkeypatch):
+    token = api_key["delivery_token"]
+    token_cache.pop(("delivery", token))
+
+    async def racing_resolve():
+        async with AsyncSessionLocal() as db:
+            real_execute = db.execute
+
+            async def execute(*args, **kwargs):
+                result = await real_execute(*args, **kwargs)
+                # La revocación llega entre la consulta y el set en la caché
+                invalidate_tokens(token, None)
+                return result
+
+            monkeypatch.setattr(db, "execute", execute)
+            return await resolve_delivery_token(db, token)
+
+    assert asyncio.run(racing_resolve()) is not None
+    assert token_cache.get(("delivery", token), None) is None
+
+    async def resolve():
+        async with AsyncSessionLocal() as db:
+            return await resolve_delivery_token(db, token)
+
+    assert asyncio.run(resolve()) is not None
+    assert token_cache.get(("delivery", token), None) is not None
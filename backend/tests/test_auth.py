@@ -0,0 +1,27 @@
+# backend/tests/test_auth.py
+from app.core.security import create_access_token
+
+
+def test_create_login_and_change_password(client, uid):
+    email = f"user-{uid}@example.com"
+    r = client.post("/users", json={"email": email, "password": "primera-clave", "full_name": "Test"})
+    assert r.status_code == 201, r.text
+    assert client.post("/users", json={"email": email, "password": "x", "full_name": "Test"}).status_code == 409
+
+    r = client.post("/auth/login", json={"email": email.upper(), "password": "primera-clave"})
+    assert r.status_code == 200, r.text
+    assert r.json()["user"]["email"] == email
+
+    headers = {"Authorization": f"Bearer {create_access_token(email, 1)}"}
+    r = client.put("/users/me/password", json={"current_password": "incorrecta", "new_password": "segunda-clave"}, headers=headers)
+    assert r.status_code == 400
+    r = client.put("/users/me/password", json={"current_password": "primera-clave", "new_password": "segunda-clave"}, headers=headers)
+    assert r.status_code == 200, r.text
+
+    assert client.post("/auth/login", json={"email": email, "password": "primera-clave"}).status_code == 401
+    assert client.post("/auth/login", json={"email": email, "password": "segunda-clave"}).status_code == 200
+
+
+def test_login_unknown_user(client, uid):
+    r = client.post("/auth/login", json={"email": f"nadie-{uid}@example.com", "password": "x"})
+    assert r.status_code == 401
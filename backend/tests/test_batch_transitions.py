@@ -0,0 +1,63 @@
+# backend/tests/test_batch_transitions.py
+import pytest
+
+
+def _batch(client, headers, action, **payload):
+    return client.post(f"/entries/batch/{action}", json=payload, headers=headers)
+
+
+def _delivery_ids(client, api_key, ct):
+    r = client.get(
+        f"/delivery/{api_key['space_id']}/entries", params={"content_type_id": ct},
+        headers={"X-Delivery-Token": api_key["delivery_token"]},
+    )
+    assert r.status_code == 200, r.text
+    return sorted(e["id"] for e in r.json()["items"])
+
+
+def test_batch_by_ids_reports_outcomes_and_updates_delivery(client, admin_headers, api_key, content_type, make_entry, uid):
+    ct = content_type["id"]
+    ids = [make_entry(ct, f"{uid}-{i}", slug=f"s{i}")["id"] for i in range(3)]
+
+    r = _batch(client, admin_headers, "publish", ids=ids[:2] + [f"{uid}-missing", ids[0]])
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["status"], body["updated"], body["unchanged"], body["not_found"]) == ("PUBLISHED", 2, 0, 1)
+    assert [x["id"] for x in body["results"]] == ids[:2] + [f"{uid}-missing"]  # sin repetidos
+    assert _delivery_ids(client, api_key, ct) == sorted(ids[:2])
+
+    body = _batch(client, admin_headers, "publish", ids=ids).json()
+    assert (body["updated"], body["unchanged"]) == (1, 2)
+
+    body = _batch(client, admin_headers, "unpublish", ids=[ids[1]]).json()
+    assert body["updated"] == 1
+    assert _delivery_ids(client, api_key, ct) == sorted([ids[0], ids[2]])
+    assert client.get(f"/entries/{ids[1]}", headers=admin_headers).json()["status"] == "DRAFT"
+
+
+def test_batch_by_filter(client, admin_headers, api_key, content_type, make_entry, uid):
+    ct = content_type["id"]
+    ids = [make_entry(ct, f"{uid}-{i}", slug=f"s{i}")["id"] for i in range(4)]
+    assert _batch(client, admin_headers, "publish", ids=ids[:2]).json()["updated"] == 2
+
+    body = _batch(client, admin_headers, "archive", filter={"content_type_id": ct, "status": "DRAFT"}).json()
+    assert sorted(x["id"] for x in body["results"]) == sorted(ids[2:])
+    assert body["updated"] == 2
+
+    body = _batch(client, admin_headers, "archive", filter={"content_type_id": ct}).json()
+    assert (body["updated"], body["unchanged"]) == (2, 2)
+    assert _delivery_ids(client, api_key, ct) == []
+
+
+@pytest.mark.parametrize("payload", [
+    {"filter": {}},
+    {"filter": {"content_type_id": ""}},
+    {},
+    {"ids": ["x"], "filter": {"status": "DRAFT"}},
+])
+def test_batch_rejects_empty_or_ambiguous_selection(client, admin_headers, payload):
+    assert _batch(client, admin_headers, "publish", **payload).status_code == 422
+
+
+def test_batch_unknown_action(client, admin_headers):
+    assert _batch(client, admin_headers, "delete", ids=["x"]).status_code == 422
@@ -0,0 +1,81 @@
+# backend/tests/test_bulk_ndjson.py
+import json
+
+from app.services import bulk_service
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _line(id, ct, status="DRAFT", **fields):
+    return json.dumps({"id": id, "content_type_id": ct, "title": id, "fields": fields, "status": status})
+
+
+def _export(client, headers, **params):
+    r = client.get("/entries/export", params=params, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in r.text.splitlines() if line]
+
+
+def test_import_reports_partial_failures_by_line(client, admin_headers, content_type, uid, monkeypatch):
+    monkeypatch.setattr(bulk_service, "BULK_BATCH_SIZE", 3)
+    ct = content_type["id"]
+    lines = [
+        _line(f"{uid}-0", ct, "PUBLISHED", slug="a", price=1),   # 1
+        "{no es json",                                             # 2
+        _line(f"{uid}-1", "no-existe"),                           # 3
+        "",                                                        # 4 (se ignora)
+        _line(f"{uid}-2", ct, price="caro"),                      # 5 validación
+        _line(f"{uid}-3", ct, slug="b"),                          # 6
+        _line(f"{uid}-0", ct, slug="dup"),                        # 7 ya creada en el lote anterior
+        json.dumps({"content_type_id": ct}),                       # 8 falta id
+        _line(f"{uid}-4", ct, slug="c"),                          # 9
+        _line(f"{uid}-4", ct, slug="c2"),                         # 10 repetida en el mismo lote
+    ]
+    body = "\n".join(lines).encode()
+    chunks = (body[i:i + 7] for i in range(0, len(body), 7))  # trozos que parten líneas
+    r = client.post("/entries/bulk", content=chunks, headers={**admin_headers, **NDJSON})
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert (report["received"], report["created"], report["failed"]) == (9, 3, 6)
+    assert report["batches"] >= 2
+    errors = {e["line"]: e for e in report["errors"]}
+    assert sorted(errors) == [2, 3, 5, 7, 8, 10]
+    assert errors[3]["detail"] == "ContentType not found"
+    assert errors[5]["detail"].startswith("price:")
+    assert errors[7]["detail"] == "Entry already exists" and errors[7]["id"] == f"{uid}-0"
+    assert errors[8]["detail"].startswith("id:")
+
+    exported = _export(client, admin_headers, content_type_id=ct)
+    assert [e["id"] for e in exported] == [f"{uid}-0", f"{uid}-3", f"{uid}-4"]
+    assert exported[0]["status"] == "PUBLISHED" and exported[2]["fields"] == {"slug": "c"}
+    assert [e["id"] for e in _export(client, admin_headers, content_type_id=ct, status="PUBLISHED")] == [f"{uid}-0"]
+
+
+def test_export_reimports_into_another_type(client, admin_headers, content_type, uid):
+    ct = content_type["id"]
+    body = "\n".join(_line(f"{uid}-{i}", ct, slug=f"s{i}", price=i) for i in range(4))
+    assert client.post("/entries/bulk", content=body, headers={**admin_headers, **NDJSON}).json()["created"] == 4
+
+    exported = _export(client, admin_headers, content_type_id=ct)
+    # Reimportar tal cual: todo duplicado
+    again = "\n".join(json.dumps(e) for e in exported)
+    report = client.post("/entries/bulk", content=again, headers={**admin_headers, **NDJSON}).json()
+    assert (report["created"], report["failed"]) == (0, 4)
+
+    renamed = "\n".join(json.dumps({**e, "id": f"{e['id']}-copy"}) for e in exported)
+    report = client.post("/entries/bulk", content=renamed, headers={**admin_headers, **NDJSON}).json()
+    assert (report["created"], report["failed"]) == (4, 0)
+    copies = {e["id"]: e["fields"] for e in _export(client, admin_headers, content_type_id=ct) if e["id"].endswith("-copy")}
+    assert copies == {f"{e['id']}-copy": e["fields"] for e in exported}
+
+
+def test_import_rejects_oversized_line(client, admin_headers, content_type, uid, monkeypatch):
+    monkeypatch.setattr(bulk_service, "BULK_MAX_LINE_BYTES", 64)
+    body = _line(f"{uid}-big", content_type["id"], slug="x" * 200)
+    r = client.post("/entries/bulk", content=body.encode(), headers={**admin_headers, **NDJSON})
+    assert r.status_code == 413
+
+
+def test_export_unknown_type(client, admin_headers):
+    assert client.get("/entries/export", params={"content_type_id": "zz-no-existe"}, headers=admin_headers).status_code == 404
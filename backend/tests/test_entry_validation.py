@@ -0,0 +1,119 @@
+# backend/tests/test_entry_validation.py
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.entry_validation import check_schema, compile_schema, get_validator, validator_cache
+
+
+def _errors(schema, fields):
+    return {e["field"]: e["detail"] for e in compile_schema(schema).errors(fields)}
+
+
+def test_type_checks():
+    schema = [
+        {"id": "title", "type": "shortText", "required": True},
+        {"id": "count", "type": "number", "config": {"variant": "integer"}},
+        {"id": "flag", "type": "boolean"},
+        {"id": "when", "type": "datetime"},
+        {"id": "tags", "type": "shortText", "config": {"mode": "list"}},
+        {"id": "refs", "type": "reference", "config": {"multiple": True}},
+        {"id": "blob", "type": "json"},
+    ]
+    ok = {
+        "title": {"text": "Hola", "style": {}}, "count": 3, "flag": False, "when": {"date": "2024-02-29", "time": "10:30"},
+        "tags": ["a", "b"], "refs": ["x", {"id": "y"}], "blob": {"any": [1]}, "extra": "no se valida",
+    }
+    assert _errors(schema, ok) == {}
+    bad = {"title": {"text": ""}, "count": 1.5, "flag": "yes", "when": {"date": "2023-02-29"}, "tags": "a", "refs": [{"id": 3}]}
+    assert set(_errors(schema, bad)) == {"title", "count", "flag", "when", "tags", "refs"}
+    assert _errors(schema, {"title": "x", "count": True})["count"] == "debe ser un número"
+
+
+def test_schema_validations():
+    schema = [
+        {"id": "slug", "type": "shortText", "validations": [
+            {"size": {"min": 2, "max": 5}}, {"regexp": {"pattern": "^[a-z]+$"}, "message": "sólo minúsculas"},
+        ]},
+        {"id": "price", "type": "number", "validations": [{"range": {"min": 0, "max": 10}}]},
+        {"id": "kind", "type": "shortText", "validations": [{"in": ["a", "b"]}]},
+        {"id": "tags", "type": "shortText", "config": {"mode": "list"}, "validations": [{"size": {"max": 2}}]},
+    ]
+    assert _errors(schema, {"slug": "abc", "price": 10, "kind": "a", "tags": ["long text", "x"]}) == {}
+    errors = _errors(schema, {"slug": "A", "price": -1, "kind": "c", "tags": ["1", "2", "3"]})
+    assert errors["slug"] == "tamaño mínimo 2 y tamaño máximo 5"
+    assert errors["price"] == "valor mínimo 0 y valor máximo 10"
+    assert errors["kind"].startswith("debe ser uno de")
+    assert errors["tags"] == "tamaño máximo 2"
+    assert _errors(schema, {"slug": "ABC"})["slug"] == "sólo minúsculas"
+
+
+def test_number_editor_bounds():
+    # Lo que guarda AddFieldModal: config.validations = {min, max}, null si está vacío
+    schema = [
+        {"id": "stock", "type": "number", "config": {"variant": "integer", "validations": {"min": 1, "max": 5}}},
+        {"id": "weight", "type": "number", "config": {"variant": "decimal", "validations": {"min": None, "max": 2.5}}},
+        {"id": "free", "type": "number", "config": {"validations": {}}},
+    ]
+    assert _errors(schema, {"stock": 5, "weight": -100, "free": 10 ** 9}) == {}
+    assert _errors(schema, {"stock": 99, "weight": 2.6}) == {"stock": "valor mínimo 1 y valor máximo 5", "weight": "valor máximo 2.5"}
+    with pytest.raises(ValueError):
+        compile_schema([{"id": "n", "type": "number", "config": {"validations": {"max": "5"}}}])
+
+
+def test_localized_values():
+    schema = [{"id": "name", "type": "shortText", "localized": True, "validations": [{"size": {"max": 3}}]}]
+    assert _errors(schema, {"name": {"es": "uno", "en": ""}}) == {}
+    assert _errors(schema, {"name": {"es": "uno", "en": "three"}}) == {"name": "en: tamaño máximo 3"}
+
+
+@pytest.mark.parametrize("pattern", [r"^(a+)+$", r"(\w*)*x", r"^(?:a|b+)+$", r"(x+x+){2,}y", "a" * 300, "(unclosed"])
+def test_unsafe_or_invalid_regexp_rejected(pattern):
+    with pytest.raises(HTTPException) as exc:
+        check_schema([{"id": "s", "type": "shortText", "validations": [{"regexp": {"pattern": pattern}}]}])
+    assert exc.value.status_code == 422
+
+
+@pytest.mark.parametrize("pattern", [r"^[a-z0-9-]+$", r"^\d{4}-\d{2}$", r"(ab){1}c+", r"^(?>a+)+$"])
+def test_safe_regexp_accepted(pattern):
+    check_schema([{"id": "s", "type": "shortText", "validations": [{"regexp": {"pattern": pattern}}]}])
+
+
+def test_regexp_input_is_bounded():
+    schema = [{"id": "s", "type": "shortText", "validations": [{"regexp": {"pattern": r"^a.*b$"}}]}]
+    started = time.perf_counter()
+    assert "caracteres" in _errors(schema, {"s": "a" * 50_000})["s"]
+    assert time.perf_counter() - started < 1
+
+
+def test_get_validator_rejects_stored_invalid_schema():
+    validator_cache.clear()
+    bad = [{"id": "s", "type": "shortText", "validations": [{"regexp": {"pattern": "(a+)+"}}]}]
+    with pytest.raises(HTTPException) as exc:
+        get_validator("legacy-ct", None, bad)
+    assert exc.value.status_code == 422
+    assert get_validator("ok-ct", None, [{"id": "s", "type": "shortText"}]) is get_validator("ok-ct", None, "[{\"id\": \"s\"}]")
+
+
+def test_entry_out_of_range_is_rejected(client, admin_headers, uid):
+    ct = {
+        "id": f"ct-range-{uid}", "name": "Stock", "api_id": f"stock_{uid}",
+        "schema": [{"id": "qty", "name": "Qty", "type": "number", "config": {"variant": "integer", "validations": {"min": 0, "max": 5}}}],
+    }
+    assert client.post("/content_types", json=ct, headers=admin_headers).status_code == 200
+    entry = {"id": f"{uid}-qty", "content_type_id": ct["id"], "title": "q", "fields": {"qty": 99}}
+    r = client.post("/entries", json=entry, headers=admin_headers)
+    assert r.status_code == 422
+    assert r.json()["detail"] == [{"field": "qty", "detail": "valor mínimo 0 y valor máximo 5"}]
+    assert client.post("/entries", json={**entry, "fields": {"qty": 5}}, headers=admin_headers).status_code == 200
+    r = client.put(f"/entries/{entry['id']}", json={"fields": {"qty": 6}}, headers=admin_headers)
+    assert r.status_code == 422
+
+
+def test_content_type_with_unsafe_regexp_is_rejected(client, admin_headers, uid):
+    ct = {
+        "id": f"ct-redos-{uid}", "name": "R", "api_id": f"redos_{uid}",
+        "schema": [{"id": "s", "name": "S", "type": "shortText", "validations": [{"regexp": {"pattern": "^(a+)+$"}}]}],
+    }
+    assert client.post("/content_types", json=ct, headers=admin_headers).status_code == 422
@@ -0,0 +1,45 @@
+# backend/tests/test_field_indexes.py
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.core.db import engine
+from app.services import field_query
+
+SCHEMA = [
+    {"id": "fqslug", "type": "shortText", "indexed": True},
+    {"id": "fqprice", "type": "number", "indexed": True},
+    {"id": "fqnote", "type": "shortText"},
+]
+
+
+def _entry_indexes():
+    # El inspector omite los índices de expresión en SQLite
+    with engine.connect() as conn:
+        return set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'entries'")).scalars())
+
+
+def test_ensure_field_indexes_is_idempotent_and_race_safe(client):
+    async def run():
+        # Dos actualizaciones de schema simultáneas + una repetida
+        results = await asyncio.gather(*(field_query.ensure_field_indexes(SCHEMA) for _ in range(2)))
+        results.append(await field_query.ensure_field_indexes(SCHEMA))
+        return results
+
+    assert asyncio.run(run()) == [[], [], []]
+    assert {"ix_entries_fld_fqslug_text", "ix_entries_fld_fqprice_number"} <= _entry_indexes()
+    assert not any("fqnote" in name for name in _entry_indexes())
+
+
+def test_ensure_field_indexes_logs_failures_and_continues(client, monkeypatch, caplog):
+    good = field_query._field_indexes([{"id": "fqok", "type": "number", "indexed": True}])
+    monkeypatch.setattr(
+        field_query, "_field_indexes",
+        lambda schema, concurrently=False: [("ix_broken", "CREATE INDEX ix_broken ON missing_table (x)")] + good,
+    )
+    with caplog.at_level(logging.WARNING, logger=field_query.__name__):
+        failed = asyncio.run(field_query.ensure_field_indexes(SCHEMA))
+    assert failed == ["ix_broken"]
+    assert "ix_broken" in caplog.text
+    assert "ix_entries_fld_fqok_number" in _entry_indexes()
@@ -0,0 +1,115 @@
+# backend/tests/test_images.py
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+
+def _png(size, mode="RGB", color="red") -> bytes:
+    buf = io.BytesIO()
+    Image.new(mode, size, color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="module")
+def bomb_png() -> bytes:
+    # 200 Mpx en unos KB: decodificarla ocuparía cientos de MB
+    return _png((20000, 10000), mode="1", color=0)
+
+
+def test_upload_and_transform(client, admin_headers):
+    r = client.post("/images/upload", files={"file": ("foto.png", _png((64, 32)), "image/png")}, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    name = r.json()["filename"]
+    r = client.get(f"/images/{name}", params={"w": 16, "fm": "webp"})
+    assert r.status_code == 200 and r.headers["content-type"] == "image/webp"
+    with Image.open(io.BytesIO(r.content)) as img:
+        assert img.size == (16, 8)
+
+
+def test_upload_rejects_decompression_bomb(client, admin_headers, bomb_png):
+    r = client.post("/images/upload", files={"file": ("bomb.png", bomb_png, "image/png")}, headers=admin_headers)
+    assert r.status_code == 413
+    digest = hashlib.sha256(bomb_png).hexdigest()
+    items = client.get("/images/list", params={"limit": 1000}).json()["items"]
+    assert digest not in {i["sha256"] for i in items}
+    assert not os.path.exists(os.path.join(os.environ["IMAGES_DIR"], f"{digest}.png"))
+
+
+def test_transform_of_stored_bomb_is_4xx(client, bomb_png):
+    # Original guardado antes del límite (p.ej. copiado a mano al directorio)
+    path = os.path.join(os.environ["IMAGES_DIR"], "legacy-bomb.png")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(bomb_png)
+    r = client.get("/images/legacy-bomb.png", params={"w": 100})
+    assert r.status_code == 413
+
+
+def test_transform_queue_is_bounded(client, admin_headers, monkeypatch):
+    from app.core.process_pool import BoundedProcessPool
+    from app.services import image_service
+
+    r = client.post("/images/upload", files={"file": ("cola.png", _png((300, 200), color="blue"), "image/png")}, headers=admin_headers)
+    name = r.json()["filename"]
+    pool = BoundedProcessPool("images-test", workers=1, max_queue=1, queue_timeout=30)
+    monkeypatch.setattr(image_service, "image_pool", pool)
+    source = os.path.join(os.environ["IMAGES_DIR"], name)
+
+    async def burst():
+        params = [image_service.TransformParams(w=10 + i, h=None, fm="png", q=80, fit="fit", bg="#ffffff") for i in range(6)]
+        return await asyncio.gather(*(image_service.derived_image(source, name, p) for p in params), return_exceptions=True)
+
+    try:
+        results = asyncio.run(burst())
+    finally:
+        pool.shutdown()
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert [r.status_code for r in rejected] == [503] * len(rejected)
+    assert len(rejected) == 4  # 1 renderizando + 1 en cola
+    assert pool.stats()["rejected"] == 4 and pool.stats()["completed"] == 2
+    assert "pool" in client.get("/health/cache").json()["images"]
+
+
+def test_release_does_not_delete_concurrent_reupload(monkeypatch):
+    from starlette.datastructures import Headers, UploadFile
+
+    from app.services import asset_service
+
+    data = _png((40, 40), color="green")
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(os.environ["IMAGES_DIR"], f"{digest}.png")
+
+    def upload():
+        return UploadFile(io.BytesIO(data), filename="carrera.png", headers=Headers({"content-type": "image/png"}))
+
+    real_delete = asset_service.storage.delete
+
+    async def scenario():
+        first = await asset_service.store_upload(upload(), "images", 10**6)
+        reupload = None
+
+        async def slow_delete(store, name):
+            # La subida concurrente de los mismos bytes arranca justo cuando se va a borrar el blob
+            nonlocal reupload
+            reupload = asyncio.create_task(asset_service.store_upload(upload(), "images", 10**6))
+            await asyncio.sleep(0.3)
+            await real_delete(store, name)
+
+        monkeypatch.setattr(asset_service.storage, "delete", slow_delete)
+        assert await asset_service.release_asset("images", first.filename) == 0
+        return await reupload
+
+    again = asyncio.run(scenario())
+    assert again.filename == f"{digest}.png"
+    assert os.path.exists(path)
+
+
+@pytest.mark.parametrize("filename", ["foto." + "a" * 200, "foto.exe"])
+def test_upload_rejects_unknown_extension(client, admin_headers, filename):
+    r = client.post("/images/upload", files={"file": (filename, _png((8, 8)), "image/png")}, headers=admin_headers)
+    assert r.status_code == 400
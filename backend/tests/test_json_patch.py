@@ -0,0 +1,68 @@
+# backend/tests/test_json_patch.py
+import copy
+import random
+
+import pytest
+
+from app.core import json_patch
+
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(8 if depth < 3 else 5)
+    if kind == 0:
+        return rng.randrange(-3, 4)
+    if kind == 1:
+        return rng.choice(["", "a", "b/c", "d~e", "ñ"])
+    if kind == 2:
+        return rng.choice([True, False, None])
+    if kind == 3:
+        return rng.choice([0.5, 1.0, 1])
+    if kind == 4:
+        return rng.choice([[], {}])
+    if kind in (5, 6):
+        return {rng.choice(["x", "y", "a/b", "m~n", ""]): _random_value(rng, depth + 1) for _ in range(rng.randrange(4))}
+    return [_random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_diff_apply_round_trip(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        before, after = _random_value(rng), _random_value(rng)
+        frozen = copy.deepcopy(before)
+        ops = json_patch.diff(before, after)
+        result = json_patch.apply(before, ops)
+        assert result == after and json_patch.diff(result, after) == []
+        assert before == frozen  # apply no muta el documento original
+
+
+def test_diff_is_minimal_and_type_strict():
+    assert json_patch.diff({"a": 1, "b": [1, 2]}, {"a": 1, "b": [1, 2]}) == []
+    assert json_patch.diff({"a": 1}, {"a": True}) == [{"op": "replace", "path": "/a", "value": True}]
+    assert json_patch.diff({"a/b": {"c~d": 1}}, {"a/b": {"c~d": 2}}) == [{"op": "replace", "path": "/a~1b/c~0d", "value": 2}]
+    assert json_patch.diff([1, 2, 3], [1]) == [{"op": "remove", "path": "/2"}, {"op": "remove", "path": "/1"}]
+    assert json_patch.diff([1], [1, 2]) == [{"op": "add", "path": "/-", "value": 2}]
+
+
+def test_apply_external_operations():
+    doc = {"a": {"b": 1}, "list": [1, 2]}
+    ops = [
+        {"op": "test", "path": "/a/b", "value": 1},
+        {"op": "copy", "from": "/a", "path": "/c"},
+        {"op": "move", "from": "/a/b", "path": "/list/0"},
+        {"op": "add", "path": "", "value": None},
+    ]
+    assert json_patch.apply(doc, ops[:3]) == {"a": {}, "c": {"b": 1}, "list": [1, 1, 2]}
+    assert json_patch.apply(doc, ops) is None
+
+
+@pytest.mark.parametrize("ops", [
+    [{"op": "remove", "path": "/missing"}],
+    [{"op": "replace", "path": "/list/5", "value": 1}],
+    [{"op": "test", "path": "/a", "value": "x"}],
+    [{"op": "add", "path": "no-slash", "value": 1}],
+    [{"op": "frobnicate", "path": "/a"}],
+])
+def test_apply_rejects_invalid_patches(ops):
+    with pytest.raises(ValueError):
+        json_patch.apply({"a": 1, "list": []}, ops)
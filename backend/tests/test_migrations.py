@@ -0,0 +1,118 @@
+# backend/tests/test_migrations.py
+"""Historial de migraciones: cada escenario corre en un proceso aparte con su propia BD
+(el engine y la lista de migraciones se fijan al importar)."""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from conftest import BACKEND_DIR
+
+# Compara la BD migrada con los modelos actuales (tablas, columnas e índices)
+_COMPARE = """
+from sqlalchemy import inspect
+from app.core.db import Base, engine
+import app.models.api_key, app.models.theme, app.models.user, app.models.content, app.models.content_version, app.models.asset
+insp = inspect(engine)
+problems = []
+for t in Base.metadata.sorted_tables:
+    cols = {c["name"] for c in insp.get_columns(t.name)}
+    want = {c.name for c in t.columns}
+    if cols != want:
+        problems.append((t.name, sorted(want ^ cols)))
+    missing = {i.name for i in t.indexes} - {i["name"] for i in insp.get_indexes(t.name)}
+    if missing:
+        problems.append((t.name, sorted(missing)))
+assert not problems, problems
+"""
+
+
+def _run(db_path: str, code: str, compare: bool = False) -> str:
+    code = textwrap.dedent(code) + (_COMPARE if compare else "")
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "DB_AUTO_MIGRATE": "0"}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "migrations.db")
+
+
+def test_fresh_database_reaches_current_models(db_path):
+    _run(db_path, "from app.core.migrations import run_migrations, current_version, LATEST_VERSION\n"
+                  "run_migrations()\nassert current_version() == LATEST_VERSION\n", compare=True)
+
+
+def test_baseline_is_frozen(db_path):
+    # 001 sólo crea las tablas del esquema base, no las de migraciones posteriores
+    _run(db_path, """
+        from sqlalchemy import inspect
+        from app.core import migrations
+        from app.core.db import engine
+        migrations.MIGRATIONS = migrations.MIGRATIONS[:1]
+        migrations.run_migrations()
+        tables = set(inspect(engine).get_table_names())
+        assert {"entries", "published_entries", "content_versions"} <= tables, tables
+        assert not tables & {"assets", "asset_variants", "entry_revisions"}, tables
+    """)
+
+
+def test_upgrade_from_v11_applies_catalogue_and_revisions(db_path):
+    _run(db_path, """
+        from datetime import datetime
+        from sqlalchemy import inspect, text
+        from app.core import migrations
+        from app.core.db import engine
+        every = migrations.MIGRATIONS
+        migrations.MIGRATIONS = every[:11]
+        migrations.run_migrations()
+        assert "width" not in {c["name"] for c in inspect(engine).get_columns("assets")}
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO assets (store, sha256, filename, size, mime, ref_count, created_at) "
+                "VALUES ('images', 'abc', 'abc.png', 10, 'image/png', 1, :now)"
+            ), {"now": datetime.utcnow()})
+        migrations.MIGRATIONS = every
+        applied = [m.version for m in migrations.run_migrations()]
+        assert applied == [m.version for m in every[11:]], applied
+        insp = inspect(engine)
+        assert {"width", "height", "uploaded_by"} <= {c["name"] for c in insp.get_columns("assets")}
+        assert "ix_assets_store_created_id" in {i["name"] for i in insp.get_indexes("assets")}
+        assert "entry_revisions" in insp.get_table_names()
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT filename, width FROM assets")).all() == [("abc.png", None)]
+        # Idempotente: no queda nada pendiente
+        assert migrations.run_migrations() == []
+    """, compare=True)
+
+
+def test_prune_orphan_revisions(db_path):
+    _run(db_path, """
+        from datetime import datetime
+        from sqlalchemy import text
+        from app.core import migrations
+        from app.core.db import engine
+        every = migrations.MIGRATIONS
+        migrations.MIGRATIONS = [m for m in every if m.version <= 13]
+        migrations.run_migrations()
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO content_types (id, name, api_id, schema, owner_email) VALUES ('ct', 'CT', 'ct', '[]', 'a@b.c')"))
+            conn.execute(text("INSERT INTO entries (id, content_type_id, status, fields, created_by, created_at) "
+                              "VALUES ('kept', 'ct', 'DRAFT', '{}', 'a@b.c', :now)"), {"now": now})
+            for entry_id in ("kept", "gone", "gone"):
+                conn.execute(text("INSERT INTO entry_revisions (entry_id, version, kind, data, created_at) "
+                                  "SELECT :id, count(*) + 1, 'checkpoint', '{}', :now FROM entry_revisions WHERE entry_id = :id"),
+                             {"id": entry_id, "now": now})
+        migrations.MIGRATIONS = every
+        migrations.run_migrations()
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT entry_id, version FROM entry_revisions")).all()
+        assert rows == [("kept", 1)], rows
+    """)
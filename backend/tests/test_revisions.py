@@ -0,0 +1,116 @@
+# backend/tests/test_revisions.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.db import AsyncSessionLocal
+from app.services import revision_service
+
+
+@pytest.fixture
+def every3(monkeypatch):
+    monkeypatch.setattr(revision_service, "REVISION_CHECKPOINT_EVERY", 3)
+
+
+def _versions(client, headers, entry_id, **params):
+    r = client.get(f"/entries/{entry_id}/versions", params=params, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _document(client, headers, entry_id, version):
+    r = client.get(f"/entries/{entry_id}/versions/{version}", headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()["document"]
+
+
+def test_checkpoints_and_reconstruction(client, admin_headers, content_type, make_entry, uid, every3, monkeypatch):
+    entry_id = make_entry(content_type["id"], f"{uid}-e", slug="v1", price=1)["id"]
+    expected = {1: {"title": entry_id, "status": "DRAFT", "fields": {"slug": "v1", "price": 1}}}
+    for v in range(2, 9):
+        fields = {"slug": f"v{v}", "price": v} if v % 2 else {"slug": f"v{v}"}
+        r = client.put(f"/entries/{entry_id}", json={"title": f"t{v}", "fields": fields}, headers=admin_headers)
+        assert r.status_code == 200, r.text
+        expected[v] = {"title": f"t{v}", "status": "DRAFT", "fields": fields}
+    assert client.post(f"/entries/{entry_id}/publish", headers=admin_headers).status_code == 200
+    expected[9] = {**expected[8], "status": "PUBLISHED"}
+    # Sin cambios: no hay versión nueva
+    assert client.put(f"/entries/{entry_id}", json={"fields": expected[9]["fields"]}, headers=admin_headers).status_code == 200
+
+    items = _versions(client, admin_headers, entry_id, limit=100)["items"]
+    assert [i["version"] for i in items] == list(range(9, 0, -1))
+    assert [i["version"] for i in items if i["kind"] == "checkpoint"] == [7, 4, 1]
+    for v, doc in expected.items():
+        assert _document(client, admin_headers, entry_id, v) == doc
+
+    # Cambiar el intervalo después no rompe la reconstrucción (se busca el checkpoint real)
+    monkeypatch.setattr(revision_service, "REVISION_CHECKPOINT_EVERY", 5)
+    for v, doc in expected.items():
+        assert _document(client, admin_headers, entry_id, v) == doc
+
+    page = _versions(client, admin_headers, entry_id, limit=4)
+    assert [i["version"] for i in page["items"]] == [9, 8, 7, 6]
+    assert [i["version"] for i in _versions(client, admin_headers, entry_id, limit=4, cursor=page["next_cursor"])["items"]] == [5, 4, 3, 2]
+
+
+def test_restore_creates_a_new_version(client, admin_headers, content_type, make_entry, uid):
+    entry_id = make_entry(content_type["id"], f"{uid}-r", slug="original", price=1)["id"]
+    client.put(f"/entries/{entry_id}", json={"title": "cambiado", "fields": {"slug": "cambiado"}}, headers=admin_headers)
+    client.post(f"/entries/{entry_id}/publish", headers=admin_headers)
+
+    r = client.post(f"/entries/{entry_id}/versions/1/restore", headers=admin_headers)
+    assert r.status_code == 200, r.text
+    entry = client.get(f"/entries/{entry_id}", headers=admin_headers).json()
+    assert (entry["title"], entry["fields"], entry["status"]) == (entry_id, {"slug": "original", "price": 1}, "PUBLISHED")
+    latest = _versions(client, admin_headers, entry_id)["items"][0]
+    assert latest["version"] == 4
+    assert _document(client, admin_headers, entry_id, 4) == {"title": entry_id, "status": "PUBLISHED", "fields": {"slug": "original", "price": 1}}
+
+
+def test_missing_entry_and_version(client, admin_headers, content_type, make_entry, uid):
+    entry_id = make_entry(content_type["id"], f"{uid}-m", slug="x")["id"]
+    r = client.get(f"/entries/{uid}-nope/versions/1", headers=admin_headers)
+    assert (r.status_code, r.json()["detail"]) == (404, "Entry not found")
+    r = client.get(f"/entries/{entry_id}/versions/2", headers=admin_headers)
+    assert (r.status_code, r.json()["detail"]) == (404, "Version not found")
+    assert client.post(f"/entries/{entry_id}/versions/7/restore", headers=admin_headers).status_code == 404
+    assert client.get(f"/entries/{entry_id}/versions/0", headers=admin_headers).status_code == 422
+
+
+def test_recreating_ids_after_delete(client, admin_headers, content_type, make_entry, uid):
+    ct = content_type["id"]
+    entry_id = make_entry(ct, f"{uid}-d", slug="a")["id"]
+    client.put(f"/entries/{entry_id}", json={"fields": {"slug": "b"}}, headers=admin_headers)
+    assert client.delete(f"/entries/{entry_id}", headers=admin_headers).status_code == 200
+    make_entry(ct, entry_id, slug="nueva")
+    assert [i["version"] for i in _versions(client, admin_headers, entry_id)["items"]] == [1]
+
+    # Borrar el tipo borra el historial de sus entries; reimportar los mismos ids funciona
+    exported = client.get("/entries/export", params={"content_type_id": ct}, headers=admin_headers).text
+    assert client.delete(f"/content_types/{ct}", headers=admin_headers).status_code == 200
+    assert client.post("/content_types", json=content_type, headers=admin_headers).status_code == 200
+    report = client.post("/entries/bulk", content=exported, headers={**admin_headers, "Content-Type": "application/x-ndjson"}).json()
+    assert (report["created"], report["failed"]) == (1, 0)
+    make_entry(ct, f"{uid}-d2", slug="c")
+    assert [i["version"] for i in _versions(client, admin_headers, entry_id)["items"]] == [1]
+
+
+def test_recorded_version_conflict_is_409(client, content_type, make_entry, uid, monkeypatch):
+    entry_id = make_entry(content_type["id"], f"{uid}-c", slug="a")["id"]
+
+    async def stale(db, ids):  # otra transacción ya registró la versión 2
+        return {i: 1 for i in ids}
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await revision_service.record_revisions(db, [(entry_id, {"title": None, "status": "DRAFT", "fields": {}},
+                                                          {"title": "a", "status": "DRAFT", "fields": {}})], "x@example.com")
+            await db.commit()
+            monkeypatch.setattr(revision_service, "latest_versions", stale)
+            with pytest.raises(HTTPException) as exc:
+                await revision_service.record_revisions(db, [(entry_id, {"title": "a"}, {"title": "b"})], "y@example.com")
+            return exc.value
+
+    exc = asyncio.run(run())
+    assert exc.status_code == 409